@@ -30,6 +30,16 @@ if config.config_file_name is not None:
 # Set target metadata
 target_metadata = Base.metadata
 
+# Full-text search objects created by migrations, not by the models
+FULLTEXT_OBJECTS = {'job_listings_fts', 'search_fr', 'search_en'}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate from dropping the full-text table and columns"""
+    if reflected and compare_to is None and (name in FULLTEXT_OBJECTS or name.startswith('job_listings_fts_')):
+        return False
+    return True
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
@@ -39,6 +49,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -55,7 +66,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,48 @@
+"""Content hash and SimHash columns on job_listings
+
+content_hash (hash of the normalized listing, unchanged rows skip writes)
+and simhash (near-duplicate signature, indexed). Databases created by
+backend/database/init_db.py after these columns were added to the models
+already have them, so each is only added if missing.
+
+Revision ID: 5c2a7e91b4d3
+Revises:
+Create Date: 2026-10-16 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2a7e91b4d3'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _columns() -> set:
+    return {col['name'] for col in sa.inspect(op.get_bind()).get_columns('job_listings')}
+
+
+def _indexes() -> set:
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('job_listings')}
+
+
+def upgrade() -> None:
+    columns = _columns()
+    if 'content_hash' not in columns:
+        op.add_column('job_listings', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    if 'simhash' not in columns:
+        op.add_column('job_listings', sa.Column('simhash', sa.BigInteger(), nullable=True))
+    if 'ix_job_listings_simhash' not in _indexes():
+        op.create_index('ix_job_listings_simhash', 'job_listings', ['simhash'])
+
+
+def downgrade() -> None:
+    # batch mode: SQLite cannot drop columns in place before 3.35
+    if 'ix_job_listings_simhash' in _indexes():
+        op.drop_index('ix_job_listings_simhash', table_name='job_listings')
+    with op.batch_alter_table('job_listings') as batch_op:
+        batch_op.drop_column('simhash')
+        batch_op.drop_column('content_hash')
@@ -0,0 +1,106 @@
+"""Full-text search on job_listings title, description and requirements
+
+SQLite: FTS5 external-content table job_listings_fts (porter stemming,
+accents removed), kept in sync with job_listings by triggers.
+PostgreSQL: generated tsvector columns search_fr ('french') and search_en
+('english'), weighted title > requirements > description, each with a
+GIN index.
+
+Applies to a database whose tables were created by
+backend/database/init_db.py.
+
+Revision ID: d8f88c4ee8b4
+Revises: 5c2a7e91b4d3
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8f88c4ee8b4'
+down_revision = '5c2a7e91b4d3'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE job_listings_fts USING fts5(
+        title, description, requirements,
+        content='job_listings', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER job_listings_fts_insert AFTER INSERT ON job_listings BEGIN
+        INSERT INTO job_listings_fts(rowid, title, description, requirements)
+        VALUES (new.id, new.title, new.description, new.requirements);
+    END
+    """,
+    """
+    CREATE TRIGGER job_listings_fts_delete AFTER DELETE ON job_listings BEGIN
+        INSERT INTO job_listings_fts(job_listings_fts, rowid, title, description, requirements)
+        VALUES ('delete', old.id, old.title, old.description, old.requirements);
+    END
+    """,
+    """
+    CREATE TRIGGER job_listings_fts_update AFTER UPDATE OF title, description, requirements ON job_listings BEGIN
+        INSERT INTO job_listings_fts(job_listings_fts, rowid, title, description, requirements)
+        VALUES ('delete', old.id, old.title, old.description, old.requirements);
+        INSERT INTO job_listings_fts(rowid, title, description, requirements)
+        VALUES (new.id, new.title, new.description, new.requirements);
+    END
+    """,
+    # Index the listings already stored
+    "INSERT INTO job_listings_fts(job_listings_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS job_listings_fts_update",
+    "DROP TRIGGER IF EXISTS job_listings_fts_delete",
+    "DROP TRIGGER IF EXISTS job_listings_fts_insert",
+    "DROP TABLE IF EXISTS job_listings_fts",
+]
+
+# Text search configuration -> generated column
+POSTGRESQL_COLUMNS = {
+    'french': 'search_fr',
+    'english': 'search_en',
+}
+
+
+def _tsvector(config: str) -> str:
+    return (
+        f"setweight(to_tsvector('{config}', coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{config}', coalesce(requirements, '')), 'B') || "
+        f"setweight(to_tsvector('{config}', coalesce(description, '')), 'C')"
+    )
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        for config, column in POSTGRESQL_COLUMNS.items():
+            op.execute(
+                f"ALTER TABLE job_listings ADD COLUMN {column} tsvector "
+                f"GENERATED ALWAYS AS ({_tsvector(config)}) STORED"
+            )
+            op.create_index(
+                f'ix_job_listings_{column}', 'job_listings', [column], postgresql_using='gin'
+            )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        for column in POSTGRESQL_COLUMNS.values():
+            op.drop_index(f'ix_job_listings_{column}', table_name='job_listings')
+            op.drop_column('job_listings', column)
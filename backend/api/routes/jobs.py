@@ -1,17 +1,30 @@
 """
 Job Search API Routes
 """
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
 
+from backend.core.config import settings
 from backend.database.base import get_db
-from backend.database.models import User, SearchCriteria, UserProfile
+from backend.database.models import User, SearchCriteria, UserProfile, Resume
 from backend.api.routes.auth import get_current_user
 from backend.services.scraper_factory import ScraperFactory
+from backend.services.job_dedupe import DuplicateIndex
+from backend.services.job_index import candidate_terms, job_index
+from backend.services.ingest_pipeline import SearchPipeline, pipeline_stats
 from backend.services.job_matcher import JobMatcher
 from backend.services.job_scraper import JobScraper
+from backend.services.job_search import iter_platforms, DEFAULT_PLATFORMS
+from backend.services.job_ann import job_ann
+from backend.services.job_similarity import ResumeSimilarity, job_vectors, resume_features
+from backend.services.job_store import find_similar_jobs, listing_features, load_candidate_jobs, make_external_id, search_listings
+from backend.services.cache_warmer import cache_warmer
+from backend.services.crawl_scheduler import crawl_scheduler
+from backend.services.search_cache import search_cache
+import asyncio
 import json
 
 router = APIRouter()
@@ -50,25 +63,19 @@ class JobResponse(BaseModel):
     posted_date: Optional[str] = None
     relevance_score: Optional[float] = None
     matched: Optional[bool] = None
+    sources: Optional[List[dict]] = None  # Every platform posting this job (cross-platform duplicates)
 
 
-@router.post("/search", response_model=List[JobResponse])
-async def search_jobs(
-    request: JobSearchRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """
-    Search for jobs based on keywords and location, with relevance scoring
-    """
+def _load_search_context(db: Session, user: User):
+    """Load the user's saved criteria and profile as matcher dictionaries"""
     # Get user search criteria
     search_criteria = db.query(SearchCriteria).filter(
-        SearchCriteria.user_id == current_user.id
+        SearchCriteria.user_id == user.id
     ).first()
     
     # Get user profile for matching
     user_profile = db.query(UserProfile).filter(
-        UserProfile.user_id == current_user.id
+        UserProfile.user_id == user.id
     ).first()
     
     profile_data = {}
@@ -91,54 +98,339 @@ async def search_jobs(
             'platforms': json.loads(search_criteria.platforms) if search_criteria.platforms else [],
         }
     
-    # Use request data or fallback to saved criteria
+    return criteria_data, profile_data
+
+
+def _load_resume_similarity(db: Session, user: User) -> Optional[ResumeSimilarity]:
+    """Build the TF-IDF similarity scorer of the user's default (or latest) resume"""
+    if not settings.SIMILARITY_ENABLED:
+        return None
+    resume = db.query(Resume).filter(
+        Resume.user_id == user.id,
+        Resume.content.isnot(None)
+    ).order_by(Resume.is_default.desc(), Resume.created_at.desc()).first()
+    if resume is None:
+        return None
+    return ResumeSimilarity.for_resume(resume.id, resume.content, make_external_id)
+
+
+def _resolve_search(request: JobSearchRequest, criteria_data: dict):
+    """Use request data or fallback to saved criteria"""
     keywords = request.keywords or []
     location = request.location or criteria_data.get('location', '')
-    platforms = request.platforms or criteria_data.get('platforms', [])
-    
-    all_jobs = []
-    
-    # Search on each platform
-    if not platforms:
-        platforms = ['linkedin', 'indeed', 'hello_work', 'job_teaser', 'welcome_to_the_jungle']
-    
-    for platform in platforms:
-        try:
-            scraper = ScraperFactory.create_scraper(platform)
-            jobs = scraper.search(keywords, location, request.max_results or 50)
-            # Add platform info to each job
-            for job in jobs:
-                job['platform'] = platform
-            all_jobs.extend(jobs)
-        except Exception as e:
-            # Log error but continue with other platforms
-            print(f"Error searching on {platform}: {e}")
-            continue
-    
-    # Match and score jobs
-    matcher = JobMatcher(criteria_data, profile_data)
-    matched_jobs = matcher.match_jobs(all_jobs)
+    platforms = request.platforms or criteria_data.get('platforms', []) or DEFAULT_PLATFORMS
+    return keywords, location, platforms
+
+
+def _job_response(job: dict) -> dict:
+    """Convert a scored job to the JobResponse format"""
+    return {
+        'id': job.get('id', ''),
+        'title': job.get('title', ''),
+        'company': job.get('company', ''),
+        'location': job.get('location', ''),
+        'description': job.get('description', ''),
+        'salary': job.get('salary'),
+        'job_type': job.get('job_type'),
+        'remote': job.get('is_remote', False),
+        'url': job.get('url', ''),
+        'platform': job.get('platform', ''),
+        'posted_date': job.get('posted_date'),
+        'relevance_score': job.get('relevance_score', 0),
+        'matched': job.get('matched', False),
+        'sources': job.get('sources'),
+    }
+
+
+@router.post("/search", response_model=List[JobResponse])
+async def search_jobs(
+    request: JobSearchRequest,
+    response: Response,
+    page: int = Query(1, ge=1),
+    limit: Optional[int] = Query(None, ge=1, description="Jobs per page (all jobs if not set)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Search for jobs based on keywords and location, with relevance scoring
+    
+    Platforms are searched concurrently, each with its own timeout. The
+    per-platform status (ok, timeout, error, unsupported) is returned as JSON
+    in the X-Platform-Status header so a slow platform never blocks the others.
+    
+    Results go through the staged ingestion pipeline (fetch, parse,
+    normalize, dedupe, score, persist): copies of a job posted on several
+    platforms are collapsed into the most complete one (longest
+    description), with every copy listed in its 'sources'.
+    
+    With limit, only the given page of the ranking is returned (page 1 =
+    the `limit` best jobs); the X-Total-Count header holds the number of jobs ranked.
+    """
+    criteria_data, profile_data = _load_search_context(db, current_user)
+    keywords, location, platforms = _resolve_search(request, criteria_data)
+    
+    matcher = JobMatcher(criteria_data, profile_data, _load_resume_similarity(db, current_user))
+    pipeline = SearchPipeline(keywords, location, request.max_results or 50, matcher)
+    offset = (page - 1) * limit if limit else 0
+    matched_jobs = await pipeline.collect(platforms, top_k=limit, offset=offset)
+    response.headers['X-Platform-Status'] = json.dumps(pipeline.statuses)
+    response.headers['X-Total-Count'] = str(pipeline.total)
+    await cache_warmer.record_search(current_user.id, keywords, location, pipeline.statuses)
     
     # Convert to response format
-    result = []
-    for job in matched_jobs:
-        result.append({
-            'id': job.get('id', ''),
-            'title': job.get('title', ''),
-            'company': job.get('company', ''),
-            'location': job.get('location', ''),
-            'description': job.get('description', ''),
-            'salary': job.get('salary'),
-            'job_type': job.get('job_type'),
-            'remote': job.get('is_remote', False),
-            'url': job.get('url', ''),
-            'platform': job.get('platform', ''),
-            'posted_date': job.get('posted_date'),
-            'relevance_score': job.get('relevance_score', 0),
-            'matched': job.get('matched', False),
-        })
-    
-    return result
+    return [_job_response(job) for job in matched_jobs]
+
+
+def _encode_event(event: str, data: dict, fmt: str) -> str:
+    payload = json.dumps(data, default=str)
+    if fmt == 'sse':
+        return f"event: {event}\ndata: {payload}\n\n"
+    return json.dumps({'event': event, 'data': data}, default=str) + "\n"
+
+
+@router.post("/search/stream")
+async def search_jobs_stream(
+    request: JobSearchRequest,
+    format: str = Query('ndjson', pattern='^(ndjson|sse)$'),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Streaming variant of /search
+    
+    Emits one 'platform' event per platform as soon as it answers, with that
+    platform's status and its scored jobs (sorted by relevance), then a final
+    'summary' event with every platform status and the global ranking as
+    (id, platform, relevance_score) entries. Only the ranking is kept in
+    memory, not the job payloads already sent.
+    
+    Copies of a job already sent by another platform are not sent again;
+    the summary lists them under 'duplicates' with the id they duplicate.
+    
+    Events are newline-delimited JSON objects ({"event": ..., "data": ...})
+    by default, or Server-Sent Events with format=sse.
+    """
+    criteria_data, profile_data = _load_search_context(db, current_user)
+    keywords, location, platforms = _resolve_search(request, criteria_data)
+    matcher = JobMatcher(criteria_data, profile_data, _load_resume_similarity(db, current_user))
+    user_id = current_user.id
+    
+    dedupe = DuplicateIndex(keep_jobs=False) if settings.DEDUPE_ENABLED else None
+    
+    async def events():
+        statuses = []
+        ranking = []
+        duplicates = []
+        sent_ids = {}  # Duplicate group -> id of the job sent for it
+        async for jobs, status in iter_platforms(
+            platforms, keywords, location, request.max_results or 50
+        ):
+            if dedupe is not None:
+                unique = []
+                for job in jobs:
+                    group_id, is_new = dedupe.add(job)
+                    if is_new:
+                        sent_ids[group_id] = job.get('id', '')
+                        unique.append(job)
+                    else:
+                        duplicates.append({
+                            'id': job.get('id', ''),
+                            'platform': job.get('platform', ''),
+                            'url': job.get('url', ''),
+                            'duplicate_of': sent_ids[group_id],
+                        })
+                jobs = unique
+            scored = [_job_response(job) for job in matcher.match_jobs(jobs)]
+            statuses.append(status)
+            ranking.extend(
+                {'id': job['id'], 'platform': job['platform'], 'relevance_score': job['relevance_score']}
+                for job in scored
+            )
+            yield _encode_event('platform', {'status': status, 'jobs': scored}, format)
+        
+        await cache_warmer.record_search(user_id, keywords, location, statuses)
+        ranking.sort(key=lambda x: x['relevance_score'], reverse=True)
+        yield _encode_event('summary', {
+            'total': len(ranking),
+            'platforms': statuses,
+            'ranking': ranking,
+            'duplicates': duplicates,
+        }, format)
+    
+    media_type = 'text/event-stream' if format == 'sse' else 'application/x-ndjson'
+    return StreamingResponse(
+        events(),
+        media_type=media_type,
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@router.get("/recommended", response_model=List[JobResponse])
+async def recommended_jobs(
+    response: Response,
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Rank stored job listings against the user's saved criteria and profile
+    
+    The inverted index retrieves the JOB_INDEX_CANDIDATES listings with the
+    best BM25 score for the required keywords, domain and profile skills;
+    only those get the full JobMatcher score. X-Total-Count holds the
+    number of candidates ranked.
+    """
+    criteria_data, profile_data = _load_search_context(db, current_user)
+    matcher = JobMatcher(criteria_data, profile_data, _load_resume_similarity(db, current_user))
+    candidates = await asyncio.get_running_loop().run_in_executor(
+        None, load_candidate_jobs, candidate_terms(criteria_data, profile_data), settings.JOB_INDEX_CANDIDATES
+    )
+    ranked = matcher.match_jobs(candidates, top_k=limit, offset=(page - 1) * limit)
+    response.headers['X-Total-Count'] = str(len(candidates))
+    return [_job_response(job) for job in ranked]
+
+
+@router.get("/listings", response_model=List[JobResponse])
+def search_stored_listings(
+    response: Response,
+    keywords: List[str] = Query([]),
+    exclude: List[str] = Query([]),
+    match_all: bool = False,
+    language: Optional[str] = Query(None, pattern="^(french|english)$"),
+    platform: Optional[str] = None,
+    location: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Search stored job listings by keyword, without scraping
+    
+    Keywords and excluded keywords are matched in title, description and
+    requirements by the database full-text index (stemmed in French and
+    English, or only in `language`), ranked by full-text relevance.
+    X-Total-Count holds the number of matching listings.
+    """
+    jobs, total = search_listings(
+        db,
+        keywords=keywords,
+        excluded_keywords=exclude,
+        match_all=match_all,
+        platform=platform,
+        location=location,
+        languages=[language] if language else None,
+        limit=limit,
+        offset=(page - 1) * limit
+    )
+    response.headers['X-Total-Count'] = str(total)
+    return [_job_response(job) for job in jobs]
+
+
+@router.get("/similar", response_model=List[JobResponse])
+def similar_jobs(
+    resume_id: Optional[int] = None,
+    job_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    exact: bool = Query(False, description="Compare with every listing instead of using the ANN index"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the stored active jobs most similar to one of the user's resumes or to a job
+    
+    Similarity is the cosine of the hashed TF-IDF vectors; candidates come
+    from the ANN index and are re-ranked exactly. relevance_score holds the
+    similarity as a percentage.
+    """
+    if not settings.SIMILARITY_ENABLED:
+        raise HTTPException(status_code=503, detail="Job similarity is disabled")
+    if (resume_id is None) == (job_id is None):
+        raise HTTPException(status_code=400, detail="Give either resume_id or job_id")
+    
+    if resume_id is not None:
+        resume = db.query(Resume).filter(
+            Resume.id == resume_id,
+            Resume.user_id == current_user.id
+        ).first()
+        if not resume:
+            raise HTTPException(status_code=404, detail="CV non trouvé")
+        if not resume.content:
+            raise HTTPException(status_code=422, detail="No text was extracted from this resume")
+        indices, tfs = resume_features(resume.id, resume.content)
+    else:
+        features = listing_features(db, job_id)
+        if features is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        indices, tfs = features
+    
+    similar = find_similar_jobs(db, indices, tfs, limit, exclude=job_id, exact=exact)
+    return [_job_response({**job, 'relevance_score': round(job['similarity'] * 100, 1)}) for job in similar]
+
+
+@router.get("/platforms")
+async def get_platforms():
+    """
+    Get supported platforms with each scraper's health and warm state
+    """
+    return ScraperFactory.get_supported_platforms()
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Get hit/miss/eviction counters of the shared search result cache
+    """
+    return search_cache.stats()
+
+
+@router.get("/pipeline/stats")
+async def get_pipeline_stats():
+    """
+    Get per-stage throughput and queue depth of running and recent search pipelines
+    """
+    return pipeline_stats()
+
+
+@router.get("/cache/warming")
+async def get_cache_warming_stats():
+    """
+    Get the last cache warming run with its expected and actual hit rates
+    """
+    return cache_warmer.stats()
+
+
+@router.get("/index/stats")
+async def get_index_stats():
+    """
+    Get size, update and query counters of the job listing inverted index
+    """
+    return job_index.stats()
+
+
+@router.get("/similarity/stats")
+async def get_similarity_stats():
+    """
+    Get size, IDF refresh and query counters of the job TF-IDF vectors
+    """
+    return job_vectors.stats()
+
+
+@router.get("/ann/stats")
+async def get_ann_stats():
+    """
+    Get size, maintenance counters and last query latency of the job ANN index
+    """
+    return job_ann.stats()
+
+
+@router.get("/crawler/stats")
+async def get_crawler_stats():
+    """
+    Get queue depth, lag and counters of the background crawler
+    """
+    return await crawl_scheduler.astats()
 
 
 @router.post("/filter", response_model=List[JobResponse])
@@ -14,6 +14,7 @@ from backend.database.schemas import ResumeResponse, ResumeCreate, ResumeUpdate
 from backend.api.routes.auth import get_current_user
 from backend.services.pdf_extractor import PDFExtractor
 from backend.services.ai_service import AIService
+from backend.services.job_similarity import resume_features
 from backend.core.config import settings
 import json
 from loguru import logger
@@ -117,6 +118,10 @@ async def upload_resume(
     db.commit()
     db.refresh(db_resume)
     
+    # Vectorize the resume now rather than on its first job search
+    if settings.SIMILARITY_ENABLED and db_resume.content:
+        resume_features(db_resume.id, db_resume.content)
+    
     # Prepare response with ResumeResponse model
     response = ResumeResponse.model_validate(db_resume)
     
@@ -0,0 +1,132 @@
+"""
+Benchmark - Distributed crawl queue with several worker processes
+
+Fills a crawl_queue table with synthetic tasks, then lets N worker
+processes claim, "crawl" (sleep) and complete them against one database
+(a SQLite file by default). One worker can be made to crash while holding
+a lease, to check that its task is reclaimed once the lease expires.
+Reports tasks/s per worker count and any task crawled more than once.
+
+Usage:
+    python -m backend.benchmarks.bench_crawl_queue
+    python -m backend.benchmarks.bench_crawl_queue --tasks 500 --workers 1 2 4 8 --crawl-ms 20 --crash
+    python -m backend.benchmarks.bench_crawl_queue --database-url postgresql://...
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Dict, List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.base import Base
+from backend.database.models import CrawlQueueItem
+from backend.services.crawl_queue import CrawlQueue
+
+
+def make_engine(database_url: str):
+    if not database_url.startswith('sqlite'):
+        return create_engine(database_url)
+    engine = create_engine(database_url, connect_args={'check_same_thread': False, 'timeout': 30})
+    
+    @event.listens_for(engine, 'connect')
+    def _wal(connection, _):
+        connection.execute('PRAGMA journal_mode=WAL')
+    
+    return engine
+
+
+def worker_process(database_url: str, lease_seconds: float, crawl_ms: float, crash: bool, results) -> None:
+    """Claim and complete tasks until none is left; optionally crash holding a lease"""
+    engine = make_engine(database_url)
+    queue = CrawlQueue(sessionmaker(bind=engine), lease_seconds=lease_seconds)
+    done = []
+    while True:
+        claimed = queue.claim(1)
+        if not claimed:
+            stats = queue.stats()
+            if not stats['due'] and not stats['leased'] and not stats['expired_leases']:
+                break
+            time.sleep(0.02)
+            continue
+        task = claimed[0]
+        if crash:
+            os._exit(1)  # Dies holding the lease, without reporting
+        time.sleep(crawl_ms / 1000)
+        if queue.complete(task['id'], interval=3600):
+            done.append(task['id'])
+    results.put((queue.worker_id, done))
+
+
+def run(database_url: str, tasks: int, workers: int, lease_seconds: float, crawl_ms: float, crash: bool) -> Dict:
+    engine = make_engine(database_url)
+    Base.metadata.drop_all(bind=engine, tables=[CrawlQueueItem.__table__])
+    Base.metadata.create_all(bind=engine, tables=[CrawlQueueItem.__table__])
+    CrawlQueue(sessionmaker(bind=engine)).enqueue([
+        SimpleNamespace(platform='linkedin', keywords=[f'kw{i}'], location='paris', last_active=float(i))
+        for i in range(tasks)
+    ])
+    engine.dispose()
+    
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=worker_process,
+            args=(database_url, lease_seconds, crawl_ms, crash and i == 0, results)
+        )
+        for i in range(workers)
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    completed: List[int] = []
+    per_worker = {}
+    for _ in range(workers - 1 if crash else workers):
+        worker_id, done = results.get()
+        per_worker[worker_id] = len(done)
+        completed.extend(done)
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+    
+    counts = Counter(completed)
+    return {
+        'workers': workers,
+        'tasks': tasks,
+        'completed': len(counts),
+        'duplicates': sum(n - 1 for n in counts.values() if n > 1),
+        'elapsed_s': elapsed,
+        'tasks_per_second': len(completed) / elapsed,
+        'per_worker': sorted(per_worker.values(), reverse=True),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default=None, help='Default: a temporary SQLite file')
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 2, 4, 8])
+    parser.add_argument('--crawl-ms', type=float, default=20.0, help='Simulated crawl time per task')
+    parser.add_argument('--lease-seconds', type=float, default=2.0)
+    parser.add_argument('--crash', action='store_true', help='First worker dies holding its first lease')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'crawl_queue.db')}"
+        print(f"{args.tasks} tasks, {args.crawl_ms:.0f} ms per crawl, lease {args.lease_seconds}s, {database_url.split(':')[0]}")
+        print(f"  {'workers':>7}{'completed':>11}{'duplicates':>12}{'seconds':>9}{'tasks/s':>9}  per worker")
+        for workers in args.workers:
+            r = run(database_url, args.tasks, workers, args.lease_seconds, args.crawl_ms, args.crash)
+            print(
+                f"  {r['workers']:>7}{r['completed']:>11}{r['duplicates']:>12}{r['elapsed_s']:>9.2f}"
+                f"{r['tasks_per_second']:>9.1f}  {r['per_worker']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark - HTML parse cost per page for each parser backend
+
+Parses the saved search-result and job-detail pages in fixtures/ (or any
+*.html files given with --fixtures) with every installed backend, then runs
+the field extraction a scraper would do on them. Pages embedding JobPosting
+JSON-LD are also timed through the JSON-LD fast path, which skips the DOM.
+
+Usage:
+    python -m backend.benchmarks.bench_html_parser
+    python -m backend.benchmarks.bench_html_parser --iterations 500 --fixtures /path/to/pages
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from backend.services.html_parser import HtmlNode, available_backends, parse_html
+from backend.services.job_jsonld import extract_job_postings
+
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+
+def extract_search_results(root: HtmlNode) -> List[Dict]:
+    """Extract the job cards of a search results page"""
+    return [{
+        'id': card.attr('data-job-id'),
+        'title': card.select_text('.job-card__title'),
+        'url': card.select_attr('a.job-card__link', 'href'),
+        'company': card.select_text('.job-card__company-name'),
+        'location': card.select_text('.job-card__location'),
+        'posted_date': card.select_attr('time', 'datetime'),
+    } for card in root.select('li.job-card')]
+
+
+def extract_job_detail(root: HtmlNode) -> List[Dict]:
+    """Extract the fields of a job detail page"""
+    detail = root.select_one('article.job-detail')
+    if detail is None:
+        return []
+    return [{
+        'id': detail.attr('data-job-id'),
+        'title': detail.select_text('.job-detail__title'),
+        'company': detail.select_text('.job-detail__company'),
+        'location': detail.select_text('.job-detail__location'),
+        'salary': detail.select_text('.job-detail__salary'),
+        'description': detail.select_text('.job-detail__description'),
+        'requirements': detail.select_text('.job-detail__requirements'),
+        'url': detail.select_attr('.job-detail__apply', 'href'),
+    }]
+
+
+def extract(root: HtmlNode) -> List[Dict]:
+    """Run both extractors; each page matches one of them"""
+    return extract_job_detail(root) or extract_search_results(root)
+
+
+def bench(html: str, backend: str, iterations: int) -> Dict:
+    """Time parse-only and parse + extract for one page and backend"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        parse_html(html, backend)
+    parse_ms = (time.perf_counter() - started) * 1000 / iterations
+    
+    started = time.perf_counter()
+    for _ in range(iterations):
+        jobs = extract(parse_html(html, backend))
+    total_ms = (time.perf_counter() - started) * 1000 / iterations
+    
+    return {'parse_ms': parse_ms, 'total_ms': total_ms, 'jobs': len(jobs)}
+
+
+def bench_jsonld(html: str, iterations: int) -> Dict:
+    """Time the JSON-LD extraction of one page"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        jobs = extract_job_postings(html)
+    total_ms = (time.perf_counter() - started) * 1000 / iterations
+    return {'total_ms': total_ms, 'jobs': len(jobs)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--fixtures', default=str(FIXTURES_DIR))
+    parser.add_argument('--backends', nargs='*', default=None, help='Backends to compare (default: all installed)')
+    args = parser.parse_args()
+    
+    backends = args.backends or available_backends()
+    pages = sorted(Path(args.fixtures).glob('*.html'))
+    
+    print(f"Backends: {', '.join(backends)}, iterations: {args.iterations}")
+    for page in pages:
+        html = page.read_text(encoding='utf-8')
+        print(f"\n{page.name} ({len(html) / 1024:.1f} KiB)")
+        baseline = None
+        for backend in backends:
+            result = bench(html, backend, args.iterations)
+            baseline = baseline or result['total_ms']
+            print(
+                f"  {backend:<11} parse {result['parse_ms']:>8.3f} ms/page   "
+                f"parse+extract {result['total_ms']:>8.3f} ms/page   "
+                f"{1000 / result['total_ms']:>8,.0f} pages/s   "
+                f"({result['jobs']} jobs, x{baseline / result['total_ms']:.1f})"
+            )
+        if extract_job_postings(html):
+            result = bench_jsonld(html, args.iterations)
+            print(
+                f"  {'json-ld':<11} {'':<25}"
+                f"parse+extract {result['total_ms']:>8.3f} ms/page   "
+                f"{1000 / result['total_ms']:>8,.0f} pages/s   "
+                f"({result['jobs']} jobs, x{baseline / result['total_ms']:.1f})"
+            )
+
+
+if __name__ == "__main__":
+    main()
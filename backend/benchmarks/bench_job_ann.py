@@ -0,0 +1,200 @@
+"""
+Benchmark - ANN (random-projection signatures) recall and latency against exact similarity search
+
+Builds JobVectors over synthetic listings drawn from topics (each listing
+mixes the words of one or two topics with Zipf-distributed background
+words, so that listings do have close neighbours), then, for resume-like
+queries drawn the same way, compares:
+    
+    exact - JobVectors.most_similar(): cosine against every listing
+    ann   - JobANNIndex.search() for each (bits, candidates) setting,
+            with recall@k = share of the exact top k found
+    lsh   - banded LSH for reference: the signature cut into bands, a
+            listing is a candidate if one of its bands equals the query's;
+            shows how many candidates bucket lookups need for the same recall
+
+The index build, save and load times are reported for the default setting.
+
+Usage:
+    python -m backend.benchmarks.bench_job_ann
+    python -m backend.benchmarks.bench_job_ann --sizes 10000 100000 --queries 100 --k 10
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from backend.benchmarks.bench_job_index import make_vocabulary, percentile
+from backend.services.job_ann import JobANNIndex
+from backend.services.job_similarity import JobVectors, hash_features
+
+
+TOPICS = 400
+TOPIC_WORDS = 40
+TOPIC_SHARE = 0.6  # Share of a listing's words drawn from its topics
+WORDS = 60
+BATCH_SIZE = 5000
+
+# (bits, candidates)
+SETTINGS = [
+    (128, 300),
+    (256, 100),
+    (256, 300),
+    (256, 1000),
+    (512, 300),
+]
+DEFAULT_SETTING = (256, 300)
+
+# (bands, bits per band) over the default signature
+BANDS = [(32, 8), (16, 16), (64, 4)]
+
+
+class TopicCorpus:
+    """Listings (and queries) as word ID rows drawn from topic and background distributions"""
+    
+    def __init__(self, vocabulary: np.ndarray, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.vocabulary = vocabulary
+        self.topics = rng.choice(np.arange(200, len(vocabulary)), size=(TOPICS, TOPIC_WORDS), replace=False)
+        ranks = np.arange(len(vocabulary), dtype=np.float64)
+        self.background = 1.0 / (ranks + 2.0)
+        self.background /= self.background.sum()
+    
+    def texts(self, count: int, seed: int) -> List[str]:
+        rng = np.random.default_rng(seed)
+        topical = int(WORDS * TOPIC_SHARE)
+        first = rng.integers(TOPICS, size=count)
+        second = np.where(rng.random(count) < 0.5, rng.integers(TOPICS, size=count), first)
+        picks = rng.integers(TOPIC_WORDS, size=(count, topical))
+        from_second = rng.random((count, topical)) < 0.3
+        words = np.where(from_second, self.topics[second[:, None], picks], self.topics[first[:, None], picks])
+        background = rng.choice(len(self.vocabulary), size=(count, WORDS - topical), p=self.background)
+        rows = np.concatenate((words, background), axis=1)
+        return [' '.join(self.vocabulary[row]) for row in rows]
+
+
+def build_vectors(texts: List[str]) -> Tuple[JobVectors, float]:
+    vectors = JobVectors()
+    started = time.perf_counter()
+    for start in range(0, len(texts), BATCH_SIZE):
+        vectors.update([
+            {'external_id': f'bench:{i}', 'description': texts[i]}
+            for i in range(start, min(start + BATCH_SIZE, len(texts)))
+        ])
+    return vectors, time.perf_counter() - started
+
+
+def bench_setting(vectors: JobVectors, queries: List[Tuple], exact: List[List[str]], setting: Tuple, k: int) -> Dict:
+    bits, candidates = setting
+    index = JobANNIndex(bits=bits, candidates=candidates, path='')
+    started = time.perf_counter()
+    index.sync(vectors)
+    build_s = time.perf_counter() - started
+    
+    latencies = []
+    recalls = []
+    for (indices, tfs), expected in zip(queries, exact):
+        started = time.perf_counter()
+        found = index.search(indices, tfs, vectors, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(len({eid for eid, _ in found} & set(expected)) / max(len(expected), 1))
+    
+    result = {
+        'setting': setting,
+        'build_s': build_s,
+        'recall': float(np.mean(recalls)),
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'memory_mb': index.memory_bytes() / 1e6,
+    }
+    if setting == DEFAULT_SETTING:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'job_ann.npz')
+            started = time.perf_counter()
+            index.save(path)
+            result['save_s'] = time.perf_counter() - started
+            result['file_mb'] = os.path.getsize(path) / 1e6
+            started = time.perf_counter()
+            JobANNIndex(bits=bits, candidates=candidates, path='').load(path)
+            result['load_s'] = time.perf_counter() - started
+        result['index'] = index
+    return result
+
+
+def bench_bands(index: JobANNIndex, queries: List[Tuple], exact: List[List[str]], bands: int, width: int) -> Dict:
+    # Listings sharing at least one band of bits with the query are the candidates
+    signatures = index._signatures[:index._rows].view(np.uint8)
+    bits = np.unpackbits(signatures, axis=1, bitorder='little')[:, :bands * width]
+    external_ids = index._external
+    recalls = []
+    candidates = []
+    for (indices, tfs), expected in zip(queries, exact):
+        query = index.signatures([(indices, tfs)]).view(np.uint8).reshape(-1)
+        query_bits = np.unpackbits(query, bitorder='little')[:bands * width]
+        equal = (bits == query_bits).reshape(len(bits), bands, width).all(axis=2).any(axis=1)
+        found = {external_ids[slot] for slot in np.flatnonzero(equal)}
+        candidates.append(len(found))
+        recalls.append(len(found & set(expected)) / max(len(expected), 1))
+    return {'recall': float(np.mean(recalls)), 'candidates': float(np.mean(candidates))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='*', default=[10000, 100000])
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--vocabulary', type=int, default=30000)
+    args = parser.parse_args()
+    
+    corpus = TopicCorpus(make_vocabulary(args.vocabulary))
+    query_texts = corpus.texts(args.queries, seed=1)
+    print(
+        f"{args.queries} queries, recall@{args.k}, {TOPICS} topics, {WORDS} words per listing, "
+        f"{args.vocabulary} word vocabulary"
+    )
+    for size in args.sizes:
+        vectors, vectorize_s = build_vectors(corpus.texts(size, seed=2))
+        queries = [hash_features(text, vectors.bits) for text in query_texts]
+        exact = []
+        exact_ms = []
+        for indices, tfs in queries:
+            query = vectors.query_vector(indices, tfs)
+            started = time.perf_counter()
+            exact.append([eid for eid, _ in vectors.most_similar(query, args.k)])
+            exact_ms.append((time.perf_counter() - started) * 1000)
+        
+        print(
+            f"\n{size:,} listings: vectorized in {vectorize_s:.1f}s, "
+            f"exact p50 {percentile(exact_ms, 50):.2f}ms p95 {percentile(exact_ms, 95):.2f}ms"
+        )
+        print(
+            f"  {'bits':>5}{'candidates':>12}{'build s':>9}{'MB':>6}"
+            f"{'recall':>8}{'p50':>9}{'p95':>9}{'speedup':>9}"
+        )
+        for setting in SETTINGS:
+            r = bench_setting(vectors, queries, exact, setting, args.k)
+            bits, candidates = setting
+            print(
+                f"  {bits:>5}{candidates:>12}{r['build_s']:>9.1f}{r['memory_mb']:>6.1f}"
+                f"{r['recall']:>8.3f}{r['p50']:>7.2f}ms{r['p95']:>7.2f}ms"
+                f"{percentile(exact_ms, 50) / r['p50']:>8.1f}x"
+            )
+            if 'save_s' in r:
+                saved = r
+        print(
+            f"  saved index ({DEFAULT_SETTING}): {saved['file_mb']:.1f} MB, "
+            f"save {saved['save_s'] * 1000:.0f}ms, load {saved['load_s'] * 1000:.0f}ms"
+        )
+        for bands, width in BANDS:
+            r = bench_bands(saved['index'], queries, exact, bands, width)
+            print(
+                f"  banded LSH {bands}x{width} bits: recall {r['recall']:.3f} "
+                f"with {r['candidates']:.0f} candidates ({r['candidates'] / size:.0%} of the listings)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Benchmark - BM25 candidate retrieval latency against corpus size
+
+Builds a JobIndex over synthetic listings (Zipf-distributed vocabulary,
+indexed in upsert-sized batches), then times, for random user criteria:
+    
+    bm25         - JobIndex.search() for the top JOB_INDEX_CANDIDATES listings
+    bm25+matcher - the above, then JobMatcher on the candidates only
+    full scan    - JobMatcher on every listing (what scoring without the
+                   index costs; skipped above --full-scan-max listings)
+
+Usage:
+    python -m backend.benchmarks.bench_job_index
+    python -m backend.benchmarks.bench_job_index --sizes 10000 100000 1000000 --queries 50
+"""
+import argparse
+import statistics
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from backend.services.job_index import JobIndex, candidate_terms
+from backend.services.job_matcher import JobMatcher
+
+
+STOPWORDS = (
+    "de la le et les des en un une du pour au sur avec dans nous vous est par the and to of in for "
+    "with our you will are on as be an this at we"
+).split()
+TERMS = [
+    'python', 'sql', 'data', 'machine', 'learning', 'docker', 'react', 'java', 'javascript',
+    'excel', 'tableau', 'spark', 'marketing', 'finance', 'cloud', 'aws', 'stage', 'analyst',
+]
+SYLLABLES = ['ba', 'co', 'de', 'fi', 'ga', 'li', 'mo', 'na', 'pe', 'ra', 'si', 'tu', 'vo', 'ze', 'ki', 'lo']
+TITLE_WORDS = 4
+TITLE_VOCABULARY = 1200  # Titles use the most frequent non-stopwords
+DESCRIPTION_WORDS = 40
+BATCH_SIZE = 5000
+
+
+def make_vocabulary(size: int, seed: int = 0) -> np.ndarray:
+    """Stopwords first (most frequent), then job terms, then pseudo-words"""
+    rng = np.random.default_rng(seed)
+    words = STOPWORDS + TERMS
+    seen = set(words)
+    while len(words) < size:
+        word = ''.join(rng.choice(SYLLABLES, rng.integers(2, 5)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return np.array(words, dtype=object)
+
+
+class Corpus:
+    """Listings as rows of vocabulary IDs; job dictionaries are built on demand"""
+    
+    def __init__(self, count: int, vocabulary: np.ndarray, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        ranks = np.arange(len(vocabulary), dtype=np.float64)
+        weights = 1.0 / (ranks + 2.0)
+        weights /= weights.sum()
+        self.vocabulary = vocabulary
+        self.titles = rng.choice(TITLE_VOCABULARY, size=(count, TITLE_WORDS)).astype(np.uint32)
+        self.descriptions = rng.choice(len(vocabulary), size=(count, DESCRIPTION_WORDS), p=weights).astype(np.uint32)
+        self.locations = rng.choice(np.array(['Paris', 'Lyon', 'Remote', 'Lille'], dtype=object), size=count)
+    
+    def __len__(self) -> int:
+        return len(self.titles)
+    
+    def job(self, i: int) -> Dict:
+        return {
+            'id': f'bench:{i}',
+            'external_id': f'bench:{i}',
+            'title': ' '.join(self.vocabulary[self.titles[i] + len(STOPWORDS)]),
+            'description': ' '.join(self.vocabulary[self.descriptions[i]]),
+            'location': self.locations[i],
+            'is_remote': i % 3 == 0,
+            'job_type': 'internship' if i % 2 else 'full_time',
+        }
+
+
+def make_criteria(count: int, vocabulary: np.ndarray, seed: int = 1) -> List[Dict]:
+    """Random users: 2-4 required keywords, a domain and 5-10 skills"""
+    rng = np.random.default_rng(seed)
+    users = []
+    for _ in range(count):
+        skills = list(rng.choice(TERMS, rng.integers(3, 6), replace=False))
+        skills += list(rng.choice(vocabulary[200:5000], rng.integers(2, 5), replace=False))
+        users.append((
+            {
+                'location': 'Paris',
+                'job_type': 'internship',
+                'required_keywords': list(rng.choice(TERMS, rng.integers(2, 5), replace=False)),
+                'domain': str(rng.choice(TERMS)),
+            },
+            {'skills': skills},
+        ))
+    return users
+
+
+def percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else float('nan')
+
+
+def bench(corpus: Corpus, users: List, candidates: int, full_scan: bool) -> Dict:
+    index = JobIndex()
+    build_s = 0.0
+    for start in range(0, len(corpus), BATCH_SIZE):
+        batch = [corpus.job(i) for i in range(start, min(start + BATCH_SIZE, len(corpus)))]
+        started = time.perf_counter()
+        index.update(batch)
+        build_s += time.perf_counter() - started
+    
+    bm25_ms = []
+    end_to_end_ms = []
+    for criteria, profile in users:
+        started = time.perf_counter()
+        ranked = index.search(candidate_terms(criteria, profile), candidates)
+        bm25_ms.append((time.perf_counter() - started) * 1000)
+        jobs = [corpus.job(int(external_id.split(':')[1])) for external_id, _ in ranked]
+        started_matcher = time.perf_counter()
+        JobMatcher(criteria, profile).match_jobs(jobs, top_k=20)
+        end_to_end_ms.append(bm25_ms[-1] + (time.perf_counter() - started_matcher) * 1000)
+    
+    full_scan_ms = None
+    if full_scan:
+        jobs = [corpus.job(i) for i in range(len(corpus))]
+        times = []
+        for criteria, profile in users[:3]:
+            started = time.perf_counter()
+            JobMatcher(criteria, profile).match_jobs(jobs, top_k=20)
+            times.append((time.perf_counter() - started) * 1000)
+        full_scan_ms = statistics.median(times)
+    
+    return {
+        'listings': len(corpus),
+        'build_per_second': len(corpus) / build_s,
+        'terms': index.stats()['terms'],
+        'memory_mb': index.memory_bytes() / 1e6,
+        'bm25_p50': percentile(bm25_ms, 50),
+        'bm25_p95': percentile(bm25_ms, 95),
+        'end_to_end_p50': percentile(end_to_end_ms, 50),
+        'full_scan_ms': full_scan_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='*', default=[10000, 100000, 1000000])
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--candidates', type=int, default=500)
+    parser.add_argument('--vocabulary', type=int, default=30000)
+    parser.add_argument('--full-scan-max', type=int, default=100000)
+    args = parser.parse_args()
+    
+    vocabulary = make_vocabulary(args.vocabulary)
+    users = make_criteria(args.queries, vocabulary)
+    print(
+        f"{args.queries} queries, top {args.candidates} candidates, "
+        f"{TITLE_WORDS}+{DESCRIPTION_WORDS} words per listing, {args.vocabulary} word vocabulary"
+    )
+    print(
+        f"  {'listings':>9}{'index/s':>10}{'terms':>8}{'MB':>7}{'bm25 p50':>10}{'bm25 p95':>10}"
+        f"{'bm25+matcher':>14}{'full scan':>11}"
+    )
+    for size in args.sizes:
+        r = bench(Corpus(size, vocabulary), users, args.candidates, size <= args.full_scan_max)
+        full_scan = f"{r['full_scan_ms']:>9.0f}ms" if r['full_scan_ms'] is not None else f"{'-':>11}"
+        print(
+            f"  {r['listings']:>9,}{r['build_per_second']:>10,.0f}{r['terms']:>8,}{r['memory_mb']:>7.0f}"
+            f"{r['bm25_p50']:>8.2f}ms{r['bm25_p95']:>8.2f}ms{r['end_to_end_p50']:>12.1f}ms{full_scan}"
+        )
+
+
+if __name__ == "__main__":
+    main()
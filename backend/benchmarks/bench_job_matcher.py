@@ -0,0 +1,182 @@
+"""
+Benchmark - JobMatcher scoring throughput (jobs/second)
+
+Compares the compiled JobMatcher, per job and in batch (score_jobs), with
+the previous implementation (kept below as legacy_relevance_score), for
+profiles with more and more skills, and checks that all give the same
+score to every job.
+
+Usage:
+    python -m backend.benchmarks.bench_job_matcher
+    python -m backend.benchmarks.bench_job_matcher --jobs 20000 --skills 5 20 50 200
+"""
+import argparse
+import json
+import random
+import string
+import time
+from typing import Dict, List
+
+from backend.services.job_matcher import AHOCORASICK_AVAILABLE, JobMatcher
+
+
+FILLER = (
+    "nous recherchons un stagiaire pour rejoindre notre équipe au sein du pôle vous travaillerez "
+    "sur des projets variés avec les équipes produit et technique le poste est basé à profil "
+    "curieux autonome rigoureux we are looking for an intern to join our team"
+).split()
+TERMS = [
+    'python', 'sql', 'data', 'machine learning', 'docker', 'react', 'java', 'javascript',
+    'excel', 'tableau', 'spark', 'senior', 'cdi', 'marketing', 'finance', 'cloud', 'aws',
+]
+LOCATIONS = ['Paris', 'Lyon, France', 'Remote', 'Paris La Défense', '', None]
+
+
+def legacy_relevance_score(criteria: Dict, profile: Dict, job: Dict) -> float:
+    """JobMatcher.calculate_relevance_score before compilation (reference)"""
+    score = 0.0
+    max_score = 100.0
+    
+    if criteria.get('location'):
+        job_location = (job.get('location') or '').lower()
+        criteria_location = criteria['location'].lower()
+        if criteria_location in job_location or job_location in criteria_location:
+            score += 20
+        elif criteria.get('preferred_locations'):
+            for pref_loc in criteria['preferred_locations']:
+                if pref_loc.lower() in job_location:
+                    score += 15
+                    break
+    
+    if criteria.get('remote_only') and job.get('is_remote'):
+        score += 10
+    elif not criteria.get('remote_only') and job.get('is_remote'):
+        score += 5
+    
+    if criteria.get('job_type'):
+        if job.get('job_type') == criteria['job_type']:
+            score += 15
+    
+    required_keywords = criteria.get('required_keywords', [])
+    if required_keywords:
+        job_text = f"{job.get('title', '')} {job.get('description', '')}".lower()
+        matched_keywords = sum(1 for kw in required_keywords if kw.lower() in job_text)
+        if matched_keywords > 0:
+            score += (matched_keywords / len(required_keywords)) * 30
+    
+    excluded_keywords = criteria.get('excluded_keywords', [])
+    if excluded_keywords:
+        job_text = f"{job.get('title', '')} {job.get('description', '')}".lower()
+        for excluded_kw in excluded_keywords:
+            if excluded_kw.lower() in job_text:
+                score -= 50
+                break
+    
+    if criteria.get('domain'):
+        job_text = f"{job.get('title', '')} {job.get('description', '')}".lower()
+        domain = criteria['domain'].lower()
+        if domain in job_text:
+            score += 15
+    
+    if profile.get('skills'):
+        job_text = f"{job.get('title', '')} {job.get('description', '')}".lower()
+        profile_skills = profile['skills']
+        if isinstance(profile_skills, str):
+            try:
+                profile_skills = json.loads(profile_skills)
+            except Exception:
+                profile_skills = [s.strip() for s in profile_skills.split(',')]
+        
+        matched_skills = sum(1 for skill in profile_skills if skill.lower() in job_text)
+        if matched_skills > 0:
+            score += min((matched_skills / len(profile_skills)) * 10, 10)
+    
+    score = max(0, min(score, max_score))
+    return round(score, 1)
+
+
+def make_jobs(count: int, seed: int = 0) -> List[Dict]:
+    """Generate synthetic jobs of ~300 words mentioning a few known terms"""
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        words = [rng.choice(FILLER) for _ in range(300)]
+        for _ in range(rng.randint(0, 8)):
+            words[rng.randrange(len(words))] = rng.choice(TERMS).upper() if i % 7 == 0 else rng.choice(TERMS)
+        jobs.append({
+            'id': f'bench_{i}',
+            'title': None if i % 50 == 0 else f"Stage {rng.choice(TERMS)} {rng.choice(FILLER)}",
+            'description': ' '.join(words),
+            'location': rng.choice(LOCATIONS),
+            'is_remote': i % 3 == 0,
+            'job_type': rng.choice(['internship', 'full_time']),
+        })
+    return jobs
+
+
+def make_profile(skills: int, seed: int = 0) -> Dict:
+    """Profile with `skills` skills: the known terms, then random words"""
+    rng = random.Random(seed)
+    names = [term.capitalize() for term in TERMS[:skills]]
+    while len(names) < skills:
+        names.append(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))))
+    return {'skills': json.dumps(names)}
+
+
+CRITERIA = {
+    'location': 'Paris',
+    'preferred_locations': ['Lyon'],
+    'job_type': 'internship',
+    'required_keywords': ['Python', 'SQL', 'machine learning', 'data', 'python'],
+    'excluded_keywords': ['Senior', 'CDI'],
+    'domain': 'Data',
+}
+
+
+def bench(jobs: List[Dict], profile: Dict) -> Dict:
+    started = time.perf_counter()
+    expected = [legacy_relevance_score(CRITERIA, profile, job) for job in jobs]
+    legacy_rate = len(jobs) / (time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    matcher = JobMatcher(CRITERIA, profile)
+    scores = [matcher.calculate_relevance_score(job) for job in jobs]
+    compiled_rate = len(jobs) / (time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    batch_scores = JobMatcher(CRITERIA, profile).score_jobs(jobs)
+    batch_rate = len(jobs) / (time.perf_counter() - started)
+    
+    return {
+        'terms': len(matcher._terms.terms),
+        'automaton': matcher._terms.uses_automaton,
+        'legacy': legacy_rate,
+        'compiled': compiled_rate,
+        'batch': batch_rate,
+        'mismatches': sum(1 for a, b, c in zip(expected, scores, batch_scores) if not a == b == c),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=10000)
+    parser.add_argument('--skills', type=int, nargs='*', default=[5, 15, 50, 200])
+    args = parser.parse_args()
+    
+    jobs = make_jobs(args.jobs)
+    print(f"{args.jobs} jobs, pyahocorasick {'installed' if AHOCORASICK_AVAILABLE else 'not installed'}")
+    print(
+        f"  {'skills':>6}{'terms':>7}{'automaton':>11}{'before jobs/s':>15}{'after jobs/s':>14}{'speedup':>9}"
+        f"{'batch jobs/s':>14}{'speedup':>9}{'mismatches':>12}"
+    )
+    for skills in args.skills:
+        r = bench(jobs, make_profile(skills))
+        print(
+            f"  {skills:>6}{r['terms']:>7}{'yes' if r['automaton'] else 'no':>11}{r['legacy']:>15,.0f}"
+            f"{r['compiled']:>14,.0f}{r['compiled'] / r['legacy']:>8.1f}x"
+            f"{r['batch']:>14,.0f}{r['batch'] / r['legacy']:>8.1f}x{r['mismatches']:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
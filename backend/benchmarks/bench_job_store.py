@@ -0,0 +1,84 @@
+"""
+Benchmark - job_listings ingestion throughput (rows/second)
+
+Compares the batched INSERT ... ON CONFLICT upsert with per-row ORM adds.
+
+Usage:
+    python -m backend.benchmarks.bench_job_store --rows 20000
+    python -m backend.benchmarks.bench_job_store --database-url postgresql://...
+"""
+import argparse
+import time
+from typing import Dict, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.base import Base
+from backend.database.models import JobListing
+from backend.services.job_store import normalize_job, upsert_jobs
+
+
+PLATFORMS = ['linkedin', 'indeed', 'glassdoor', 'hello_work', 'job_teaser', 'welcome_to_the_jungle']
+
+
+def make_jobs(count: int, offset: int = 0) -> List[Dict]:
+    """Generate synthetic scraped jobs"""
+    return [{
+        'id': f'bench_{offset + i}',
+        'title': f'Stage Data Analyst {i}',
+        'company': f'Company {i % 500}',
+        'location': 'Paris',
+        'description': 'Stage de 6 mois en analyse de données, Python, SQL. ' * 10,
+        'job_type': 'internship',
+        'is_remote': i % 3 == 0,
+        'url': f'https://example.com/jobs/{offset + i}',
+        'platform': PLATFORMS[i % len(PLATFORMS)],
+    } for i in range(count)]
+
+
+def bench_orm_adds(session_factory, jobs: List[Dict]) -> float:
+    """Baseline: one ORM object per row"""
+    db = session_factory()
+    started = time.perf_counter()
+    for job in jobs:
+        db.add(JobListing(**normalize_job(job)))
+    db.commit()
+    elapsed = time.perf_counter() - started
+    db.close()
+    return len(jobs) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--database-url', default='sqlite://')
+    args = parser.parse_args()
+    
+    engine = create_engine(args.database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    
+    jobs = make_jobs(args.rows)
+    
+    db = session_factory()
+    inserted = upsert_jobs(db, jobs, batch_size=args.batch_size)
+    unchanged = upsert_jobs(db, jobs, batch_size=args.batch_size)
+    for job in jobs:
+        job['description'] += ' Mis à jour.'
+    changed = upsert_jobs(db, jobs, batch_size=args.batch_size)
+    db.close()
+    
+    orm_rate = bench_orm_adds(session_factory, make_jobs(args.rows, offset=args.rows))
+    
+    print(f"Database: {engine.dialect.name}, rows: {args.rows}, batch size: {args.batch_size}")
+    print(f"  bulk upsert (insert):   {inserted['rows_per_second']:>12,.0f} rows/s")
+    print(f"  bulk upsert (unchanged):{unchanged['rows_per_second']:>12,.0f} rows/s ({unchanged['rows_skipped']} skipped)")
+    print(f"  bulk upsert (changed):  {changed['rows_per_second']:>12,.0f} rows/s")
+    print(f"  per-row ORM add:        {orm_rate:>12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark - Scraper throughput against the local replay server
+
+For every platform in ScraperFactory, fetches the platform's captured pages
+through the scraper's own stack (rate limiter, circuit breaker, pooled
+transport, HTML parser) from a local replay server, and reports pages/s,
+jobs/s, p50/p95 page latency, errors and peak memory. No network access is
+needed: captures are seeded from the HTML fixtures unless --captures points
+to recorded ones.
+
+Usage:
+    python -m backend.benchmarks.bench_scrapers
+    python -m backend.benchmarks.bench_scrapers --profile flaky --concurrency 32 --rounds 10
+    python -m backend.benchmarks.bench_scrapers --captures captures --platforms linkedin indeed
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+from backend.benchmarks.bench_html_parser import extract
+from backend.benchmarks.replay_server import PROFILES, ReplayServer, seed_captures
+from backend.core.config import settings
+from backend.services.http_replay import CaptureStore
+from backend.services.http_transport import close_transport
+from backend.services.scraper_factory import ScraperFactory
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1)]
+
+
+async def run_scraper(scraper, urls: List[str], concurrency: int) -> Dict:
+    """Fetch and parse every URL with `concurrency` workers"""
+    queue: asyncio.Queue = asyncio.Queue()
+    for url in urls:
+        queue.put_nowait(url)
+    result = {'pages': 0, 'jobs': 0, 'errors': 0, 'throttled': 0, 'latencies': []}
+    
+    async def worker():
+        while not queue.empty():
+            url = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                response = await scraper.fetch(url)
+            except Exception:
+                result['errors'] += 1
+                continue
+            if response.status_code == 200:
+                result['jobs'] += len(extract(scraper.parse(response.content)))
+                result['pages'] += 1
+            elif response.status_code == 429:
+                result['throttled'] += 1
+            else:
+                result['errors'] += 1
+            result['latencies'].append((time.perf_counter() - started) * 1000)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    result['elapsed_s'] = time.perf_counter() - started
+    return result
+
+
+async def bench_platform(platform: str, store: CaptureStore, args) -> Dict:
+    """Throughput pass, then a single-round pass under tracemalloc for memory"""
+    scraper = ScraperFactory.create_scraper(platform)
+    host = urlsplit(scraper.base_url).netloc if scraper.base_url else f"{platform}.example"
+    urls = list(store.urls(host))
+    if not urls:
+        return {'platform': platform, 'pages': 0}
+    
+    result = await run_scraper(scraper, urls * args.rounds, args.concurrency)
+    
+    tracemalloc.start()
+    await run_scraper(scraper, urls, args.concurrency)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    elapsed = result['elapsed_s']
+    return {
+        'platform': platform,
+        'pages': result['pages'],
+        'pages_per_second': result['pages'] / elapsed,
+        'jobs_per_second': result['jobs'] / elapsed,
+        'p50_ms': percentile(result['latencies'], 50),
+        'p95_ms': percentile(result['latencies'], 95),
+        'errors': result['errors'],
+        'throttled': result['throttled'],
+        'peak_mib': peak / (1024 * 1024),
+    }
+
+
+async def run(args) -> List[Dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CaptureStore(args.captures or tmp)
+        if not args.captures:
+            seed_captures(store, args.pages)
+        
+        server = ReplayServer(store, PROFILES[args.profile]).start()
+        # The shared transport and rate limiters read these on first use
+        settings.HTTP_REPLAY_URL = server.url
+        settings.HTTP_RECORD_DIR = None
+        settings.SCRAPER_RATE_LIMIT = args.rate_limit
+        settings.PAGE_ARCHIVE_ENABLED = False
+        try:
+            platforms = args.platforms or list(ScraperFactory._scrapers)
+            return [await bench_platform(platform, store, args) for platform in platforms]
+        finally:
+            await close_transport()
+            server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='realistic')
+    parser.add_argument('--captures', default=None, help='Recorded capture directory (default: seeded from fixtures)')
+    parser.add_argument('--platforms', nargs='*', default=None)
+    parser.add_argument('--pages', type=int, default=5, help='Seeded search pages per platform')
+    parser.add_argument('--rounds', type=int, default=5, help='Times each captured page is fetched')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='Per-platform requests/s (0 = unlimited)')
+    args = parser.parse_args()
+    
+    results = asyncio.run(run(args))
+    
+    print(f"Profile: {args.profile}, concurrency: {args.concurrency}, rounds: {args.rounds}")
+    print(f"  {'platform':<23}{'pages':>7}{'pages/s':>10}{'jobs/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}{'429s':>6}{'peak MiB':>10}")
+    for r in results:
+        if not r['pages'] and 'errors' not in r:
+            print(f"  {r['platform']:<23} no captures")
+            continue
+        print(
+            f"  {r['platform']:<23}{r['pages']:>7}{r['pages_per_second']:>10.1f}{r['jobs_per_second']:>10.1f}"
+            f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['errors']:>8}{r['throttled']:>6}{r['peak_mib']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
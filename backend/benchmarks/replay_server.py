@@ -0,0 +1,270 @@
+"""
+Replay Server - Local stand-in for job sites, serving captured pages
+
+Serves the responses of a capture directory (backend.services.http_replay)
+under /{host}/{path}?{query}, which is where the HTTP transport sends
+requests when HTTP_REPLAY_URL is set. A profile adds latency, random
+server errors and per-host throttling (429 with Retry-After) so scrapers
+can be load-tested without network access.
+
+Usage:
+    # Capture pages while scraping normally
+    HTTP_RECORD_DIR=captures uvicorn backend.main:app
+    
+    # Or seed captures for every platform from the HTML fixtures
+    python -m backend.benchmarks.replay_server seed --captures captures
+    
+    # Serve them; then run the app with HTTP_REPLAY_URL=http://127.0.0.1:8765
+    python -m backend.benchmarks.replay_server serve --captures captures --profile realistic
+"""
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from backend.services.http_replay import CaptureStore, original_url
+from backend.services.scraper_factory import ScraperFactory
+
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+
+class ReplayProfile:
+    """Latency, error and throttling behaviour of the replay server"""
+    
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rps: float = 0.0
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate  # Share of requests answered with a 503
+        self.throttle_rps = throttle_rps  # Requests per second per host before 429s (0 = unlimited)
+    
+    def delay(self) -> float:
+        """Get the delay of one response, in seconds"""
+        jitter = random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+
+PROFILES: Dict[str, ReplayProfile] = {
+    'fast': ReplayProfile(),
+    'realistic': ReplayProfile(latency_ms=120, jitter_ms=80),
+    'flaky': ReplayProfile(latency_ms=200, jitter_ms=150, error_rate=0.1),
+    'throttled': ReplayProfile(latency_ms=80, jitter_ms=40, throttle_rps=5),
+}
+
+
+class _HostCounters:
+    def __init__(self):
+        self.requests = 0
+        self.served = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.throttled = 0
+        self.not_found = 0
+        self.window_start = 0.0
+        self.window_count = 0
+    
+    def to_dict(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'served': self.served,
+            'not_modified': self.not_modified,
+            'errors': self.errors,
+            'throttled': self.throttled,
+            'not_found': self.not_found,
+        }
+
+
+class ReplayServer:
+    """
+    Threaded HTTP server replaying a CaptureStore
+    
+    Honours If-None-Match / If-Modified-Since against the captured ETag and
+    Last-Modified, so incremental crawls can be exercised as well.
+    """
+    
+    def __init__(
+        self,
+        store: CaptureStore,
+        profile: Optional[ReplayProfile] = None,
+        host: str = '127.0.0.1',
+        port: int = 0
+    ):
+        self.store = store
+        self.profile = profile or PROFILES['fast']
+        self.counters: Dict[str, _HostCounters] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+    
+    @property
+    def url(self) -> str:
+        """Base URL to use as HTTP_REPLAY_URL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def _handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def do_GET(self):
+                server._serve(self)
+        
+        return Handler
+    
+    def _throttled(self, counters: _HostCounters) -> bool:
+        if self.profile.throttle_rps <= 0:
+            return False
+        now = time.monotonic()
+        if now - counters.window_start >= 1.0:
+            counters.window_start = now
+            counters.window_count = 0
+        counters.window_count += 1
+        return counters.window_count > self.profile.throttle_rps
+    
+    def _serve(self, request: BaseHTTPRequestHandler) -> None:
+        url = original_url(request.path)
+        host = url.split('/')[2]
+        with self._lock:
+            counters = self.counters.setdefault(host, _HostCounters())
+            counters.requests += 1
+            throttled = self._throttled(counters)
+            if throttled:
+                counters.throttled += 1
+        
+        time.sleep(self.profile.delay())
+        if throttled:
+            return self._send(request, 429, {'Retry-After': '1'}, b'')
+        if self.profile.error_rate and random.random() < self.profile.error_rate:
+            with self._lock:
+                counters.errors += 1
+            return self._send(request, 503, {}, b'')
+        
+        capture = self.store.load(url)
+        if capture is None:
+            with self._lock:
+                counters.not_found += 1
+            return self._send(request, 404, {}, b'')
+        
+        status_code, headers, body = capture
+        etag = headers.get('etag')
+        last_modified = headers.get('last-modified')
+        if (etag and request.headers.get('If-None-Match') == etag) or (
+            last_modified and request.headers.get('If-Modified-Since') == last_modified
+        ):
+            with self._lock:
+                counters.not_modified += 1
+            return self._send(request, 304, {k: v for k, v in headers.items() if k != 'content-type'}, b'')
+        
+        with self._lock:
+            counters.served += 1
+        self._send(request, status_code, headers, body)
+    
+    @staticmethod
+    def _send(request: BaseHTTPRequestHandler, status_code: int, headers: Dict[str, str], body: bytes) -> None:
+        request.send_response(status_code)
+        for name, value in headers.items():
+            request.send_header(name, value)
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        if body:
+            request.wfile.write(body)
+    
+    def start(self) -> "ReplayServer":
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop serving and close the socket"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def stats(self) -> Dict[str, Dict]:
+        """Get request counters per host"""
+        with self._lock:
+            return {host: counters.to_dict() for host, counters in self.counters.items()}
+    
+    def reset_stats(self) -> None:
+        """Reset request counters"""
+        with self._lock:
+            self.counters.clear()
+
+
+def seed_captures(store: CaptureStore, pages: int = 5) -> Dict[str, List[str]]:
+    """
+    Create captures for every platform in ScraperFactory from the HTML fixtures
+    
+    Each platform gets `pages` search result pages and as many job pages
+    under its base_url.
+    
+    Args:
+        store: Capture store to fill
+        pages: Search result pages per platform
+    
+    Returns:
+        Captured URLs per platform
+    """
+    search_html = (FIXTURES_DIR / 'search_results.html').read_bytes()
+    detail_html = (FIXTURES_DIR / 'job_detail.html').read_bytes()
+    headers = {'content-type': 'text/html; charset=utf-8'}
+    
+    urls: Dict[str, List[str]] = {}
+    for platform, scraper_class in ScraperFactory._scrapers.items():
+        base_url = scraper_class.base_url or f"https://{platform}.example"
+        urls[platform] = []
+        for page in range(pages):
+            for url, body in (
+                (f"{base_url}/replay/search?page={page}", search_html),
+                (f"{base_url}/replay/job/{page}", detail_html),
+            ):
+                store.save(url, 200, {**headers, 'etag': f'"{platform}-{page}-{len(body)}"'}, body)
+                urls[platform].append(url)
+    return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['seed', 'serve'])
+    parser.add_argument('--captures', default='captures')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='realistic')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pages', type=int, default=5, help='Search pages per platform (seed)')
+    args = parser.parse_args()
+    
+    store = CaptureStore(args.captures)
+    if args.command == 'seed':
+        urls = seed_captures(store, args.pages)
+        print(f"Seeded {sum(len(u) for u in urls.values())} pages for {len(urls)} platforms in {args.captures}")
+        return
+    
+    server = ReplayServer(store, PROFILES[args.profile], args.host, args.port).start()
+    print(f"Replaying {args.captures} on {server.url} (profile: {args.profile}); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 Application Configuration
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -36,6 +36,94 @@ class Settings(BaseSettings):
         "job_teaser",
         "welcome_to_the_jungle"
     ]
+    JOB_SEARCH_PLATFORM_TIMEOUT: float = 15.0  # Seconds allowed per platform
+    JOB_SEARCH_MAX_WORKERS: int = 8  # Threads parsing large scraped pages
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_TTL: int = 600  # Seconds raw platform results are reused
+    SEARCH_CACHE_MAX_SIZE: int = 1000  # Entries before LRU eviction
+    JOB_STORE_ENABLED: bool = True  # Upsert scraped jobs into job_listings
+    JOB_INDEX_ENABLED: bool = True  # In-memory inverted index (BM25) over job_listings
+    JOB_INDEX_CANDIDATES: int = 500  # Listings retrieved by BM25 before JobMatcher scoring
+    FULLTEXT_LANGUAGES: List[str] = ["french", "english"]  # Stemming of database full-text search
+    SIMILARITY_ENABLED: bool = True  # Hashed TF-IDF resume/job similarity in relevance scores
+    SIMILARITY_HASH_BITS: int = 18  # Hashed TF-IDF dimensions (2**bits)
+    SIMILARITY_FULL_SCORE: float = 0.4  # Resume/job cosine similarity worth every similarity point
+    
+    # Search ingestion pipeline (fetch -> parse -> normalize -> dedupe -> score -> persist)
+    PIPELINE_QUEUE_SIZE: int = 100  # Items buffered before a stage blocks the one upstream
+    PIPELINE_CONCURRENCY: Dict[str, int] = {
+        "fetch": 8,
+        "parse": 2,
+        "normalize": 1,
+        "score": 1,
+        "persist": 1,
+    }
+    PIPELINE_PERSIST_BATCH: int = 200  # Jobs upserted per DB write
+    
+    # Background crawler (pre-fetches jobs for all saved search criteria)
+    CRAWLER_ENABLED: bool = True
+    CRAWLER_INTERVAL: int = 1800  # Seconds between two crawls of the same query
+    CRAWLER_POLL_INTERVAL: int = 60  # Seconds between scans of saved criteria
+    CRAWLER_CONCURRENCY: int = 4  # Crawl tasks running at once
+    CRAWLER_MAX_RESULTS: int = 100  # Results fetched per platform query
+    CRAWLER_TASK_TIMEOUT: float = 60.0  # Seconds allowed per crawl task
+    CRAWLER_FRESHNESS: int = 3600  # Seconds crawled results are served from the store
+    CRAWLER_FRESHNESS_CACHE_TTL: float = 30.0  # Seconds a shared crawl time read from crawl_queue is reused
+    CRAWLER_DISTRIBUTED: bool = False  # Share crawl tasks between nodes through the crawl_queue table
+    CRAWLER_LEASE_SECONDS: float = 120.0  # Lease on a claimed task, renewed by heartbeats
+    CRAWLER_HEARTBEAT_INTERVAL: float = 30.0  # Seconds between lease renewals
+    CRAWLER_CLAIM_INTERVAL: float = 5.0  # Seconds an idle worker waits before claiming again
+    CRAWLER_RETRY_DELAY: float = 60.0  # First retry delay of a failed task (doubles per attempt)
+    PAGE_STATE_CACHE_SIZE: int = 50000  # ETag/Last-Modified entries kept in memory
+    
+    # Cache warming from search history (at startup and before peak hours)
+    CACHE_WARM_ENABLED: bool = True
+    CACHE_WARM_ON_STARTUP: bool = True
+    CACHE_WARM_HISTORY_DAYS: int = 14  # History mined for queries to warm
+    CACHE_WARM_HALF_LIFE_HOURS: float = 72.0  # Weight of a past search halves every this many hours
+    CACHE_WARM_MAX_QUERIES: int = 200  # Platform queries fetched per warming
+    CACHE_WARM_CONCURRENCY: int = 4
+    CACHE_WARM_HOURS: List[int] = []  # UTC peak hours; empty = busiest hours in the history
+    CACHE_WARM_PEAKS: int = 2  # Peak hours taken from the history
+    CACHE_WARM_LEAD_MINUTES: int = 30  # Warm this long before each peak hour
+    
+    # HTTP transport (shared by all scrapers)
+    HTTP_MAX_CONNECTIONS: int = 200
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 50
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept
+    HTTP_TIMEOUT: float = 10.0  # Seconds
+    HTTP2_ENABLED: bool = True  # Used only if the h2 package is installed
+    HTTP_RECORD_DIR: Optional[str] = None  # Save every response here (offline captures)
+    HTTP_REPLAY_URL: Optional[str] = None  # Send every request to this replay server
+    
+    # Per-platform rate limiting and circuit breaking
+    SCRAPER_RATE_LIMIT: float = 2.0  # Requests per second per platform (0 disables)
+    SCRAPER_RATE_BURST: int = 5
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures before failing fast
+    CIRCUIT_RESET_TIMEOUT: float = 60.0  # Seconds before a probe is let through
+    # Per-platform overrides of the four budgets above, e.g.
+    # {"linkedin": {"rate_limit": 0.5, "burst": 2, "failure_threshold": 3, "reset_timeout": 300}}
+    SCRAPER_BUDGETS: Dict[str, Dict[str, float]] = {}
+    
+    # HTML parsing backend: auto, selectolax, lxml or bs4
+    HTML_PARSER: str = "auto"
+    
+    # Raw page archive (content-addressed, compressed) for offline re-parsing
+    PAGE_ARCHIVE_ENABLED: bool = True
+    PAGE_ARCHIVE_DIR: str = "page_archive"
+    PAGE_ARCHIVE_COMPRESSION: str = "zstd"  # zstd (if installed) or zlib
+    PAGE_ARCHIVE_RETENTION_DAYS: int = 30  # 0 keeps everything
+    
+    # Cross-platform duplicate detection
+    DEDUPE_ENABLED: bool = True
+    DEDUPE_MAX_DISTANCE: int = 4  # Max SimHash bits apart for two listings to be copies
+    
+    # Approximate nearest neighbours over job TF-IDF vectors (random-projection LSH)
+    ANN_ENABLED: bool = True
+    ANN_INDEX_PATH: str = "job_ann.npz"  # Saved index, loaded at startup
+    ANN_BITS: int = 256  # Signature bits (random hyperplanes) per listing, a multiple of 64
+    ANN_CANDIDATES: int = 300  # Closest signatures re-ranked by exact similarity
     
     # Database
     # SQLite (default for development): sqlite:///./job_agent.db
@@ -1,7 +1,7 @@
 """
 Database Models
 """
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, BigInteger, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -103,6 +103,8 @@ class JobListing(Base):
     posted_date = Column(DateTime(timezone=True))
     expiry_date = Column(DateTime(timezone=True))
     is_active = Column(Boolean, default=True)
+    content_hash = Column(String(64))  # Hash of normalized content, unchanged rows skip writes
+    simhash = Column(BigInteger, index=True)  # SimHash of title + company + description (near-duplicate detection)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -111,6 +113,39 @@ class JobListing(Base):
     search_history = relationship("JobSearchHistory", back_populates="job_listing")
 
 
+class PageFetchState(Base):
+    """Conditional-request state of a fetched page (incremental crawling)"""
+    __tablename__ = "page_fetch_states"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String(1000), unique=True, index=True, nullable=False)
+    etag = Column(String(255))
+    last_modified = Column(String(100))  # Raw Last-Modified header
+    content_hash = Column(String(64))  # Hash of the page body
+    content_length = Column(Integer, default=0)
+    fetched_at = Column(DateTime(timezone=True))  # Last time a body was downloaded
+    checked_at = Column(DateTime(timezone=True))  # Last time the page was requested
+
+
+class CrawlQueueItem(Base):
+    """Crawl task shared by all backend nodes, claimed by one worker at a time with a lease"""
+    __tablename__ = "crawl_queue"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    query_key = Column(String(64), unique=True, index=True, nullable=False)  # Hash of (platform, keywords, location)
+    platform = Column(String(50), nullable=False)
+    keywords = Column(Text)  # JSON array
+    location = Column(String(255))
+    priority = Column(Float, default=0.0)  # Most recent activity of interested users (epoch); higher first
+    due_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    lease_owner = Column(String(100))  # Worker holding the task
+    lease_expires_at = Column(DateTime(timezone=True), index=True)
+    attempts = Column(Integer, default=0)  # Consecutive failed or abandoned claims
+    last_crawled_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class Application(Base):
     """Job application model"""
     __tablename__ = "applications"
@@ -181,6 +216,10 @@ class JobSearchHistory(Base):
     saved = Column(Boolean, default=False)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    user = relationship("User", back_populates="search_history")
+    job_listing = relationship("JobListing", back_populates="search_history")
 
 
 class SearchCriteria(Base):
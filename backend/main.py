@@ -1,12 +1,23 @@
 """
 FastAPI Backend - Main Application Entry Point
 """
+import asyncio
+from typing import Callable
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from loguru import logger
 
 from backend.api.routes import jobs, applications, ai, auth, stats, resumes, profile, search_criteria
 from backend.core.config import settings
+from backend.services.http_transport import close_transport
+from backend.services.scraper_factory import ScraperFactory
+from backend.services.cache_warmer import cache_warmer
+from backend.services.crawl_scheduler import crawl_scheduler
+from backend.services.job_index import load_job_index
+from backend.services.job_ann import job_ann, load_job_ann
+from backend.services.job_similarity import load_job_vectors
 
 app = FastAPI(
     title="AI Job Application Agent API",
@@ -21,6 +32,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Platform-Status", "X-Total-Count"],
 )
 
 # Include routers
@@ -34,6 +46,46 @@ app.include_router(applications.router, prefix="/api/applications", tags=["appli
 app.include_router(ai.router, prefix="/api/ai", tags=["ai"])
 
 
+def run_in_background(loader: Callable) -> asyncio.Future:
+    """Run a blocking loader in the default thread pool, logging its failure"""
+    def log_failure(future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.opt(exception=future.exception()).error(f"{loader.__name__} failed")
+    
+    future = asyncio.get_running_loop().run_in_executor(None, loader)
+    future.add_done_callback(log_failure)
+    return future
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Warm up long-lived services"""
+    await ScraperFactory.startup(settings.JOB_SEARCH_PLATFORMS)
+    if settings.JOB_INDEX_ENABLED:
+        # In the background: /recommended falls back to recent listings meanwhile
+        run_in_background(load_job_index)
+    if settings.SIMILARITY_ENABLED:
+        # Jobs not vectorized yet are vectorized on the fly when scored; the
+        # saved ANN index answers /similar while the vectors load
+        loader = load_job_ann if settings.ANN_ENABLED else load_job_vectors
+        run_in_background(loader)
+    if settings.CRAWLER_ENABLED:
+        crawl_scheduler.start()
+    if settings.CACHE_WARM_ENABLED:
+        cache_warmer.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release shared resources"""
+    await cache_warmer.stop()
+    await crawl_scheduler.stop()
+    await ScraperFactory.shutdown()
+    await close_transport()
+    if settings.SIMILARITY_ENABLED and settings.ANN_ENABLED and job_ann.loaded:
+        job_ann.save()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
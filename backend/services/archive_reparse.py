@@ -0,0 +1,140 @@
+"""
+Archive Re-parse - Rebuild job_listings from the page archive, offline
+
+Archived pages are split into chunks and parsed by a pool of worker
+processes with each platform's scraper extract_jobs(), so a parser fix or a
+newly extracted field can be applied to every stored page at full CPU speed
+without re-fetching anything. The parent process upserts the extracted jobs
+in batches (a single database writer).
+
+Usage:
+    python -m backend.services.archive_reparse
+    python -m backend.services.archive_reparse --platforms linkedin indeed --since 2024-05-01 --workers 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from backend.core.config import settings
+from backend.database.base import SessionLocal
+from backend.services.job_dedupe import job_signature
+from backend.services.job_store import upsert_jobs
+from backend.services.page_archive import PageArchive
+from backend.services.scraper_factory import ScraperFactory
+
+
+DEFAULT_CHUNK_SIZE = 200
+
+# Per worker process: one scraper per platform, built on first use
+_worker_scrapers: Dict[str, object] = {}
+
+
+def _parse_chunk(archive_root: str, entries: List[Dict]) -> Dict:
+    # Runs in a worker process
+    archive = PageArchive(archive_root)
+    jobs: List[Dict] = []
+    pages = 0
+    missing = 0
+    errors = 0
+    for entry in entries:
+        body = archive.get(entry['hash'])
+        if body is None:
+            missing += 1
+            continue
+        platform = entry.get('platform')
+        try:
+            if platform not in _worker_scrapers:
+                _worker_scrapers[platform] = ScraperFactory.create_scraper(platform)
+            page_jobs = _worker_scrapers[platform].extract_jobs(entry['url'], body)
+        except Exception as e:
+            errors += 1
+            logger.warning(f"Error re-parsing {entry['url']}: {e}")
+            continue
+        pages += 1
+        for job in page_jobs:
+            job['platform'] = platform
+            job.setdefault('url', entry['url'])
+            if settings.DEDUPE_ENABLED:
+                job['simhash'] = job_signature(job)
+            jobs.append(job)
+    return {'jobs': jobs, 'pages': pages, 'missing': missing, 'errors': errors}
+
+
+def reparse_archive(
+    archive: Optional[PageArchive] = None,
+    platforms: Optional[List[str]] = None,
+    since: Optional[datetime] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Dict:
+    """
+    Re-parse archived pages and upsert the extracted jobs into job_listings
+    
+    Only the most recent capture of each URL is parsed.
+    
+    Args:
+        archive: Page archive (defaults to PAGE_ARCHIVE_DIR)
+        platforms: Only pages of these platforms
+        since: Only pages fetched at or after this time
+        workers: Worker processes (defaults to the CPU count)
+        chunk_size: Pages per worker task
+    
+    Returns:
+        Dictionary with pages parsed, jobs extracted, rows written/skipped,
+        missing bodies, parse errors, elapsed seconds and pages per second
+    """
+    archive = archive or PageArchive(settings.PAGE_ARCHIVE_DIR)
+    workers = workers or os.cpu_count() or 1
+    entries = list(archive.entries(platforms=platforms, since=since))
+    chunks = [entries[i:i + chunk_size] for i in range(0, len(entries), chunk_size)]
+    
+    totals = {'pages': 0, 'jobs': 0, 'rows_written': 0, 'rows_skipped': 0, 'missing': 0, 'errors': 0}
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_parse_chunk, str(archive.root), chunk) for chunk in chunks]
+            for future in futures:
+                result = future.result()
+                totals['pages'] += result['pages']
+                totals['missing'] += result['missing']
+                totals['errors'] += result['errors']
+                totals['jobs'] += len(result['jobs'])
+                if result['jobs']:
+                    stats = upsert_jobs(db, result['jobs'])
+                    totals['rows_written'] += stats['rows_written']
+                    totals['rows_skipped'] += stats['rows_skipped']
+    finally:
+        db.close()
+    
+    elapsed = time.perf_counter() - started
+    totals['elapsed_s'] = round(elapsed, 2)
+    totals['pages_per_second'] = round(totals['pages'] / elapsed, 1) if elapsed > 0 else 0.0
+    logger.info(
+        f"Re-parsed {totals['pages']} archived pages into {totals['jobs']} jobs "
+        f"({totals['rows_written']} rows written) in {totals['elapsed_s']}s with {workers} workers"
+    )
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--archive', default=settings.PAGE_ARCHIVE_DIR)
+    parser.add_argument('--platforms', nargs='*', default=None)
+    parser.add_argument('--since', default=None, help='Only pages fetched on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+    
+    since = datetime.fromisoformat(args.since).replace(tzinfo=timezone.utc) if args.since else None
+    totals = reparse_archive(PageArchive(args.archive), args.platforms, since, args.workers, args.chunk_size)
+    print(totals)
+
+
+if __name__ == "__main__":
+    main()
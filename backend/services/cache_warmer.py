@@ -0,0 +1,326 @@
+"""
+Cache Warmer - Pre-fetch the most searched queries from JobSearchHistory
+
+Every search is recorded in job_search_history (one row per platform).
+The warmer ranks past queries by recency-weighted frequency, and fetches
+the top ones into the search cache and the job store at startup and ahead
+of the busiest hours of the day, so the first users after a deploy or at
+peak time are served without waiting on live scraping.
+
+The expected hit rate is the share of past searches that the warmed
+queries cover; the actual hit rate is the share of searches since the
+last warming served from the cache or the store.
+"""
+import asyncio
+import json
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set
+
+from loguru import logger
+
+from backend.core.config import settings
+from backend.database.base import SessionLocal
+from backend.database.models import JobSearchHistory, Platform
+from backend.services.job_search import refresh_platform
+from backend.services.scraper_factory import ScraperFactory
+from backend.services.search_cache import QueryKey, make_key, make_query_key, search_cache
+
+
+def _keyword_list(value: Optional[str]) -> List[str]:
+    # Stored as a JSON array; older rows may hold a comma-separated string
+    if not value:
+        return []
+    try:
+        keywords = json.loads(value)
+    except ValueError:
+        return [k.strip() for k in value.split(',') if k.strip()]
+    return [k for k in keywords if isinstance(k, str)] if isinstance(keywords, list) else []
+
+
+def _write_history(user_id: int, keywords: List[str], location: str, statuses: List[Dict]) -> None:
+    db = SessionLocal()
+    try:
+        for status in statuses:
+            try:
+                platform = Platform(status['platform'])
+            except ValueError:
+                continue
+            db.add(JobSearchHistory(
+                user_id=user_id,
+                keywords=json.dumps(keywords)[:500],
+                location=(location or '')[:255],
+                platform=platform,
+                total_results=status.get('count', 0),
+            ))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error recording search history: {e}")
+    finally:
+        db.close()
+
+
+class WarmQuery:
+    """A past query ranked for warming"""
+    
+    def __init__(self, key: QueryKey):
+        self.key = key
+        self.platform, keywords, self.location = key
+        self.keywords = list(keywords)
+        self.searches = 0
+        self.score = 0.0  # Searches weighted by recency (half-life CACHE_WARM_HALF_LIFE_HOURS)
+        self.last_searched_at: Optional[datetime] = None
+
+
+class CacheWarmer:
+    """
+    Mines search history and warms the cache and job store with it
+    
+    Runs once at startup (CACHE_WARM_ON_STARTUP) and then
+    CACHE_WARM_LEAD_MINUTES before each of CACHE_WARM_HOURS (UTC), or
+    before the CACHE_WARM_PEAKS busiest hours found in the history when no
+    hours are configured.
+    """
+    
+    def __init__(
+        self,
+        max_queries: Optional[int] = None,
+        history_days: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ):
+        self.max_queries = max_queries or settings.CACHE_WARM_MAX_QUERIES
+        self.history_days = history_days or settings.CACHE_WARM_HISTORY_DAYS
+        self.concurrency = concurrency or settings.CACHE_WARM_CONCURRENCY
+        
+        self._runner: Optional[asyncio.Task] = None
+        self.warmed: Set[QueryKey] = set()
+        self.peak_hours: List[int] = []
+        self.runs = 0
+        self.last_warm_at: Optional[float] = None
+        self.last_warm_s = 0.0
+        self.next_warm_at: Optional[float] = None
+        self.queries_warmed = 0
+        self.queries_failed = 0
+        self.expected_hit_rate: Optional[float] = None
+        
+        # Searches observed since the last warming
+        self.lookups = 0
+        self.hits = 0
+        self.warmed_lookups = 0
+        self.warmed_hits = 0
+    
+    def mine(self, db, now: Optional[datetime] = None) -> List[WarmQuery]:
+        """
+        Rank the queries searched within CACHE_WARM_HISTORY_DAYS
+        
+        Also updates peak_hours (busiest UTC hours of the period) and
+        expected_hit_rate (share of the period's searches covered by the
+        top max_queries queries).
+        
+        Args:
+            db: Database session
+            now: Reference time (defaults to now)
+        
+        Returns:
+            Top queries, best first
+        """
+        now = now or datetime.now(timezone.utc)
+        half_life = settings.CACHE_WARM_HALF_LIFE_HOURS * 3600
+        rows = db.query(
+            JobSearchHistory.platform, JobSearchHistory.keywords,
+            JobSearchHistory.location, JobSearchHistory.created_at
+        ).filter(
+            JobSearchHistory.created_at >= now - timedelta(days=self.history_days)
+        ).all()
+        
+        queries: Dict[QueryKey, WarmQuery] = {}
+        hours: Counter = Counter()
+        for platform, keywords, location, created_at in rows:
+            if platform is None or not ScraperFactory.is_platform_supported(platform.value):
+                continue
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            key = make_query_key(platform.value, _keyword_list(keywords), location or '')
+            query = queries.get(key)
+            if query is None:
+                query = queries[key] = WarmQuery(key)
+            query.searches += 1
+            query.score += 0.5 ** (max(0.0, (now - created_at).total_seconds()) / half_life)
+            if query.last_searched_at is None or created_at > query.last_searched_at:
+                query.last_searched_at = created_at
+            hours[created_at.hour] += 1
+        
+        ranked = sorted(queries.values(), key=lambda q: q.score, reverse=True)[:self.max_queries]
+        total = sum(q.searches for q in queries.values())
+        self.expected_hit_rate = round(sum(q.searches for q in ranked) / total, 3) if total else None
+        self.peak_hours = sorted(hour for hour, _ in hours.most_common(settings.CACHE_WARM_PEAKS))
+        return ranked
+    
+    def _load_queries(self) -> List[WarmQuery]:
+        db = SessionLocal()
+        try:
+            return self.mine(db)
+        finally:
+            db.close()
+    
+    async def warm(self) -> Dict:
+        """
+        Mine the history and fetch the top queries
+        
+        Each query goes through the search cache's single-flight fetch, so a
+        user searching the same query meanwhile waits on the warming fetch
+        instead of starting another one.
+        
+        Returns:
+            Warming statistics
+        """
+        started = time.perf_counter()
+        queries = await asyncio.get_running_loop().run_in_executor(None, self._load_queries)
+        max_results = settings.DEFAULT_MAX_RESULTS
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def warm_query(query: WarmQuery) -> bool:
+            async def fetch():
+                jobs, _ = await refresh_platform(query.platform, query.keywords, query.location, max_results)
+                return jobs
+            
+            async with semaphore:
+                try:
+                    await asyncio.wait_for(
+                        search_cache.get_or_fetch(make_key(query.platform, query.keywords, query.location, max_results), fetch),
+                        timeout=settings.CRAWLER_TASK_TIMEOUT
+                    )
+                    return True
+                except Exception as e:
+                    logger.warning(f"Warming {query.platform} {query.keywords} {query.location!r} failed: {e!r}")
+                    return False
+        
+        if self.lookups:
+            logger.info(f"Cache warming since last run: {self.hit_rates()}")
+        results = await asyncio.gather(*[warm_query(query) for query in queries])
+        
+        self.warmed = {query.key for query, ok in zip(queries, results) if ok}
+        self.queries_warmed = sum(results)
+        self.queries_failed = len(results) - self.queries_warmed
+        self.runs += 1
+        self.last_warm_at = time.time()
+        self.last_warm_s = round(time.perf_counter() - started, 2)
+        self.lookups = self.hits = self.warmed_lookups = self.warmed_hits = 0
+        logger.info(
+            f"Warmed {self.queries_warmed} queries ({self.queries_failed} failed) in {self.last_warm_s}s, "
+            f"expected hit rate {self.expected_hit_rate}"
+        )
+        return self.stats()
+    
+    def observe(self, keywords: List[str], location: str, status: Dict) -> None:
+        """
+        Count a platform search for the actual hit rate
+        
+        Args:
+            keywords: Search keywords
+            location: Search location
+            status: Platform status from search_platform()
+        """
+        if status.get('status') == 'unsupported':
+            return
+        hit = status.get('source') == 'store' or status.get('cache') in ('hit', 'coalesced')
+        warmed = make_query_key(status['platform'], keywords, location) in self.warmed
+        self.lookups += 1
+        self.hits += hit
+        self.warmed_lookups += warmed
+        self.warmed_hits += hit and warmed
+    
+    async def record_search(self, user_id: int, keywords: List[str], location: str, statuses: List[Dict]) -> None:
+        """
+        Record a search in job_search_history (in the background) and observe it
+        
+        Args:
+            user_id: User who searched
+            keywords: Search keywords
+            location: Search location
+            statuses: Per-platform statuses of the search
+        """
+        for status in statuses:
+            self.observe(keywords, location, status)
+        asyncio.get_running_loop().run_in_executor(None, _write_history, user_id, keywords, location, statuses)
+    
+    def hit_rates(self) -> Dict:
+        """Get the expected hit rate of the last warming and the hit rates observed since"""
+        return {
+            'expected_hit_rate': self.expected_hit_rate,
+            'actual_hit_rate': round(self.hits / self.lookups, 3) if self.lookups else None,
+            'actual_coverage': round(self.warmed_lookups / self.lookups, 3) if self.lookups else None,
+            'warmed_hit_rate': round(self.warmed_hits / self.warmed_lookups, 3) if self.warmed_lookups else None,
+            'lookups': self.lookups,
+        }
+    
+    def _next_warm_at(self, now: datetime) -> datetime:
+        hours = settings.CACHE_WARM_HOURS or self.peak_hours or [8]
+        lead = timedelta(minutes=settings.CACHE_WARM_LEAD_MINUTES)
+        candidates = []
+        for day in (0, 1):
+            for hour in hours:
+                at = now.replace(hour=hour, minute=0, second=0, microsecond=0) + timedelta(days=day) - lead
+                if at > now:
+                    candidates.append(at)
+        return min(candidates)
+    
+    @property
+    def is_running(self) -> bool:
+        return self._runner is not None and not self._runner.done()
+    
+    def start(self) -> None:
+        """Warm now (if CACHE_WARM_ON_STARTUP) and then before each peak, in the background"""
+        if not self.is_running:
+            self._runner = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the warming loop"""
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+    
+    async def _run(self) -> None:
+        if settings.CACHE_WARM_ON_STARTUP:
+            try:
+                await self.warm()
+            except Exception as e:
+                logger.error(f"Error warming the search cache: {e}")
+        while True:
+            now = datetime.now(timezone.utc)
+            next_at = self._next_warm_at(now)
+            self.next_warm_at = next_at.timestamp()
+            await asyncio.sleep((next_at - now).total_seconds())
+            try:
+                await self.warm()
+            except Exception as e:
+                logger.error(f"Error warming the search cache: {e}")
+    
+    def stats(self) -> Dict:
+        """
+        Get warming statistics and expected versus actual hit rates
+        
+        actual_hit_rate counts every platform search since the last warming
+        served from the cache or the store; actual_coverage is the share of
+        those searches on warmed queries, to compare with expected_hit_rate.
+        
+        Returns:
+            Dictionary with warming statistics
+        """
+        return {
+            'running': self.is_running,
+            'runs': self.runs,
+            'last_warm_at': self.last_warm_at,
+            'last_warm_s': self.last_warm_s,
+            'next_warm_at': self.next_warm_at,
+            'peak_hours': self.peak_hours,
+            'queries_warmed': self.queries_warmed,
+            'queries_failed': self.queries_failed,
+            **self.hit_rates(),
+        }
+
+
+cache_warmer = CacheWarmer()
@@ -0,0 +1,350 @@
+"""
+Crawl Queue - Database-backed crawl tasks with leases, shared by all nodes
+
+Every backend node enqueues the crawl tasks of the saved search criteria
+into the crawl_queue table (an idempotent upsert), and any crawl worker
+on any node claims due tasks from it. A claim takes a lease: on PostgreSQL
+with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent workers never wait
+on or claim the same rows; on SQLite with a single UPDATE ... RETURNING,
+which SQLite's write lock makes atomic. Workers renew their lease with
+heartbeats while crawling; a task whose lease expired (crashed or stuck
+worker) is claimable again. Each query is therefore fetched by one worker
+at a time, and crawl capacity grows with the number of workers.
+"""
+import hashlib
+import json
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from backend.core.config import settings
+from backend.database.base import SessionLocal
+from backend.database.models import CrawlQueueItem
+
+
+def make_worker_id() -> str:
+    """Unique ID of a crawl worker: host, process and a random suffix"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def queue_key(platform: str, keywords: List[str], location: str) -> str:
+    """Hash of a normalized (platform, keywords, location) query key"""
+    return hashlib.sha1(json.dumps([platform, list(keywords), location]).encode('utf-8')).hexdigest()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class CrawlQueue:
+    """
+    Lease-based crawl task queue in the crawl_queue table
+    
+    Node clocks are assumed to be roughly in sync (NTP); leases should be
+    much longer than the clock skew between nodes.
+    """
+    
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        worker_id: Optional[str] = None,
+        lease_seconds: Optional[float] = None,
+        retry_delay: Optional[float] = None
+    ):
+        self.session_factory = session_factory
+        self._worker_id = worker_id
+        self._worker_pid = os.getpid()
+        self.lease_seconds = lease_seconds or settings.CRAWLER_LEASE_SECONDS
+        self.retry_delay = retry_delay or settings.CRAWLER_RETRY_DELAY
+        
+        self.claimed = 0
+        self.completed = 0
+        self.failed = 0
+        self.lost_leases = 0
+    
+    @property
+    def worker_id(self) -> str:
+        # Generated per process, so forked workers never share an ID
+        if self._worker_id is None or self._worker_pid != os.getpid():
+            self._worker_id = make_worker_id()
+            self._worker_pid = os.getpid()
+        return self._worker_id
+    
+    def enqueue(self, tasks: Iterable, prune: bool = True) -> int:
+        """
+        Add crawl tasks, or refresh the priority of those already queued
+        
+        Args:
+            tasks: Objects with platform, keywords, location and last_active
+            prune: Delete unleased tasks no longer in `tasks`
+        
+        Returns:
+            Number of tasks given
+        """
+        now = _utcnow()
+        rows = {}
+        for task in tasks:
+            key = queue_key(task.platform, task.keywords, task.location)
+            rows[key] = {
+                'query_key': key,
+                'platform': task.platform,
+                'keywords': json.dumps(list(task.keywords)),
+                'location': task.location,
+                'priority': task.last_active,
+                'due_at': now,
+                'attempts': 0,
+            }
+        
+        db = self.session_factory()
+        try:
+            dialect = db.bind.dialect.name
+            insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert if dialect == 'sqlite' else None
+            if rows and insert is not None:
+                stmt = insert(CrawlQueueItem.__table__)
+                db.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=[CrawlQueueItem.__table__.c.query_key],
+                        set_={'priority': stmt.excluded.priority}
+                    ),
+                    list(rows.values())
+                )
+            elif rows:
+                existing = {
+                    item.query_key: item
+                    for item in db.query(CrawlQueueItem).filter(CrawlQueueItem.query_key.in_(list(rows)))
+                }
+                for key, row in rows.items():
+                    if key in existing:
+                        existing[key].priority = row['priority']
+                    else:
+                        db.add(CrawlQueueItem(**row))
+            if prune:
+                db.execute(
+                    delete(CrawlQueueItem).where(
+                        CrawlQueueItem.query_key.notin_(list(rows)),
+                        CrawlQueueItem.lease_owner.is_(None)
+                    )
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return len(rows)
+    
+    def _claimable(self, now: datetime):
+        return and_(
+            CrawlQueueItem.due_at <= now,
+            or_(CrawlQueueItem.lease_expires_at.is_(None), CrawlQueueItem.lease_expires_at < now)
+        )
+    
+    def claim(self, limit: int = 1) -> List[Dict]:
+        """
+        Lease up to `limit` due tasks, highest priority first
+        
+        Tasks with an expired lease are claimable too; their previous
+        holder finds out at its next heartbeat.
+        
+        Args:
+            limit: Maximum number of tasks to claim
+        
+        Returns:
+            Claimed tasks as dictionaries (id, platform, keywords, location, attempts)
+        """
+        now = _utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        db = self.session_factory()
+        try:
+            dialect = db.bind.dialect.name
+            candidates = select(CrawlQueueItem.id).where(self._claimable(now)).order_by(
+                CrawlQueueItem.priority.desc(), CrawlQueueItem.due_at
+            ).limit(limit)
+            
+            if dialect in ('postgresql', 'sqlite'):
+                if dialect == 'postgresql':
+                    candidates = candidates.with_for_update(skip_locked=True)
+                rows = db.execute(
+                    update(CrawlQueueItem)
+                    .where(CrawlQueueItem.id.in_(candidates.scalar_subquery()))
+                    .values(
+                        lease_owner=self.worker_id,
+                        lease_expires_at=expires_at,
+                        attempts=CrawlQueueItem.attempts + 1
+                    )
+                    .returning(
+                        CrawlQueueItem.id, CrawlQueueItem.platform, CrawlQueueItem.keywords,
+                        CrawlQueueItem.location, CrawlQueueItem.attempts
+                    )
+                ).all()
+            else:
+                # Compare-and-set each candidate: only one worker's UPDATE matches
+                rows = []
+                for task_id in db.execute(candidates).scalars().all():
+                    result = db.execute(
+                        update(CrawlQueueItem)
+                        .where(CrawlQueueItem.id == task_id, self._claimable(now))
+                        .values(
+                            lease_owner=self.worker_id,
+                            lease_expires_at=expires_at,
+                            attempts=CrawlQueueItem.attempts + 1
+                        )
+                    )
+                    if result.rowcount == 1:
+                        item = db.get(CrawlQueueItem, task_id)
+                        rows.append((item.id, item.platform, item.keywords, item.location, item.attempts))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        
+        self.claimed += len(rows)
+        return [{
+            'id': row[0],
+            'platform': row[1],
+            'keywords': json.loads(row[2]) if row[2] else [],
+            'location': row[3] or '',
+            'attempts': row[4],
+        } for row in rows]
+    
+    def _update_own(self, task_id: int, **values) -> bool:
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                update(CrawlQueueItem)
+                .where(CrawlQueueItem.id == task_id, CrawlQueueItem.lease_owner == self.worker_id)
+                .values(**values)
+            )
+            db.commit()
+            return result.rowcount == 1
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def heartbeat(self, task_id: int) -> bool:
+        """
+        Renew the lease of a claimed task
+        
+        Args:
+            task_id: Claimed task ID
+        
+        Returns:
+            False if the lease was lost (expired and claimed by another worker)
+        """
+        renewed = self._update_own(
+            task_id, lease_expires_at=_utcnow() + timedelta(seconds=self.lease_seconds)
+        )
+        if not renewed:
+            self.lost_leases += 1
+            logger.warning(f"Crawl worker {self.worker_id} lost the lease of task {task_id}")
+        return renewed
+    
+    def complete(self, task_id: int, interval: float, error: Optional[str] = None) -> bool:
+        """
+        Release a claimed task and schedule its next crawl
+        
+        A successful task is due again after `interval`; a failed one after
+        an exponential backoff from CRAWLER_RETRY_DELAY, capped at `interval`.
+        
+        Args:
+            task_id: Claimed task ID
+            interval: Seconds between two crawls of the task
+            error: Error message if the crawl failed
+        
+        Returns:
+            False if the lease had already been lost
+        """
+        now = _utcnow()
+        if error is None:
+            values = {
+                'due_at': now + timedelta(seconds=interval),
+                'last_crawled_at': now,
+                'last_error': None,
+                'attempts': 0,
+            }
+            self.completed += 1
+        else:
+            db = self.session_factory()
+            try:
+                attempts = db.execute(
+                    select(CrawlQueueItem.attempts).where(CrawlQueueItem.id == task_id)
+                ).scalar() or 1
+            finally:
+                db.close()
+            delay = min(interval, self.retry_delay * 2 ** (attempts - 1))
+            values = {'due_at': now + timedelta(seconds=delay), 'last_error': error[:1000]}
+            self.failed += 1
+        return self._update_own(task_id, lease_owner=None, lease_expires_at=None, **values)
+    
+    def release(self, task_id: int) -> bool:
+        """Give a claimed task back without crawling it (e.g. on shutdown)"""
+        return self._update_own(
+            task_id, lease_owner=None, lease_expires_at=None, attempts=CrawlQueueItem.attempts - 1
+        )
+    
+    def last_crawled(self, query_key: str) -> Optional[datetime]:
+        """
+        When a query was last crawled successfully, by any worker
+        
+        Args:
+            query_key: Key from queue_key()
+        
+        Returns:
+            Time of the last successful crawl (UTC), or None
+        """
+        db = self.session_factory()
+        try:
+            crawled_at = db.execute(
+                select(CrawlQueueItem.last_crawled_at).where(CrawlQueueItem.query_key == query_key)
+            ).scalar()
+        finally:
+            db.close()
+        if crawled_at is not None and crawled_at.tzinfo is None:
+            crawled_at = crawled_at.replace(tzinfo=timezone.utc)  # SQLite drops the offset
+        return crawled_at
+    
+    def stats(self) -> Dict:
+        """
+        Get the queue state and this node's counters
+        
+        Returns:
+            Dictionary with task counts (total, due, leased, expired leases)
+            and the claims, completions, failures and lost leases of this worker
+        """
+        now = _utcnow()
+        db = self.session_factory()
+        try:
+            total, due, leased, expired = db.execute(select(
+                func.count(CrawlQueueItem.id),
+                func.count(CrawlQueueItem.id).filter(self._claimable(now)),
+                func.count(CrawlQueueItem.id).filter(CrawlQueueItem.lease_expires_at >= now),
+                func.count(CrawlQueueItem.id).filter(
+                    CrawlQueueItem.lease_owner.isnot(None), CrawlQueueItem.lease_expires_at < now
+                ),
+            )).one()
+        finally:
+            db.close()
+        return {
+            'worker_id': self.worker_id,
+            'tasks': total,
+            'due': due,
+            'leased': leased,
+            'expired_leases': expired,
+            'claimed': self.claimed,
+            'completed': self.completed,
+            'failed': self.failed,
+            'lost_leases': self.lost_leases,
+        }
+
+
+crawl_queue = CrawlQueue()
@@ -0,0 +1,345 @@
+"""
+Crawl Scheduler - Background pre-fetching of jobs for saved search criteria
+"""
+import asyncio
+import itertools
+import json
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+
+from loguru import logger
+from sqlalchemy import func
+
+from backend.core.config import settings
+from backend.database.base import SessionLocal
+from backend.database.models import JobSearchHistory, SearchCriteria, User
+from backend.services.crawl_queue import CrawlQueue, crawl_queue
+from backend.services.incremental_crawl import CrawlStats
+from backend.services.job_search import DEFAULT_PLATFORMS, refresh_platform
+from backend.services.scraper_factory import ScraperFactory
+from backend.services.search_cache import QueryKey, make_query_key
+
+
+class CrawlTask:
+    """One upstream query shared by every user whose criteria produce it"""
+    
+    def __init__(self, platform: str, keywords: List[str], location: str):
+        self.key: QueryKey = make_query_key(platform, keywords, location)
+        self.platform = self.key[0]
+        self.keywords = list(self.key[1])
+        self.location = self.key[2]
+        self.user_ids: Set[int] = set()
+        self.last_active = 0.0  # Most recent activity of any interested user (epoch)
+        self.due_at = 0.0  # When the task became due (monotonic)
+        self.started_at: Optional[float] = None
+    
+    def add_user(self, user_id: int, last_active: float) -> None:
+        self.user_ids.add(user_id)
+        self.last_active = max(self.last_active, last_active)
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    if value is None:
+        return 0.0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _json_list(value: Optional[str]) -> List[str]:
+    try:
+        items = json.loads(value) if value else []
+    except ValueError:
+        return []
+    return [item for item in items if isinstance(item, str)] if isinstance(items, list) else []
+
+
+def load_crawl_tasks(db) -> List[CrawlTask]:
+    """
+    Build the merged crawl tasks for all saved search criteria
+    
+    Criteria of several users that resolve to the same (platform, keywords,
+    location) become one task. Each task is prioritized by the most recent
+    activity of its users (last search, criteria update or account update).
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        List of crawl tasks
+    """
+    last_search = db.query(
+        JobSearchHistory.user_id,
+        func.max(JobSearchHistory.created_at).label('last_search')
+    ).group_by(JobSearchHistory.user_id).subquery()
+    
+    rows = db.query(
+        SearchCriteria, User.updated_at, last_search.c.last_search
+    ).join(
+        User, User.id == SearchCriteria.user_id
+    ).outerjoin(
+        last_search, last_search.c.user_id == SearchCriteria.user_id
+    ).filter(User.is_active == True).all()
+    
+    tasks: Dict[QueryKey, CrawlTask] = {}
+    for criteria, user_updated_at, last_search_at in rows:
+        keywords = _json_list(criteria.required_keywords)
+        if not keywords and criteria.domain:
+            keywords = [criteria.domain]
+        location = criteria.location or ''
+        if not keywords and not location:
+            continue
+        
+        last_active = max(
+            _timestamp(last_search_at),
+            _timestamp(criteria.updated_at),
+            _timestamp(criteria.created_at),
+            _timestamp(user_updated_at),
+        )
+        platforms = _json_list(criteria.platforms) or DEFAULT_PLATFORMS
+        for platform in platforms:
+            if not ScraperFactory.is_platform_supported(platform):
+                continue
+            key = make_query_key(platform, keywords, location)
+            if key not in tasks:
+                tasks[key] = CrawlTask(platform, keywords, location)
+            tasks[key].add_user(criteria.user_id, last_active)
+    
+    return list(tasks.values())
+
+
+class CrawlScheduler:
+    """
+    Periodically crawls every saved search into the job store
+    
+    Every CRAWLER_POLL_INTERVAL seconds the scheduler rebuilds the merged
+    task list and queues the tasks not crawled within CRAWLER_INTERVAL.
+    CRAWLER_CONCURRENCY workers drain the queue, most recently active users
+    first. Crawled queries are then served to users from the store.
+    
+    With CRAWLER_DISTRIBUTED, the tasks go to the shared crawl_queue table
+    instead and workers claim them with a lease, so several nodes (or
+    processes) crawl together without fetching the same query twice.
+    """
+    
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        max_results: Optional[int] = None,
+        queue: Optional[CrawlQueue] = None
+    ):
+        self.interval = interval or settings.CRAWLER_INTERVAL
+        self.poll_interval = poll_interval or settings.CRAWLER_POLL_INTERVAL
+        self.concurrency = concurrency or settings.CRAWLER_CONCURRENCY
+        self.max_results = max_results or settings.CRAWLER_MAX_RESULTS
+        # Shared task table when distributed, in-process priority queue otherwise
+        self.shared_queue = queue or (crawl_queue if settings.CRAWLER_DISTRIBUTED else None)
+        
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._pending: Dict[QueryKey, CrawlTask] = {}
+        self._last_crawled: Dict[QueryKey, float] = {}
+        self._sequence = itertools.count()
+        self._runner: Optional[asyncio.Task] = None
+        self._workers: List[asyncio.Task] = []
+        
+        self.completed = 0
+        self.failed = 0
+        self.jobs_fetched = 0
+        self.totals = CrawlStats()  # Bytes and rows fetched or saved by all crawls
+        self.last_schedule_at: Optional[float] = None
+    
+    @property
+    def is_running(self) -> bool:
+        return self._runner is not None and not self._runner.done()
+    
+    def start(self) -> None:
+        """Start the scheduler loop and its workers on the running event loop"""
+        if self.is_running:
+            return
+        self._queue = asyncio.PriorityQueue()
+        worker = self._lease_worker if self.shared_queue is not None else self._worker
+        self._workers = [
+            asyncio.create_task(worker()) for _ in range(self.concurrency)
+        ]
+        self._runner = asyncio.create_task(self._run())
+        logger.info(
+            f"Crawl scheduler started (interval={self.interval}s, "
+            f"concurrency={self.concurrency}, distributed={self.shared_queue is not None})"
+        )
+    
+    async def stop(self) -> None:
+        """Stop the scheduler loop and cancel in-flight crawls"""
+        tasks = [t for t in [self._runner, *self._workers] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._runner = None
+        self._workers = []
+        self._pending.clear()
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.schedule()
+            except Exception as e:
+                logger.error(f"Error scheduling crawl tasks: {e}")
+            await asyncio.sleep(self.poll_interval)
+    
+    def _load_tasks(self) -> List[CrawlTask]:
+        db = SessionLocal()
+        try:
+            return load_crawl_tasks(db)
+        finally:
+            db.close()
+    
+    async def schedule(self) -> int:
+        """
+        Queue every task that is due
+        
+        Returns:
+            Number of newly queued tasks
+        """
+        loop = asyncio.get_running_loop()
+        tasks = await loop.run_in_executor(None, self._load_tasks)
+        if self.shared_queue is not None:
+            # Idempotent on every node; due dates live in the table
+            await loop.run_in_executor(None, self.shared_queue.enqueue, tasks)
+            self.last_schedule_at = time.time()
+            return len(tasks)
+        now = time.monotonic()
+        queued = 0
+        for task in tasks:
+            if task.key in self._pending:
+                continue
+            last = self._last_crawled.get(task.key)
+            if last is not None and now - last < self.interval:
+                continue
+            task.due_at = last + self.interval if last is not None else now
+            self._pending[task.key] = task
+            self._queue.put_nowait((-task.last_active, next(self._sequence), task))
+            queued += 1
+        self.last_schedule_at = time.time()
+        if queued:
+            logger.debug(f"Queued {queued} crawl tasks ({len(tasks)} merged queries)")
+        return queued
+    
+    async def _worker(self) -> None:
+        while True:
+            _, _, task = await self._queue.get()
+            task.started_at = time.monotonic()
+            try:
+                jobs, crawl_stats = await asyncio.wait_for(
+                    refresh_platform(task.platform, task.keywords, task.location, self.max_results),
+                    timeout=settings.CRAWLER_TASK_TIMEOUT
+                )
+                self.completed += 1
+                self.jobs_fetched += len(jobs)
+                self.totals.add(crawl_stats)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Crawl of {task.platform} {task.keywords} failed: {e!r}")
+            finally:
+                # Failed tasks are retried at the next interval as well
+                self._last_crawled[task.key] = time.monotonic()
+                self._pending.pop(task.key, None)
+                self._queue.task_done()
+    
+    async def _heartbeat(self, task_id: int, crawl: asyncio.Task) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(settings.CRAWLER_HEARTBEAT_INTERVAL)
+            if not await loop.run_in_executor(None, self.shared_queue.heartbeat, task_id):
+                crawl.cancel()  # Another worker owns the task now
+                return
+    
+    async def _lease_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self.shared_queue
+        while True:
+            try:
+                claimed = await loop.run_in_executor(None, queue.claim, 1)
+            except Exception as e:
+                logger.error(f"Error claiming crawl tasks: {e}")
+                claimed = []
+            if not claimed:
+                await asyncio.sleep(settings.CRAWLER_CLAIM_INTERVAL)
+                continue
+            
+            task = claimed[0]
+            crawl = asyncio.ensure_future(asyncio.wait_for(
+                refresh_platform(task['platform'], task['keywords'], task['location'], self.max_results),
+                timeout=settings.CRAWLER_TASK_TIMEOUT
+            ))
+            heartbeat = asyncio.create_task(self._heartbeat(task['id'], crawl))
+            error = None
+            try:
+                jobs, crawl_stats = await crawl
+                self.completed += 1
+                self.jobs_fetched += len(jobs)
+                self.totals.add(crawl_stats)
+            except asyncio.CancelledError:
+                if not heartbeat.done():
+                    # Shutting down: hand the task to another worker right away
+                    heartbeat.cancel()
+                    queue.release(task['id'])
+                    raise
+                self.failed += 1  # Lease lost mid-crawl; the new holder re-crawls it
+                continue
+            except Exception as e:
+                self.failed += 1
+                error = repr(e)
+                logger.warning(f"Crawl of {task['platform']} {task['keywords']} failed: {error}")
+            finally:
+                heartbeat.cancel()
+            try:
+                await loop.run_in_executor(None, queue.complete, task['id'], self.interval, error)
+            except Exception as e:
+                logger.error(f"Error completing crawl task {task['id']}: {e}")
+    
+    def stats(self) -> Dict:
+        """
+        Get queue depth, lag and counters
+        
+        Lag is how long the oldest queued task has been due without being
+        picked up by a worker. 'incremental' sums the bytes and rows fetched
+        or saved by conditional requests and content hashing. 'shared_queue'
+        holds the crawl_queue table state when crawling is distributed.
+        
+        Returns:
+            Dictionary with scheduler statistics
+        """
+        stats = self._local_stats()
+        stats['shared_queue'] = self.shared_queue.stats() if self.shared_queue is not None else None
+        return stats
+    
+    async def astats(self) -> Dict:
+        """Same as stats(), with the crawl_queue aggregate run off the event loop"""
+        stats = self._local_stats()
+        stats['shared_queue'] = None
+        if self.shared_queue is not None:
+            stats['shared_queue'] = await asyncio.get_running_loop().run_in_executor(None, self.shared_queue.stats)
+        return stats
+    
+    def _local_stats(self) -> Dict:
+        now = time.monotonic()
+        waiting = [t for t in self._pending.values() if t.started_at is None]
+        return {
+            'running': self.is_running,
+            'queue_depth': len(waiting),
+            'in_progress': len(self._pending) - len(waiting),
+            'lag_seconds': round(max((now - t.due_at for t in waiting), default=0.0), 1),
+            'tracked_queries': len(self._last_crawled),
+            'completed': self.completed,
+            'failed': self.failed,
+            'jobs_fetched': self.jobs_fetched,
+            'incremental': self.totals.to_dict(),
+            'last_schedule_at': self.last_schedule_at,
+        }
+
+
+crawl_scheduler = CrawlScheduler()
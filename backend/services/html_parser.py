@@ -0,0 +1,207 @@
+"""
+HTML Parser - Pluggable HTML parsing backends for scrapers
+
+Scrapers parse pages through parse_html() and the small node interface
+below (select, select_one, text, attr) instead of importing a parser
+directly. The backend is picked by HTML_PARSER:
+
+    selectolax  - lexbor/modest C parser (fastest, optional dependency)
+    lxml        - libxml2 with cssselect
+    bs4         - BeautifulSoup (lxml tree builder if installed, else html.parser)
+    auto        - first available of the above, in that order
+"""
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+from backend.core.config import settings
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+        SELECTOLAX_AVAILABLE = True
+    except ImportError:
+        SELECTOLAX_AVAILABLE = False
+
+try:
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+from bs4 import BeautifulSoup
+try:
+    import lxml  # noqa: F401
+    BS4_TREE_BUILDER = 'lxml'
+except ImportError:
+    BS4_TREE_BUILDER = 'html.parser'
+
+
+def _clean(text: Optional[str]) -> str:
+    return ' '.join(text.split()) if text else ''
+
+
+class HtmlNode:
+    """Element of a parsed page; same interface for every backend"""
+    
+    def select(self, css: str) -> List["HtmlNode"]:
+        """Get all descendants matching a CSS selector"""
+        raise NotImplementedError
+    
+    def select_one(self, css: str) -> Optional["HtmlNode"]:
+        """Get the first descendant matching a CSS selector, or None"""
+        nodes = self.select(css)
+        return nodes[0] if nodes else None
+    
+    def text(self) -> str:
+        """Get the text content with whitespace collapsed"""
+        raise NotImplementedError
+    
+    def attr(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Get an attribute value"""
+        raise NotImplementedError
+    
+    def select_text(self, css: str, default: str = '') -> str:
+        """Get the text of the first match of a CSS selector"""
+        node = self.select_one(css)
+        return node.text() if node is not None else default
+    
+    def select_attr(self, css: str, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Get an attribute of the first match of a CSS selector"""
+        node = self.select_one(css)
+        return node.attr(name, default) if node is not None else default
+
+
+class SelectolaxNode(HtmlNode):
+    __slots__ = ('_node',)
+    
+    def __init__(self, node):
+        self._node = node
+    
+    def select(self, css: str) -> List[HtmlNode]:
+        return [SelectolaxNode(node) for node in self._node.css(css)]
+    
+    def select_one(self, css: str) -> Optional[HtmlNode]:
+        node = self._node.css_first(css)
+        return SelectolaxNode(node) if node is not None else None
+    
+    def text(self) -> str:
+        return _clean(self._node.text(separator=' '))
+    
+    def attr(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        value = self._node.attributes.get(name)
+        return value if value is not None else default
+
+
+@lru_cache(maxsize=512)
+def _css_selector(css: str):
+    # Translating CSS to XPath costs more than running the query
+    return CSSSelector(css)
+
+
+class LxmlNode(HtmlNode):
+    __slots__ = ('_node',)
+    
+    def __init__(self, node):
+        self._node = node
+    
+    def select(self, css: str) -> List[HtmlNode]:
+        return [LxmlNode(node) for node in _css_selector(css)(self._node)]
+    
+    def text(self) -> str:
+        return _clean(' '.join(self._node.itertext()))
+    
+    def attr(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self._node.get(name, default)
+
+
+class SoupNode(HtmlNode):
+    __slots__ = ('_node',)
+    
+    def __init__(self, node):
+        self._node = node
+    
+    def select(self, css: str) -> List[HtmlNode]:
+        return [SoupNode(node) for node in self._node.select(css)]
+    
+    def select_one(self, css: str) -> Optional[HtmlNode]:
+        node = self._node.select_one(css)
+        return SoupNode(node) if node is not None else None
+    
+    def text(self) -> str:
+        return _clean(self._node.get_text(' '))
+    
+    def attr(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        value = self._node.get(name, default)
+        # BeautifulSoup returns multi-valued attributes (class) as lists
+        return ' '.join(value) if isinstance(value, list) else value
+
+
+def _parse_selectolax(html: str) -> HtmlNode:
+    return SelectolaxNode(SelectolaxParser(html).root)
+
+
+def _parse_lxml(html: str) -> HtmlNode:
+    return LxmlNode(lxml.html.document_fromstring(html))
+
+
+def _parse_bs4(html: str) -> HtmlNode:
+    return SoupNode(BeautifulSoup(html, BS4_TREE_BUILDER))
+
+
+# Fastest first; 'auto' picks the first available backend
+PARSER_BACKENDS: Dict[str, Callable[[str], HtmlNode]] = {}
+if SELECTOLAX_AVAILABLE:
+    PARSER_BACKENDS['selectolax'] = _parse_selectolax
+if LXML_AVAILABLE:
+    PARSER_BACKENDS['lxml'] = _parse_lxml
+PARSER_BACKENDS['bs4'] = _parse_bs4
+
+
+def available_backends() -> List[str]:
+    """Get the names of the installed parser backends, fastest first"""
+    return list(PARSER_BACKENDS)
+
+
+def get_backend(name: Optional[str] = None) -> str:
+    """
+    Resolve a backend name
+    
+    Args:
+        name: Backend name, 'auto' or None (defaults to HTML_PARSER)
+    
+    Returns:
+        Name of an installed backend; unknown or missing backends fall back
+        to the fastest available one
+    """
+    return _resolve_backend((name or settings.HTML_PARSER or 'auto').lower())
+
+
+@lru_cache(maxsize=None)
+def _resolve_backend(name: str) -> str:
+    if name in PARSER_BACKENDS:
+        return name
+    if name != 'auto':
+        logger.warning(f"HTML parser '{name}' is not available, using {available_backends()[0]}")
+    return available_backends()[0]
+
+
+def parse_html(html, backend: Optional[str] = None) -> HtmlNode:
+    """
+    Parse an HTML page
+    
+    Args:
+        html: Page body (str or bytes)
+        backend: Parser backend (defaults to HTML_PARSER)
+    
+    Returns:
+        Root node of the parsed document
+    """
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+    return PARSER_BACKENDS[get_backend(backend)](html)
@@ -0,0 +1,124 @@
+"""
+HTTP Replay - Captured responses for offline scraping (record / replay)
+
+With HTTP_RECORD_DIR set, the shared HTTP transport saves every response
+it receives. With HTTP_REPLAY_URL set, it sends every request to a local
+replay server instead (see backend/benchmarks/replay_server.py), which
+serves the captured responses. Scrapers run unchanged in both modes.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import httpx
+
+
+# Response headers kept in captures; bodies are stored decoded
+CAPTURED_HEADERS = ('content-type', 'etag', 'last-modified', 'cache-control')
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL for capture lookup (scheme dropped, query sorted)
+    
+    Args:
+        url: Absolute URL
+    
+    Returns:
+        "host/path?query" string
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{parts.netloc.lower()}{parts.path or '/'}" + (f"?{query}" if query else "")
+
+
+def capture_key(url: str) -> str:
+    """Get the file name stem of a URL's capture"""
+    return hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+
+
+def replay_url(url: str, replay_base: str) -> str:
+    """
+    Rewrite an absolute URL to go through a replay server
+    
+    https://www.example.com/jobs?page=2 becomes
+    {replay_base}/www.example.com/jobs?page=2
+    
+    Args:
+        url: Absolute URL
+        replay_base: Replay server base URL
+    
+    Returns:
+        Rewritten URL
+    """
+    return f"{replay_base.rstrip('/')}/{normalize_url(url)}"
+
+
+def original_url(path: str) -> str:
+    """Inverse of replay_url() for a request path received by the replay server"""
+    return f"https://{path.lstrip('/')}"
+
+
+class CaptureStore:
+    """
+    Captured responses on disk, one metadata + one body file per URL
+    
+    Layout: {root}/{host}/{sha1 of normalized URL}.json and .body
+    """
+    
+    def __init__(self, root):
+        self.root = Path(root)
+    
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        host = urlsplit(url).netloc.lower() or '_'
+        stem = self.root / host / capture_key(url)
+        return stem.with_suffix('.json'), stem.with_suffix('.body')
+    
+    def save(self, url: str, status_code: int, headers: Dict[str, str], body: bytes) -> None:
+        """
+        Save a captured response
+        
+        Args:
+            url: Requested URL
+            status_code: HTTP status
+            headers: Response headers (only CAPTURED_HEADERS are kept)
+            body: Decoded response body
+        """
+        meta_path, body_path = self._paths(url)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        lowered = {k.lower(): v for k, v in headers.items()}
+        meta = {
+            'url': url,
+            'status_code': status_code,
+            'headers': {k: lowered[k] for k in CAPTURED_HEADERS if k in lowered},
+        }
+        body_path.write_bytes(body)
+        meta_path.write_text(json.dumps(meta, indent=2), encoding='utf-8')
+    
+    def save_response(self, url: str, response: httpx.Response) -> None:
+        """Save an httpx response captured for a URL"""
+        self.save(url, response.status_code, dict(response.headers), response.content)
+    
+    def load(self, url: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """
+        Load a captured response
+        
+        Args:
+            url: Requested URL
+        
+        Returns:
+            Tuple of (status code, headers, body), or None if not captured
+        """
+        meta_path, body_path = self._paths(url)
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        return meta['status_code'], meta['headers'], body_path.read_bytes()
+    
+    def urls(self, host: Optional[str] = None) -> Iterator[str]:
+        """Iterate over the captured URLs, optionally for one host only"""
+        pattern = f"{host.lower()}/*.json" if host else "*/*.json"
+        for meta_path in sorted(self.root.glob(pattern)):
+            yield json.loads(meta_path.read_text(encoding='utf-8'))['url']
@@ -0,0 +1,151 @@
+"""
+HTTP Transport - Shared async connection pool used by all scrapers
+"""
+import asyncio
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger
+
+from backend.core.config import settings
+from backend.services.http_replay import CaptureStore, replay_url
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8',
+}
+
+
+class HttpTransport:
+    """
+    Process-wide async HTTP client
+    
+    Keeps one keep-alive connection pool (HTTP/2 when the h2 package is
+    installed) shared by every scraper, so repeated fetches to a platform
+    reuse TCP/TLS connections. gzip/deflate are always decoded; br is decoded
+    when the brotli package is installed. A per-host semaphore stops a single
+    platform from taking the whole pool.
+    
+    For offline runs, responses can be recorded to a capture directory
+    (record_dir / HTTP_RECORD_DIR) and requests redirected to a local replay
+    server (replay_base / HTTP_REPLAY_URL).
+    """
+    
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        max_connections_per_host: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        timeout: Optional[float] = None,
+        http2: Optional[bool] = None,
+        replay_base: Optional[str] = None,
+        record_dir: Optional[str] = None
+    ):
+        self.max_connections = max_connections or settings.HTTP_MAX_CONNECTIONS
+        self.max_keepalive_connections = max_keepalive_connections or settings.HTTP_MAX_KEEPALIVE_CONNECTIONS
+        self.max_connections_per_host = max_connections_per_host or settings.HTTP_MAX_CONNECTIONS_PER_HOST
+        self.keepalive_expiry = keepalive_expiry or settings.HTTP_KEEPALIVE_EXPIRY
+        self.timeout = timeout or settings.HTTP_TIMEOUT
+        http2 = settings.HTTP2_ENABLED if http2 is None else http2
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.replay_base = replay_base or settings.HTTP_REPLAY_URL
+        record_dir = record_dir or settings.HTTP_RECORD_DIR
+        self.recorder = CaptureStore(record_dir) if record_dir else None
+        
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Lazily create the pooled client on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                headers=DEFAULT_HEADERS,
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+            )
+        return self._client
+    
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._host_limits[host]
+    
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request through the shared pool
+        
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            **kwargs: Extra arguments for httpx (params, headers, ...)
+        
+        Returns:
+            httpx.Response (body already read and decoded)
+        """
+        if self.replay_base or self.recorder is not None:
+            # Key captures on the full original URL, query parameters included
+            params = kwargs.pop('params', None)
+            if params:
+                url = str(httpx.URL(url).copy_merge_params(params))
+        target = replay_url(url, self.replay_base) if self.replay_base else url
+        
+        async with self._host_limit(url):
+            response = await self.client.request(method, target, **kwargs)
+        if self.recorder is not None and method == "GET" and response.status_code != 304:
+            self.recorder.save_response(url, response)
+        return response
+    
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """Send a GET request through the shared pool"""
+        return await self.request("GET", url, **kwargs)
+    
+    async def aclose(self) -> None:
+        """Close all pooled connections"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._host_limits.clear()
+
+
+_transport: Optional[HttpTransport] = None
+
+
+def get_transport() -> HttpTransport:
+    """Get the process-wide HTTP transport"""
+    global _transport
+    if _transport is None:
+        _transport = HttpTransport()
+        logger.info(
+            f"HTTP transport ready (http2={_transport.http2}, "
+            f"max_connections={_transport.max_connections}, "
+            f"per_host={_transport.max_connections_per_host})"
+        )
+        if _transport.replay_base:
+            logger.warning(f"HTTP transport replaying captures from {_transport.replay_base}")
+    return _transport
+
+
+async def close_transport() -> None:
+    """Close the process-wide HTTP transport"""
+    global _transport
+    if _transport is not None:
+        await _transport.aclose()
+        _transport = None
@@ -0,0 +1,279 @@
+"""
+Incremental Crawling - Conditional request state, content hashing and sitemaps
+"""
+import asyncio
+import contextvars
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from xml.etree import ElementTree
+
+from dateutil import parser as date_parser
+from loguru import logger
+from sqlalchemy.dialects import postgresql, sqlite
+
+from backend.core.config import settings
+from backend.database.base import SessionLocal
+from backend.database.models import PageFetchState
+
+
+def hash_content(content: bytes) -> str:
+    """Stable hash of a page body or normalized listing"""
+    return hashlib.sha1(content).hexdigest()
+
+
+class CrawlStats:
+    """Bytes and rows fetched or saved during one crawl"""
+    
+    def __init__(self):
+        self.pages_fetched = 0
+        self.pages_not_modified = 0  # 304 answers
+        self.pages_unchanged = 0  # 200 answers with the same body hash
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0  # Body bytes not downloaded thanks to 304s
+        self.rows_written = 0
+        self.rows_skipped = 0  # Listings whose content hash did not change
+    
+    def add(self, other: "CrawlStats") -> None:
+        """Accumulate another crawl's counters into this one"""
+        for name in (
+            'pages_fetched', 'pages_not_modified', 'pages_unchanged',
+            'bytes_downloaded', 'bytes_saved', 'rows_written', 'rows_skipped'
+        ):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+    
+    def to_dict(self) -> Dict:
+        """Get the counters as a dictionary"""
+        return {
+            'pages_fetched': self.pages_fetched,
+            'pages_not_modified': self.pages_not_modified,
+            'pages_unchanged': self.pages_unchanged,
+            'bytes_downloaded': self.bytes_downloaded,
+            'bytes_saved': self.bytes_saved,
+            'rows_written': self.rows_written,
+            'rows_skipped': self.rows_skipped,
+        }
+
+
+# Stats of the crawl running in the current task, if any
+current_crawl_stats: contextvars.ContextVar[Optional[CrawlStats]] = contextvars.ContextVar(
+    'current_crawl_stats', default=None
+)
+
+
+class FetchResult:
+    """Outcome of a conditional page fetch"""
+    
+    def __init__(self, url: str, status_code: int, content: bytes = b"", text: str = "", changed: bool = True):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.text = text
+        self.changed = changed  # False on 304 or when the body hash is unchanged
+    
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+
+class PageStateStore:
+    """
+    ETag / Last-Modified / body hash per URL
+    
+    Reads go through a bounded in-memory cache backed by the
+    page_fetch_states table. Writes are buffered and written in one batch
+    by flush(), which the crawler calls at the end of each crawl task.
+    
+    Thread-safe: crawl workers update states on the event loop while
+    flush() runs in a worker thread. Entries waiting for a flush are never
+    evicted.
+    """
+    
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size or settings.PAGE_STATE_CACHE_SIZE
+        self._lock = threading.Lock()
+        self._states: "OrderedDict[str, Dict]" = OrderedDict()
+        self._missing: Set[str] = set()
+        self._dirty: Set[str] = set()
+    
+    def _remember(self, url: str, state: Dict) -> None:
+        # Called with the lock held
+        self._states[url] = state
+        self._states.move_to_end(url)
+        self._trim()
+    
+    def _trim(self) -> None:
+        # Called with the lock held
+        while len(self._states) > self.max_size:
+            # Least recently used entry that is not waiting for a flush
+            evicted = next((cached for cached in self._states if cached not in self._dirty), None)
+            if evicted is None:
+                break
+            del self._states[evicted]
+            self._missing.discard(evicted)
+    
+    def _load(self, url: str) -> Optional[Dict]:
+        db = SessionLocal()
+        try:
+            row = db.query(PageFetchState).filter(PageFetchState.url == url).first()
+            if row is None:
+                return None
+            return {
+                'etag': row.etag,
+                'last_modified': row.last_modified,
+                'content_hash': row.content_hash,
+                'content_length': row.content_length or 0,
+                'fetched_at': row.fetched_at,
+            }
+        finally:
+            db.close()
+    
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Get the stored state of a URL (blocking on a cache miss)
+        
+        Args:
+            url: Page URL
+        
+        Returns:
+            Dictionary with etag, last_modified, content_hash and content_length, or None
+        """
+        found, state = self._cached(url)
+        if found:
+            return state
+        return self._cache_loaded(url, self._load(url))
+    
+    async def aget(self, url: str) -> Optional[Dict]:
+        """Same as get(), with the database lookup run off the event loop"""
+        found, state = self._cached(url)
+        if found:
+            return state
+        state = await asyncio.get_running_loop().run_in_executor(None, self._load, url)
+        return self._cache_loaded(url, state)
+    
+    def _cached(self, url: str) -> Tuple[bool, Optional[Dict]]:
+        # (whether the cache knows the URL, its state)
+        with self._lock:
+            if url in self._states:
+                self._states.move_to_end(url)
+                return True, self._states[url]
+            return url in self._missing, None
+    
+    def _cache_loaded(self, url: str, state: Optional[Dict]) -> Optional[Dict]:
+        with self._lock:
+            if url in self._states:
+                # Updated while the lookup was running
+                return self._states[url]
+            if state is None:
+                if len(self._missing) >= self.max_size:
+                    self._missing.clear()
+                self._missing.add(url)
+            else:
+                self._remember(url, state)
+            return state
+    
+    def update(self, url: str, **fields) -> None:
+        """Record new state for a URL; persisted on the next flush()"""
+        with self._lock:
+            state = dict(self._states.get(url) or {})
+            state.update(fields)
+            state['checked_at'] = datetime.now(timezone.utc)
+            self._missing.discard(url)
+            self._dirty.add(url)  # Before _remember(), so it is not evicted
+            self._remember(url, state)
+    
+    def flush(self) -> int:
+        """
+        Write buffered state changes to the database
+        
+        Returns:
+            Number of rows written
+        """
+        with self._lock:
+            urls, self._dirty = self._dirty, set()
+            # Copied under the lock: update() replaces states while the rows are written
+            rows = [{
+                'url': url,
+                'etag': self._states[url].get('etag'),
+                'last_modified': self._states[url].get('last_modified'),
+                'content_hash': self._states[url].get('content_hash'),
+                'content_length': self._states[url].get('content_length', 0),
+                'fetched_at': self._states[url].get('fetched_at'),
+                'checked_at': self._states[url].get('checked_at'),
+            } for url in urls if url in self._states]
+        if not rows:
+            return 0
+        
+        db = SessionLocal()
+        try:
+            dialect = db.bind.dialect.name
+            if dialect in ('postgresql', 'sqlite'):
+                insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+                stmt = insert(PageFetchState.__table__)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[PageFetchState.__table__.c.url],
+                    set_={col: stmt.excluded[col] for col in rows[0] if col != 'url'}
+                )
+                db.execute(stmt, rows)
+            else:
+                for row in rows:
+                    existing = db.query(PageFetchState).filter(PageFetchState.url == row['url']).first()
+                    if existing is None:
+                        db.add(PageFetchState(**row))
+                    else:
+                        for col, value in row.items():
+                            setattr(existing, col, value)
+            db.commit()
+            with self._lock:
+                self._trim()  # Entries kept only because they were waiting for this flush
+            return len(rows)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error storing page fetch states: {e}")
+            with self._lock:
+                self._dirty.update(row['url'] for row in rows)  # Retried on the next flush
+            return 0
+        finally:
+            db.close()
+
+
+page_states = PageStateStore()
+
+
+_SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+
+def parse_sitemap(xml: bytes) -> Tuple[List[Tuple[str, Optional[datetime]]], List[str]]:
+    """
+    Parse a sitemap or sitemap index
+    
+    Args:
+        xml: Sitemap XML body
+    
+    Returns:
+        Tuple of (page URLs with their lastmod, child sitemap URLs)
+    """
+    root = ElementTree.fromstring(xml)
+    tag = root.tag.replace(_SITEMAP_NS, '')
+    
+    entries = []
+    for node in root:
+        loc = node.findtext(f'{_SITEMAP_NS}loc') or node.findtext('loc')
+        if not loc:
+            continue
+        lastmod_text = node.findtext(f'{_SITEMAP_NS}lastmod') or node.findtext('lastmod')
+        lastmod = None
+        if lastmod_text:
+            try:
+                lastmod = date_parser.parse(lastmod_text.strip())
+                if lastmod.tzinfo is None:
+                    lastmod = lastmod.replace(tzinfo=timezone.utc)
+            except (ValueError, OverflowError):
+                lastmod = None
+        entries.append((loc.strip(), lastmod))
+    
+    if tag == 'sitemapindex':
+        return [], [loc for loc, _ in entries]
+    return entries, []
@@ -0,0 +1,526 @@
+"""
+Ingestion Pipeline - Staged streaming job ingestion with bounded queues
+
+fetch -> parse -> normalize -> dedupe -> score -> persist
+
+Each stage runs its own workers and reads from a bounded asyncio queue, so
+a stage that falls behind (a slow DB write, a CPU-bound parse) fills its
+queue and blocks the stages upstream of it, down to fetching, instead of
+letting jobs pile up in memory. Every stage exports throughput, queue
+depth, busy and blocked time.
+"""
+import asyncio
+import heapq
+import inspect
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from loguru import logger
+
+from backend.core.config import settings
+from backend.services.job_dedupe import DuplicateIndex, job_signature
+from backend.services.job_matcher import JobMatcher
+from backend.services.job_search import iter_platform_pages
+from backend.services.job_store import persist_jobs
+from backend.services.scraper_factory import ScraperFactory
+
+
+_END = object()  # End-of-stream marker passed from stage to stage
+
+# Finished pipelines kept for /pipeline/stats
+_recent: Deque["Pipeline"] = deque(maxlen=20)
+_active: List["Pipeline"] = []
+
+
+class StageMetrics:
+    """Counters of one pipeline stage"""
+    
+    def __init__(self):
+        self.received = 0  # Items taken from the input queue
+        self.emitted = 0  # Items put on the output queue
+        self.errors = 0
+        self.busy_s = 0.0  # Time spent in the handler, summed over workers
+        self.blocked_s = 0.0  # Time spent waiting for room downstream (backpressure)
+        self.max_queue_depth = 0
+    
+    def to_dict(self, elapsed: float, concurrency: int) -> Dict:
+        return {
+            'received': self.received,
+            'emitted': self.emitted,
+            'errors': self.errors,
+            'items_per_second': round(self.received / elapsed, 1) if elapsed > 0 else 0.0,
+            'busy_s': round(self.busy_s, 3),
+            'blocked_s': round(self.blocked_s, 3),
+            'utilization': round(self.busy_s / (elapsed * concurrency), 3) if elapsed > 0 else 0.0,
+            'max_queue_depth': self.max_queue_depth,
+        }
+
+
+class Stage:
+    """
+    One pipeline stage: a handler run by `concurrency` workers
+    
+    The handler receives one item (or a list of up to batch_size items when
+    batch_size > 1) and may return None (drop it), a list (each element is
+    passed on), any other value (passed on as is), or be an async generator
+    whose yielded values are passed on one by one. Blocking handlers run in
+    the default thread pool so CPU-bound work does not stall the event loop.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        handler: Callable,
+        concurrency: int = 1,
+        queue_size: Optional[int] = None,
+        blocking: bool = False,
+        batch_size: int = 1
+    ):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size if queue_size is not None else settings.PIPELINE_QUEUE_SIZE
+        self.blocking = blocking
+        self.batch_size = max(1, batch_size)
+        self.metrics = StageMetrics()
+
+
+class Pipeline:
+    """
+    Stages connected by bounded queues
+    
+    run() feeds source items into the first stage and yields what the last
+    stage emits. A handler error is logged and counted, and drops the item
+    that caused it; the rest of the stream goes on. Stopping iteration early
+    cancels every stage.
+    """
+    
+    def __init__(self, stages: List[Stage], name: str = 'pipeline'):
+        self.name = name
+        self.stages = stages
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._queues: List[asyncio.Queue] = []
+    
+    async def _emit(self, stage: Stage, queue: asyncio.Queue, result) -> None:
+        if result is None:
+            return
+        if inspect.isasyncgen(result):
+            try:
+                while True:
+                    started = time.perf_counter()
+                    try:
+                        item = await result.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    finally:
+                        # The generator does its work while being iterated
+                        stage.metrics.busy_s += time.perf_counter() - started
+                    await self._put(stage, queue, item)
+            finally:
+                await result.aclose()
+        elif isinstance(result, list):
+            for item in result:
+                await self._put(stage, queue, item)
+        else:
+            await self._put(stage, queue, result)
+    
+    async def _put(self, stage: Stage, queue: asyncio.Queue, item) -> None:
+        if queue.full():
+            started = time.perf_counter()
+            await queue.put(item)
+            stage.metrics.blocked_s += time.perf_counter() - started
+        else:
+            queue.put_nowait(item)
+        stage.metrics.emitted += 1
+    
+    async def _call(self, stage: Stage, payload):
+        if stage.blocking:
+            return await asyncio.get_running_loop().run_in_executor(None, stage.handler, payload)
+        result = stage.handler(payload)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    
+    async def _worker(self, index: int, remaining: List[int]) -> None:
+        stage = self.stages[index]
+        inbox, outbox = self._queues[index], self._queues[index + 1]
+        metrics = stage.metrics
+        while True:
+            metrics.max_queue_depth = max(metrics.max_queue_depth, inbox.qsize())
+            item = await inbox.get()
+            if item is _END:
+                remaining[index] -= 1
+                if remaining[index] > 0:
+                    inbox.put_nowait(_END)  # Let the other workers of this stage see it
+                else:
+                    await outbox.put(_END)
+                return
+            
+            batch = [item]
+            while len(batch) < stage.batch_size and not inbox.empty():
+                item = inbox.get_nowait()
+                if item is _END:
+                    inbox.put_nowait(_END)
+                    break
+                batch.append(item)
+            metrics.received += len(batch)
+            
+            started = time.perf_counter()
+            try:
+                result = await self._call(stage, batch if stage.batch_size > 1 else batch[0])
+                metrics.busy_s += time.perf_counter() - started
+                await self._emit(stage, outbox, result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metrics.errors += 1
+                logger.error(f"Pipeline {self.name} stage {stage.name} failed: {e}")
+    
+    async def _feed(self, source: Union[Iterable, AsyncIterable]) -> None:
+        inbox = self._queues[0]
+        if hasattr(source, '__aiter__'):
+            async for item in source:
+                await inbox.put(item)
+        else:
+            for item in source:
+                await inbox.put(item)
+        await inbox.put(_END)
+    
+    async def run(self, source: Union[Iterable, AsyncIterable]) -> AsyncIterator[Any]:
+        """
+        Stream source items through every stage
+        
+        Args:
+            source: Items for the first stage (iterable or async iterable)
+        
+        Yields:
+            Items emitted by the last stage, as they come out
+        """
+        self._queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        self._queues.append(asyncio.Queue(maxsize=self.stages[-1].queue_size))
+        remaining = [stage.concurrency for stage in self.stages]
+        self.started_at = time.perf_counter()
+        _active.append(self)
+        
+        tasks = [asyncio.ensure_future(self._feed(source))]
+        for index, stage in enumerate(self.stages):
+            tasks.extend(
+                asyncio.ensure_future(self._worker(index, remaining))
+                for _ in range(stage.concurrency)
+            )
+        try:
+            output = self._queues[-1]
+            while True:
+                item = await output.get()
+                if item is _END:
+                    break
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.finished_at = time.perf_counter()
+            _active.remove(self)
+            _recent.append(self)
+    
+    def stats(self) -> Dict:
+        """
+        Get per-stage throughput, queue depth and timings
+        
+        A stage with high utilization and a deep input queue is the
+        bottleneck; stages upstream of it show blocked time.
+        
+        Returns:
+            Dictionary with pipeline statistics
+        """
+        if self.started_at is None:
+            return {'name': self.name, 'running': False, 'stages': []}
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        elapsed = end - self.started_at
+        stages = []
+        for index, stage in enumerate(self.stages):
+            stage_stats = stage.metrics.to_dict(elapsed, stage.concurrency)
+            stage_stats.update(
+                name=stage.name,
+                concurrency=stage.concurrency,
+                queue_size=stage.queue_size,
+                queue_depth=self._queues[index].qsize() if self._queues else 0,
+            )
+            stages.append(stage_stats)
+        return {
+            'name': self.name,
+            'running': self.finished_at is None,
+            'elapsed_s': round(elapsed, 3),
+            'stages': stages,
+        }
+
+
+def pipeline_stats() -> Dict:
+    """Get the statistics of running and recently finished pipelines"""
+    return {
+        'active': [pipeline.stats() for pipeline in _active],
+        'recent': [pipeline.stats() for pipeline in reversed(_recent)],
+    }
+
+
+def _concurrency(stage: str) -> int:
+    return settings.PIPELINE_CONCURRENCY.get(stage, 1)
+
+
+class SearchPipeline:
+    """
+    Job search as a staged pipeline
+    
+    The source items are platform names, or raw pages
+    ({'platform', 'url', 'body'}) to parse without fetching. Platforms are
+    fetched one result page at a time through iter_platform_pages(), so
+    the search cache, store freshness, circuit breakers and timeouts all
+    still apply, and a full parse queue holds back the next download; live
+    results are persisted by the persist stage in batches of
+    PIPELINE_PERSIST_BATCH.
+    
+    Stages:
+        fetch: platform -> result pages, raw or parsed (per-platform status
+            in .statuses); stops at max_results jobs per platform
+        parse: raw page -> jobs, via the scraper's extract_jobs() (thread pool)
+        normalize: platform tag, trimmed text and duplicate signature
+        dedupe: drops cross-platform copies of jobs already emitted, unless
+            more complete (longer description) than the group's job; the
+            group's job gets a 'sources' list of every copy
+        score: relevance score and 'matched' flag
+        persist: upserts live results, then passes jobs on
+    """
+    
+    def __init__(
+        self,
+        keywords: List[str],
+        location: str,
+        max_results: int,
+        matcher: JobMatcher,
+        persist: Optional[bool] = None
+    ):
+        self.keywords = keywords
+        self.location = location
+        self.max_results = max_results
+        self.matcher = matcher
+        self.persist = settings.JOB_STORE_ENABLED if persist is None else persist
+        # Jobs are passed on as they come: the index keeps signatures and sources only
+        self.dedupe = DuplicateIndex(keep_jobs=False) if settings.DEDUPE_ENABLED else None
+        self.statuses: List[Dict] = []
+        self.total = 0  # Jobs ranked by the last collect()
+        self._exhausted: Set[str] = set()  # Platforms whose last page had no jobs
+        self._count_lock = threading.Lock()  # Parse workers run in threads
+        self.pipeline = Pipeline([
+            Stage('fetch', self._fetch, _concurrency('fetch')),
+            Stage('parse', self._parse, _concurrency('parse'), blocking=True),
+            Stage('normalize', self._normalize, _concurrency('normalize')),
+            Stage('dedupe', self._dedupe, 1),  # Shared index: one worker keeps first-wins ordering
+            Stage('score', self._score, _concurrency('score')),
+            Stage('persist', self._persist, _concurrency('persist'), batch_size=settings.PIPELINE_PERSIST_BATCH),
+        ], name='search')
+    
+    async def _fetch(self, item):
+        if isinstance(item, dict):
+            yield item  # Raw page, straight to parse
+            return
+        status: Dict = {}
+        self.statuses.append(status)
+        
+        def more() -> bool:
+            # Raw pages are only counted once parsed: at most a queue's worth is fetched past the end
+            return item not in self._exhausted and status['count'] < self.max_results
+        
+        async for page in iter_platform_pages(
+            item, self.keywords, self.location, self.max_results, status, more
+        ):
+            page['status'] = status
+            yield page
+    
+    def _parse(self, page: Dict) -> List[Dict]:
+        if 'jobs' in page:
+            jobs = [dict(job) for job in page['jobs']]  # Cached lists are shared; do not mutate them
+        else:
+            scraper = ScraperFactory.get_scraper(page['platform'])
+            jobs = scraper.extract_jobs(page['url'], page['body'])
+            for job in jobs:
+                job.setdefault('url', page['url'])
+        status = page.get('status')
+        if status is not None:
+            # Page of a platform search: keep it to max_results jobs
+            with self._count_lock:
+                jobs = jobs[:max(0, self.max_results - status['count'])]
+                status['count'] += len(jobs)
+                if not jobs:
+                    self._exhausted.add(page['platform'])
+        for job in jobs:
+            job['platform'] = page['platform']
+            job['_persist'] = page.get('persist', True)
+        return jobs
+    
+    def _normalize(self, job: Dict) -> Dict:
+        for field in ('title', 'company', 'location'):
+            if isinstance(job.get(field), str):
+                job[field] = job[field].strip()
+        if settings.DEDUPE_ENABLED:
+            job['simhash'] = job_signature(job)
+        return job
+    
+    def _dedupe(self, job: Dict) -> Optional[Dict]:
+        if self.dedupe is None:
+            return job
+        group_id, _ = self.dedupe.add(job)
+        group = self.dedupe.groups[group_id]
+        copy = len(group['sources']) - 1
+        if group['canonical'] != copy:
+            return None
+        # First copy, or a more complete one that replaces it in collect().
+        # Same list object as the group's: later copies show up in it
+        job['_group'] = group_id
+        job['_copy'] = copy
+        job['sources'] = group['sources']
+        return job
+    
+    def _score(self, job: Dict) -> Dict:
+        score = self.matcher.calculate_relevance_score(job)
+        job['relevance_score'] = score
+        job['matched'] = self.matcher.is_match(score)
+        return job
+    
+    async def _persist(self, jobs: List[Dict]) -> List[Dict]:
+        to_store = [
+            {k: v for k, v in job.items() if k not in ('sources', 'relevance_score', 'matched', '_persist', '_group', '_copy')}
+            for job in jobs if job['_persist']
+        ]
+        for job in jobs:
+            del job['_persist']
+        if self.persist and to_store:
+            await asyncio.get_running_loop().run_in_executor(None, persist_jobs, to_store)
+        return jobs
+    
+    async def run(self, sources: Union[Iterable, AsyncIterable]) -> AsyncIterator[Dict]:
+        """
+        Stream scored, deduplicated jobs as they come out of the pipeline
+        
+        A job posted on several platforms is streamed once, as the first
+        copy received (a more complete copy arriving later cannot replace
+        it); collect() returns the most complete copy instead.
+        
+        Args:
+            sources: Platform names and/or raw pages
+        
+        Yields:
+            Scored job dictionaries, in completion order
+        """
+        streamed = set()
+        async for job in self.pipeline.run(sources):
+            group_id = job.pop('_group', None)
+            job.pop('_copy', None)
+            if group_id is not None:
+                if group_id in streamed:
+                    continue
+                streamed.add(group_id)
+            yield job
+    
+    async def collect(
+        self,
+        sources: Union[Iterable, AsyncIterable],
+        top_k: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict]:
+        """
+        Run to completion and return the jobs sorted by relevance
+        
+        A job posted on several platforms is returned once, as its most
+        complete copy (longest description), with every copy in 'sources'.
+        
+        With top_k, only the offset + top_k best jobs are kept while the
+        pipeline runs (in a bounded min-heap), so memory and sort cost grow
+        with the page rather than with the number of jobs crawled. Ties keep
+        their arrival order, as with a full sort. With deduplication on, a
+        more complete copy replacing its group's job takes the place of the
+        old copy's heap entry (left stale until popped), and the heap also
+        keeps as many runners-up in case the new copy scores lower; the
+        duplicate index only keeps signatures and sources.
+        
+        Args:
+            sources: Platform names and/or raw pages
+            top_k: Number of jobs to return (all if None)
+            offset: Number of best jobs to skip
+        
+        Returns:
+            Jobs ranked offset to offset + top_k; self.total is set to the
+            number of jobs ranked
+        """
+        if self.dedupe is not None:
+            return await self._collect_groups(sources, offset + top_k if top_k is not None else None, offset)
+        
+        if top_k is None:
+            jobs = [job async for job in self.run(sources)]
+            self.total = len(jobs)
+            jobs.sort(key=lambda x: x['relevance_score'], reverse=True)
+            return jobs[offset:]
+        
+        size = offset + top_k
+        heap = []  # (score, -arrival, job): the root is the worst job kept
+        self.total = 0
+        async for job in self.run(sources):
+            entry = (job['relevance_score'], -self.total, job)
+            self.total += 1
+            if len(heap) < size:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+        return [job for _, _, job in sorted(heap, key=lambda e: e[:2], reverse=True)][offset:]
+    
+    async def _collect_groups(
+        self,
+        sources: Union[Iterable, AsyncIterable],
+        size: Optional[int],
+        offset: int
+    ) -> List[Dict]:
+        # collect() with deduplication; ties rank by the arrival of the group's first copy.
+        # A more complete copy can score lower than the copy it replaces and
+        # leave the page a slot short; jobs evicted before then are gone, so
+        # as many runners-up as the page holds are kept to fill such slots
+        capacity = 2 * size if size is not None else None
+        seen: Dict[int, Tuple[int, int]] = {}  # Group -> (arrival of its first copy, latest copy received)
+        kept: Dict[int, Tuple[int, Dict]] = {}  # Group -> (sequence of its entry in force, job)
+        heap = []  # (score, -arrival, sequence, group): the root is the worst job kept
+        sequence = 0
+        
+        def in_force(entry) -> bool:
+            return kept.get(entry[3], (None,))[0] == entry[2]
+        
+        async for job in self.pipeline.run(sources):
+            group_id, copy = job.pop('_group'), job.pop('_copy')
+            arrival, latest = seen.get(group_id, (len(seen), -1))
+            if copy < latest:
+                continue  # A more complete copy got here first
+            seen[group_id] = (arrival, copy)
+            kept.pop(group_id, None)  # Entry of the copy it replaces goes stale
+            
+            entry = (job['relevance_score'], -arrival, sequence, group_id)
+            sequence += 1
+            if capacity is None or len(kept) < capacity:
+                heapq.heappush(heap, entry)
+                kept[group_id] = (entry[2], job)
+            else:
+                while heap and not in_force(heap[0]):
+                    heapq.heappop(heap)
+                if heap and entry[:2] > heap[0][:2]:
+                    del kept[heapq.heapreplace(heap, entry)[3]]
+                    kept[group_id] = (entry[2], job)
+            if len(heap) > 2 * len(kept) + 64:
+                heap = [entry for entry in heap if in_force(entry)]
+                heapq.heapify(heap)
+        
+        self.total = len(seen)
+        ranked = sorted((entry for entry in heap if in_force(entry)), key=lambda e: e[:2], reverse=True)
+        return [kept[entry[3]][1] for entry in ranked[:size]][offset:]
+    
+    def stats(self) -> Dict:
+        """Get the pipeline statistics"""
+        return self.pipeline.stats()
@@ -0,0 +1,546 @@
+"""
+Job ANN - Approximate nearest neighbours over job TF-IDF vectors
+
+Random-projection LSH (SimHash): every listing's TF-IDF vector is
+projected on ANN_BITS random hyperplanes and the signs form a bit
+signature, 32 bytes per listing by default. The fraction of bits two
+signatures differ in estimates the angle between the vectors, so a query
+ranks every signature by Hamming distance (XOR and popcount over packed
+64-bit words) and only the ANN_CANDIDATES closest listings are re-ranked
+by their exact cosine similarity in job_vectors. The hyperplanes are
+never stored: the coordinate of a plane on a hash dimension is derived by
+hashing both.
+
+Resume/job similarities are low (top neighbours around 0.3-0.5 cosine),
+where bucketing signatures into hash tables cannot be both selective and
+complete (see backend/benchmarks/bench_job_ann.py), hence the Hamming
+ranking over all signatures rather than bucket lookups.
+
+The IDF used for the projections is a snapshot, saved with the
+signatures: the index is only re-projected when the number of listings
+doubled or halved since. The index is saved to ANN_INDEX_PATH and loaded
+at startup; only the listings that changed meanwhile are projected again.
+"""
+import heapq
+import math
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from loguru import logger
+
+from backend.core.config import settings
+from backend.services.job_similarity import JobVectors, job_vectors, load_job_vectors
+
+
+FORMAT_VERSION = 1
+PROJECTION_SEED = 0x5EED
+
+# Compact when dead signatures exceed this share of all signatures
+COMPACT_RATIO = 0.3
+COMPACT_MIN_DEAD = 1000
+
+# Re-project everything when the listing count grew or shrank this much since the IDF snapshot
+REBUILD_GROWTH = 2.0
+
+# Save after this many listings changed
+SAVE_EVERY = 5000
+
+# Non-zero terms projected at once (bounds the nnz x bits temporary array)
+CHUNK_NNZ = 20000
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer (uint64 arithmetic wraps around)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def hyperplanes(indices: np.ndarray, count: int, seed: int = PROJECTION_SEED) -> np.ndarray:
+    """
+    Get the coordinates of random hyperplanes on some hash dimensions
+    
+    Args:
+        indices: Hash dimensions
+        count: Number of hyperplanes
+        seed: Seed of the hyperplanes
+    
+    Returns:
+        (len(indices), count) float32 array of +1/-1
+    """
+    x = (indices.astype(np.uint64)[:, None] << np.uint64(20)) ^ np.arange(count, dtype=np.uint64)[None, :]
+    x = _mix(x + np.uint64(seed))
+    return np.where(x >> np.uint64(63), np.float32(-1), np.float32(1))
+
+
+def hamming(signatures: np.ndarray, signature: np.ndarray) -> np.ndarray:
+    """
+    Count the bits each signature differs in from another
+    
+    Args:
+        signatures: (n, words) uint64 signatures
+        signature: (words,) uint64 signature
+    
+    Returns:
+        (n,) distances
+    """
+    different = signatures ^ signature
+    if hasattr(np, 'bitwise_count'):  # NumPy 2
+        return np.bitwise_count(different).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT[different.view(np.uint8)].sum(axis=1, dtype=np.int32)
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    grown = np.empty((max(size, 2 * len(array), 8),) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class JobANNIndex:
+    """
+    Random-projection signatures of job listing vectors, keyed on external_id
+    
+    Thread-safe: upserts run in worker threads while queries are served.
+    """
+    
+    def __init__(self, bits: Optional[int] = None, candidates: Optional[int] = None,
+                 seed: int = PROJECTION_SEED, path: Optional[str] = None):
+        self.bits = bits or settings.ANN_BITS
+        self.candidates = candidates or settings.ANN_CANDIDATES
+        self.seed = seed
+        self.path = settings.ANN_INDEX_PATH if path is None else path  # '' = never saved
+        if self.bits % 64:
+            raise ValueError("ANN_BITS must be a multiple of 64")
+        self.words = self.bits // 64
+        
+        self._lock = threading.Lock()
+        self._reset()
+        self._rebuilding = False
+        self._pending: Set[str] = set()  # Listings synced while a background rebuild runs
+        
+        self.loaded = False
+        self.saves = 0
+        self.rebuilds = 0
+        self.compactions = 0
+        self.queries = 0
+        self.last_query_ms = 0.0
+    
+    def _reset(self) -> None:
+        self._slot_of: Dict[str, int] = {}  # external_id -> live signature
+        self._external: List[Optional[str]] = []  # Signature -> external_id (None once dead)
+        self._hashes: List[Optional[str]] = []  # Signature -> text hash
+        self._signatures = np.empty((0, self.words), dtype=np.uint64)
+        self._live = np.empty(0, dtype=bool)
+        self._rows = 0
+        self.live_docs = 0
+        self._idf: Optional[np.ndarray] = None
+        self._idf_docs = 0
+        self._changes = 0  # Since the last save
+    
+    def __len__(self) -> int:
+        return self.live_docs
+    
+    def project(self, vectors: List[Tuple[np.ndarray, np.ndarray]], idf: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Project term frequency vectors, weighted with the snapshot IDF, on the hyperplanes
+        
+        Args:
+            vectors: (bucket indices, term frequencies) pairs
+            idf: IDF weights (default the index's snapshot)
+        
+        Returns:
+            (len(vectors), bits) float32 projections
+        """
+        idf = self._idf if idf is None else idf
+        projections = np.zeros((len(vectors), self.bits), dtype=np.float32)
+        first = 0
+        while first < len(vectors):
+            last = first
+            nnz = 0
+            while last < len(vectors) and (last == first or nnz + len(vectors[last][0]) <= CHUNK_NNZ):
+                nnz += len(vectors[last][0])
+                last += 1
+            if nnz:
+                chunk = vectors[first:last]
+                lengths = np.array([len(indices) for indices, _ in chunk])
+                indices = np.concatenate([indices for indices, _ in chunk])
+                weights = np.concatenate([tfs for _, tfs in chunk]) * idf[indices]
+                unique, inverse = np.unique(indices, return_inverse=True)
+                products = hyperplanes(unique, self.bits, self.seed)[inverse] * weights[:, None]
+                # Sum per vector; empty vectors keep a zero projection
+                nonempty = lengths > 0
+                starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))[nonempty]
+                projections[first:last][nonempty] = np.add.reduceat(products, starts, axis=0)
+            first = last
+        return projections
+    
+    def signatures(self, vectors: List[Tuple[np.ndarray, np.ndarray]], idf: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Get the signatures of term frequency vectors
+        
+        Args:
+            vectors: (bucket indices, term frequencies) pairs
+            idf: IDF weights (default the index's snapshot)
+        
+        Returns:
+            (len(vectors), bits / 64) uint64 packed sign bits
+        """
+        signs = self.project(vectors, idf) > 0
+        return np.ascontiguousarray(np.packbits(signs, axis=1, bitorder='little')).view(np.uint64)
+    
+    def _remove(self, external_id: str) -> None:
+        slot = self._slot_of.pop(external_id, None)
+        if slot is not None:
+            self._live[slot] = False
+            self._external[slot] = None
+            self._hashes[slot] = None
+            self.live_docs -= 1
+    
+    def _add(self, rows: List[Tuple[str, str, np.ndarray, np.ndarray]], signatures: Optional[np.ndarray] = None) -> None:
+        if not rows:
+            return
+        if signatures is None:
+            signatures = self.signatures([(indices, tfs) for _, _, indices, tfs in rows])
+        end = self._rows + len(rows)
+        if end > len(self._signatures):
+            self._signatures = _grow(self._signatures, end)
+            self._live = _grow(self._live, end)
+        for (external_id, digest, _, _), signature in zip(rows, signatures):
+            self._remove(external_id)
+            slot = self._rows
+            self._rows += 1
+            self._slot_of[external_id] = slot
+            self._external.append(external_id)
+            self._hashes.append(digest)
+            self._signatures[slot] = signature
+            self._live[slot] = True
+            self.live_docs += 1
+    
+    def _compact(self) -> None:
+        live = self._live[:self._rows]
+        self._signatures = self._signatures[:self._rows][live]
+        self._external = [eid for eid in self._external if eid is not None]
+        self._hashes = [digest for digest in self._hashes if digest is not None]
+        self._slot_of = {eid: slot for slot, eid in enumerate(self._external)}
+        self._rows = len(self._external)
+        self._live = np.ones(self._rows, dtype=bool)
+        self.compactions += 1
+    
+    def rebuild(self, vectors: JobVectors) -> int:
+        """
+        Re-project every listing of job_vectors with a new IDF snapshot
+        
+        The projection runs outside the lock: queries keep using the
+        current signatures until the new ones are swapped in.
+        
+        Args:
+            vectors: Listing vectors
+        
+        Returns:
+            Number of listings indexed
+        """
+        started = time.perf_counter()
+        idf = vectors.idf()
+        rows = vectors.rows(vectors.external_ids())
+        signatures = self.signatures([(indices, tfs) for _, _, indices, tfs in rows], idf)
+        with self._lock:
+            self._reset()
+            self._idf = idf
+            self._idf_docs = len(rows)
+            self._add(rows, signatures)
+            self._changes = len(rows)
+            self.rebuilds += 1
+        logger.info(f"Built ANN index of {len(rows)} job listings in {time.perf_counter() - started:.1f}s")
+        return len(rows)
+    
+    def _stale(self, vectors: JobVectors) -> bool:
+        # No snapshot yet, other hash dimensions, or listing count far from the snapshot's
+        if self._idf is None or len(self._idf) != vectors.dim:
+            return True
+        docs = len(vectors)
+        reference = max(self._idf_docs, 1)
+        return docs > REBUILD_GROWTH * reference or docs * REBUILD_GROWTH < reference
+    
+    def sync(self, vectors: JobVectors, external_ids: Optional[Iterable[str]] = None, background: bool = False) -> int:
+        """
+        Bring the index up to date with job_vectors
+        
+        Listings whose text hash is unchanged are not projected again.
+        
+        Args:
+            vectors: Listing vectors
+            external_ids: Listings that changed (all listings if None, and
+                then the listings gone from job_vectors are dropped)
+            background: When everything must be re-projected, do it in a
+                background thread and only apply these listings inline
+                (with the current snapshot) meanwhile; needs external_ids
+        
+        Returns:
+            Number of listings (re)indexed inline
+        """
+        ids = vectors.external_ids() if external_ids is None else list(external_ids)
+        with self._lock:
+            if self._rebuilding:
+                # Picked up again once the rebuild has read the listings
+                self._pending.update(ids)
+        
+        if self._stale(vectors):
+            if not background:
+                changed = self.rebuild(vectors)
+                ids = None
+            else:
+                self.schedule_rebuild(vectors, ids)
+                if self._idf is None or len(self._idf) != vectors.dim:
+                    return 0  # No snapshot to project with until the rebuild is done
+        if ids is not None:
+            changed = self._update(vectors, ids, external_ids is None)
+        if self._changes >= SAVE_EVERY and self.path:
+            self.save()
+        return changed
+    
+    def _update(self, vectors: JobVectors, ids: List[str], full: bool) -> int:
+        rows = vectors.rows(ids)
+        with self._lock:
+            found = {row[0] for row in rows}
+            gone = set(self._slot_of) - found if full else set(ids) - found
+            for external_id in gone:
+                self._remove(external_id)
+            rows = [
+                row for row in rows
+                if row[0] not in self._slot_of or self._hashes[self._slot_of[row[0]]] != row[1]
+            ]
+            self._add(rows)
+            dead = self._rows - self.live_docs
+            if dead >= COMPACT_MIN_DEAD and dead > COMPACT_RATIO * self._rows:
+                self._compact()
+            self._changes += len(rows) + len(gone)
+        return len(rows)
+    
+    def schedule_rebuild(self, vectors: JobVectors, external_ids: Iterable[str] = ()) -> bool:
+        """
+        Re-project every listing in a background thread
+        
+        Listings synced while the rebuild runs are synced again once it is
+        done, so none is left with a signature from the old snapshot.
+        
+        Args:
+            vectors: Listing vectors
+            external_ids: Listings changed just before scheduling
+        
+        Returns:
+            False if a rebuild is already running
+        """
+        with self._lock:
+            self._pending.update(external_ids)
+            if self._rebuilding:
+                return False
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_in_background, args=(vectors,), name='job-ann-rebuild', daemon=True).start()
+        return True
+    
+    def _rebuild_in_background(self, vectors: JobVectors) -> None:
+        try:
+            self.rebuild(vectors)
+            while True:
+                with self._lock:
+                    pending, self._pending = self._pending, set()
+                    if not pending:
+                        self._rebuilding = False
+                        break
+                self._update(vectors, list(pending), False)
+        except Exception:
+            logger.exception("Background ANN index rebuild failed")
+            with self._lock:
+                self._pending.clear()
+                self._rebuilding = False
+            return
+        if self.path:
+            self.save()
+    
+    def search(self, indices: np.ndarray, tfs: np.ndarray, vectors: JobVectors,
+               limit: int = 20, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        Find the listings most similar to a term frequency vector
+        
+        The `candidates` listings with the closest signatures are ranked by
+        their exact cosine similarity in job_vectors (or, for listings
+        job_vectors does not hold yet, the similarity estimated from the
+        signatures).
+        
+        Args:
+            indices: Bucket indices of the query (from hash_features)
+            tfs: Term frequencies of the query (from hash_features)
+            vectors: Listing vectors used to re-rank the candidates
+            limit: Maximum number of listings
+            exclude: external_id to leave out (the query listing itself)
+        
+        Returns:
+            (external_id, similarity) pairs, best first
+        """
+        started = time.perf_counter()
+        with self._lock:
+            self.queries += 1
+            if self._idf is None or not self.live_docs:
+                return []
+            signature = self.signatures([(indices, tfs)])[0]
+            distances = hamming(self._signatures[:self._rows], signature)
+            distances[~self._live[:self._rows]] = self.bits + 1
+            if exclude in self._slot_of:
+                distances[self._slot_of[exclude]] = self.bits + 1
+            count = min(max(self.candidates, limit), self._rows)
+            if count < self._rows:
+                closest = np.argpartition(distances, count - 1)[:count]
+            else:
+                closest = np.arange(self._rows)
+            closest = closest[distances[closest] <= self.bits]
+            ids = [self._external[slot] for slot in closest]
+            distances = distances[closest].tolist()
+        
+        exact = vectors.similarities(vectors.query_vector(indices, tfs), ids)
+        scores = [
+            similarity if similarity is not None else math.cos(math.pi * distance / self.bits)
+            for similarity, distance in zip(exact, distances)
+        ]
+        results = heapq.nlargest(limit, zip(ids, scores), key=lambda item: item[1])
+        self.last_query_ms = round((time.perf_counter() - started) * 1000, 2)
+        return results
+    
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Save the signatures and IDF snapshot (written to a temporary file, then renamed)
+        
+        Args:
+            path: File to write (default the index's path)
+        """
+        path = path or self.path
+        with self._lock:
+            if self._idf is None or not path:
+                return
+            live = self._live[:self._rows]
+            external_ids = [eid for eid in self._external if eid is not None]
+            hashes = [digest for digest in self._hashes if digest is not None]
+            data = {
+                'version': np.array(FORMAT_VERSION),
+                'params': np.array([self.bits, self.seed], dtype=np.int64),
+                'idf': self._idf,
+                'idf_docs': np.array(self._idf_docs),
+                'signatures': self._signatures[:self._rows][live],
+                # IDs joined with NUL bytes, hashes as raw bytes: fixed-width string arrays would be much larger
+                'external_ids': np.frombuffer('\0'.join(external_ids).encode('utf-8'), dtype=np.uint8),
+                'hashes': np.frombuffer(bytes.fromhex(''.join(hashes)), dtype=np.uint8),
+            }
+            self._changes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, 'wb') as f:
+            np.savez(f, **data)
+        os.replace(temporary, path)
+        self.saves += 1
+    
+    def load(self, path: Optional[str] = None) -> bool:
+        """
+        Load a saved index
+        
+        Args:
+            path: File to read (default the index's path)
+        
+        Returns:
+            True if loaded; False if missing or built with other parameters
+        """
+        path = path or self.path
+        if not path or not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            params = [int(value) for value in data['params']]
+            if int(data['version']) != FORMAT_VERSION or params != [self.bits, self.seed]:
+                logger.warning(f"Ignoring ANN index {path} built with other parameters")
+                return False
+            idf = data['idf']
+            idf_docs = int(data['idf_docs'])
+            signatures = data['signatures']
+            raw_ids = data['external_ids'].tobytes().decode('utf-8')
+            raw_hashes = data['hashes'].tobytes().hex()
+        count = len(signatures)
+        external_ids = raw_ids.split('\0') if count else []
+        size = len(raw_hashes) // count if count else 0
+        with self._lock:
+            self._reset()
+            self._idf = idf
+            self._idf_docs = idf_docs
+            self._signatures = signatures.copy()
+            self._external = external_ids
+            self._hashes = [raw_hashes[i * size:(i + 1) * size] for i in range(count)]
+            self._slot_of = {eid: slot for slot, eid in enumerate(external_ids)}
+            self._rows = count
+            self._live = np.ones(count, dtype=bool)
+            self.live_docs = count
+        return True
+    
+    def memory_bytes(self) -> int:
+        """Approximate size of the signatures and IDF snapshot"""
+        with self._lock:
+            size = self._signatures.nbytes + self._live.nbytes
+            return size + (self._idf.nbytes if self._idf is not None else 0)
+    
+    def stats(self) -> Dict:
+        """
+        Get ANN index statistics
+        
+        Returns:
+            Dictionary with parameters, listing counts, maintenance counters
+            and the last query's latency
+        """
+        return {
+            'enabled': settings.ANN_ENABLED,
+            'loaded': self.loaded,
+            'bits': self.bits,
+            'candidates': self.candidates,
+            'listings': self.live_docs,
+            'dead_signatures': self._rows - self.live_docs,
+            'idf_docs': self._idf_docs,
+            'rebuilds': self.rebuilds,
+            'rebuilding': self._rebuilding,
+            'compactions': self.compactions,
+            'saves': self.saves,
+            'queries': self.queries,
+            'last_query_ms': self.last_query_ms,
+        }
+
+
+job_ann = JobANNIndex()
+
+
+def load_job_ann(index: JobANNIndex = job_ann, vectors: JobVectors = job_vectors) -> int:
+    """
+    Load the saved ANN index, then the job vectors, and catch up (startup)
+    
+    The saved index answers queries as soon as it is read (similarities
+    estimated from the signatures); once job_vectors is loaded, only the
+    listings added, changed or removed since the save are updated.
+    
+    Args:
+        index: ANN index to load
+        vectors: Listing vectors (loaded here if they are not yet)
+    
+    Returns:
+        Number of listings (re)indexed while catching up
+    """
+    started = time.perf_counter()
+    if index.load():
+        index.loaded = True
+        logger.info(f"Loaded ANN index of {len(index)} job listings in {time.perf_counter() - started:.2f}s")
+    if not vectors.loaded:
+        load_job_vectors(vectors)
+    changed = index.sync(vectors)
+    index.loaded = True
+    if index.path:
+        index.save()
+    logger.info(f"ANN index up to date: {changed} job listings re-indexed")
+    return changed
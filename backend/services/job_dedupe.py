@@ -0,0 +1,238 @@
+"""
+Job Dedupe - Cross-platform near-duplicate detection with SimHash signatures
+"""
+import hashlib
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.core.config import settings
+
+
+SIGNATURE_BITS = 64
+SHINGLE_SIZE = 2
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _normalize(text: str) -> str:
+    # Lowercase and strip accents so "Développeur" and "developpeur" match
+    text = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def job_text(job: Dict) -> str:
+    """Text a job's signature is computed from: title, company and description"""
+    return f"{job.get('title') or ''} {job.get('company') or ''} {job.get('description') or ''}"
+
+
+@lru_cache(maxsize=100_000)
+def _token_hash(token: str) -> int:
+    # Stable across processes, unlike hash(); signatures are stored.
+    # Accents are stripped here, once per distinct token.
+    token = _normalize(token)
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer, vectorized
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _shingle_hashes(token_hashes: np.ndarray) -> np.ndarray:
+    # Combine the hashes of SHINGLE_SIZE consecutive tokens
+    count = max(1, len(token_hashes) - SHINGLE_SIZE + 1)
+    combined = token_hashes[:count]
+    for offset in range(1, min(SHINGLE_SIZE, len(token_hashes))):
+        combined = _mix(combined) ^ token_hashes[offset:offset + count]
+    return _mix(combined)
+
+
+def simhash(text: str) -> int:
+    """
+    Compute the 64-bit SimHash of a text over word 2-shingles
+    
+    Texts that share most of their shingles get signatures a few bits apart.
+    
+    Args:
+        text: Text to sign
+    
+    Returns:
+        Unsigned 64-bit signature (0 for empty text)
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return 0
+    token_hashes = np.fromiter((_token_hash(t) for t in tokens), dtype=np.uint64, count=len(tokens))
+    hashes = _shingle_hashes(token_hashes).astype('<u8')
+    # One row of 64 bits per shingle; each bit votes +1/-1
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(hashes)
+    packed = np.packbits(votes > 0, bitorder='little')
+    return int.from_bytes(packed.tobytes(), 'little')
+
+
+def job_signature(job: Dict) -> int:
+    """
+    Get the SimHash signature of a job, reusing a stored one if present
+    
+    Args:
+        job: Job dictionary
+    
+    Returns:
+        Unsigned 64-bit signature
+    """
+    stored = job.get('simhash')
+    if stored is not None:
+        return to_unsigned(stored)
+    return simhash(job_text(job))
+
+
+def to_signed(signature: int) -> int:
+    """Convert an unsigned signature to the signed 64-bit value stored in the database"""
+    return signature - (1 << 64) if signature >= 1 << 63 else signature
+
+
+def to_unsigned(signature: int) -> int:
+    """Convert a stored signed 64-bit signature back to unsigned"""
+    return signature & ((1 << 64) - 1)
+
+
+def _company_key(job: Dict) -> str:
+    return ' '.join(_TOKEN_RE.findall(_normalize(job.get('company') or '')))
+
+
+class DuplicateIndex:
+    """
+    Incremental near-duplicate index
+    
+    Two jobs are duplicates if their companies match, they come from
+    different platforms and their signatures are within max_distance bits.
+    
+    Signatures are split into max_distance + 1 bands: by the pigeonhole
+    principle, two signatures at most max_distance bits apart share at least
+    one band exactly. Buckets are keyed on (company, band, band value), so
+    each job is only compared to a handful of candidates and indexing n
+    jobs stays roughly linear instead of pairwise.
+    
+    With keep_jobs=False, groups hold their signature and sources but not
+    the canonical job itself (group['job'] is None), so callers that pass
+    jobs on as they come do not keep every job in memory; 'canonical' tells
+    which copy in 'sources' is the canonical one.
+    """
+    
+    def __init__(self, max_distance: Optional[int] = None, keep_jobs: bool = True):
+        self.max_distance = max_distance if max_distance is not None else settings.DEDUPE_MAX_DISTANCE
+        self.keep_jobs = keep_jobs
+        self.bands = self.max_distance + 1
+        self.band_bits = SIGNATURE_BITS // self.bands
+        self._band_mask = (1 << self.band_bits) - 1
+        self._buckets: Dict[Tuple[str, int, int], List[int]] = {}
+        # {'job', 'signature', 'platforms', 'sources', 'canonical' (index in sources), 'length' (of its description)}
+        self.groups: List[Dict] = []
+        self.duplicates = 0
+    
+    def _band_keys(self, company: str, signature: int):
+        return [
+            (company, band, (signature >> (band * self.band_bits)) & self._band_mask)
+            for band in range(self.bands)
+        ]
+    
+    def find(self, job: Dict, signature: int) -> Optional[int]:
+        """
+        Find the group a job duplicates
+        
+        Args:
+            job: Job dictionary
+            signature: Job signature
+        
+        Returns:
+            Group index, or None
+        """
+        platform = job.get('platform')
+        company = _company_key(job)
+        seen = set()
+        for key in self._band_keys(company, signature):
+            for group_id in self._buckets.get(key, ()):
+                if group_id in seen:
+                    continue
+                seen.add(group_id)
+                group = self.groups[group_id]
+                if platform in group['platforms']:
+                    continue
+                if bin(group['signature'] ^ signature).count('1') <= self.max_distance:
+                    return group_id
+        return None
+    
+    def add(self, job: Dict) -> Tuple[int, bool]:
+        """
+        Index a job, merging it into the group it duplicates
+        
+        The canonical job of a group is its most detailed copy (longest
+        description); every copy is kept in the group's sources.
+        
+        Args:
+            job: Job dictionary
+        
+        Returns:
+            Tuple of (group index, whether the job started a new group)
+        """
+        signature = job_signature(job)
+        source = {'platform': job.get('platform'), 'id': job.get('id'), 'url': job.get('url')}
+        length = len(job.get('description') or '')
+        group_id = self.find(job, signature)
+        
+        if group_id is None:
+            group_id = len(self.groups)
+            self.groups.append({
+                'job': job if self.keep_jobs else None,
+                'signature': signature,
+                'platforms': {job.get('platform')},
+                'sources': [source],
+                'canonical': 0,
+                'length': length,
+            })
+            for key in self._band_keys(_company_key(job), signature):
+                self._buckets.setdefault(key, []).append(group_id)
+            return group_id, True
+        
+        group = self.groups[group_id]
+        group['platforms'].add(job.get('platform'))
+        group['sources'].append(source)
+        if length > group['length']:
+            group['canonical'] = len(group['sources']) - 1
+            group['length'] = length
+            if self.keep_jobs:
+                group['job'] = job
+        self.duplicates += 1
+        return group_id, False
+    
+    def canonical(self, group_id: int) -> Dict:
+        """Get the canonical job of a group with all its source URLs (needs keep_jobs)"""
+        group = self.groups[group_id]
+        return {**group['job'], 'sources': list(group['sources'])}
+
+
+def collapse_duplicates(jobs: List[Dict], max_distance: Optional[int] = None) -> List[Dict]:
+    """
+    Collapse cross-platform copies of the same job into one canonical job
+    
+    Args:
+        jobs: Job dictionaries from one or more platforms
+        max_distance: Maximum signature distance in bits (defaults to DEDUPE_MAX_DISTANCE)
+    
+    Returns:
+        One job per group, in order of first appearance, each with a
+        'sources' list of {'platform', 'id', 'url'}
+    """
+    index = DuplicateIndex(max_distance)
+    for job in jobs:
+        index.add(job)
+    return [index.canonical(group_id) for group_id in range(len(index.groups))]
@@ -0,0 +1,204 @@
+"""
+Job Full-Text Search - Keyword filtering of job_listings in the database
+
+Uses the full-text index created by the d8f88c4ee8b4 migration:
+    
+    SQLite      - FTS5 table job_listings_fts, tokenized with the porter
+                  (English) stemmer. French stemming is done on the query
+                  side: each term's Snowball French stem is also matched as
+                  a prefix ("développeurs" -> developpeur*), when the
+                  snowballstemmer package is installed.
+    PostgreSQL  - generated tsvector columns with the 'french' and
+                  'english' text search configurations (GIN indexed); a
+                  keyword matches if it matches in either language.
+
+Keywords are matched as phrases, so "machine learning" needs both words
+next to each other. Databases without the index fall back to ILIKE
+substring filters in job_store.
+"""
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import column, func, inspect, literal_column, not_, or_, select, table
+from sqlalchemy.orm import Query, Session
+
+from backend.core.config import settings
+from backend.database.models import JobListing
+
+try:
+    import snowballstemmer
+    FRENCH_STEMMER = snowballstemmer.stemmer('french')
+except ImportError:
+    FRENCH_STEMMER = None
+
+
+LANGUAGES = ('french', 'english')
+
+# PostgreSQL text search configuration -> generated tsvector column
+TSVECTOR_COLUMNS = {
+    'french': 'search_fr',
+    'english': 'search_en',
+}
+
+# Shorter French stems are matched exactly ("données" -> "don" would match "donc")
+MIN_PREFIX_LENGTH = 4
+
+_WORD_RE = re.compile(r'\w+')
+
+_fts = table('job_listings_fts', column('rowid'), column('rank'))
+
+# Full-text backend per database URL: 'fts5', 'tsvector' or None
+_backends: Dict[str, Optional[str]] = {}
+
+
+def fulltext_backend(db: Session) -> Optional[str]:
+    """
+    Get the full-text index available in a database (checked once per database)
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        'fts5' (SQLite), 'tsvector' (PostgreSQL) or None if the migration
+        has not been applied
+    """
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _backends:
+        inspector = inspect(bind)
+        backend = None
+        if bind.dialect.name == 'sqlite' and inspector.has_table('job_listings_fts'):
+            backend = 'fts5'
+        elif bind.dialect.name == 'postgresql':
+            columns = {col['name'] for col in inspector.get_columns('job_listings')}
+            if set(TSVECTOR_COLUMNS.values()) <= columns:
+                backend = 'tsvector'
+        _backends[key] = backend
+    return _backends[key]
+
+
+def _languages(languages: Optional[List[str]]) -> List[str]:
+    selected = [lang for lang in (languages or settings.FULLTEXT_LANGUAGES) if lang in LANGUAGES]
+    return selected or list(LANGUAGES)
+
+
+def _words(keyword: str) -> List[str]:
+    return _WORD_RE.findall(keyword.lower())
+
+
+def fts5_expression(keywords: List[str], match_all: bool = False, languages: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Build an FTS5 MATCH expression for keywords
+    
+    Args:
+        keywords: Keywords or phrases
+        match_all: Require every keyword instead of any
+        languages: Stemming languages (default FULLTEXT_LANGUAGES)
+    
+    Returns:
+        MATCH expression, or None if no keyword has a word in it
+    """
+    french = 'french' in _languages(languages) and FRENCH_STEMMER is not None
+    parts = []
+    for keyword in keywords:
+        words = _words(keyword)
+        if not words:
+            continue
+        # Phrase; the porter tokenizer stems its words like the indexed ones
+        variants = ['"' + ' '.join(words) + '"']
+        if french:
+            stems = FRENCH_STEMMER.stemWords(words)
+            if any(stem != word and len(stem) >= MIN_PREFIX_LENGTH for stem, word in zip(stems, words)):
+                # Same phrase with stem prefixes: "stag" * + "developpeur" *
+                variants.append(' + '.join(
+                    f'"{stem}" *' if len(stem) >= MIN_PREFIX_LENGTH else f'"{word}"'
+                    for stem, word in zip(stems, words)
+                ))
+        parts.append(variants[0] if len(variants) == 1 else '(' + ' OR '.join(variants) + ')')
+    if not parts:
+        return None
+    return (' AND ' if match_all else ' OR ').join(parts)
+
+
+def _tsquery(config: str, keywords: List[str], match_all: bool):
+    # phraseto_tsquery per keyword, combined with && (all) or || (any)
+    regconfig = literal_column(f"'{config}'::regconfig")
+    query = None
+    for keyword in keywords:
+        if not _words(keyword):
+            continue
+        part = func.phraseto_tsquery(regconfig, keyword)
+        query = part if query is None else query.op('&&' if match_all else '||')(part)
+    return query
+
+
+def _tsvector_match(keywords: List[str], match_all: bool, languages: List[str]):
+    clauses = []
+    ranks = []
+    for config in languages:
+        query = _tsquery(config, keywords, match_all)
+        if query is None:
+            return None, None
+        vector = literal_column(f"job_listings.{TSVECTOR_COLUMNS[config]}")
+        clauses.append(vector.op('@@')(query))
+        ranks.append(func.ts_rank_cd(vector, query))
+    rank = ranks[0]
+    for other in ranks[1:]:
+        rank = rank + other
+    return or_(*clauses), rank
+
+
+def apply_fulltext(
+    query: Query,
+    backend: str,
+    keywords: Optional[List[str]] = None,
+    excluded_keywords: Optional[List[str]] = None,
+    match_all: bool = False,
+    languages: Optional[List[str]] = None,
+    order_by_rank: bool = True
+) -> Query:
+    """
+    Filter a JobListing query on keywords and excluded keywords in the database
+    
+    Args:
+        query: Query selecting JobListing
+        backend: fulltext_backend() of the session ('fts5' or 'tsvector')
+        keywords: Keywords or phrases the listings must contain
+        excluded_keywords: Keywords or phrases the listings must not contain
+        match_all: Require every keyword instead of any
+        languages: Stemming languages (default FULLTEXT_LANGUAGES)
+        order_by_rank: Order by full-text relevance when keywords are given
+    
+    Returns:
+        Filtered query
+    """
+    languages = _languages(languages)
+    keywords = [kw for kw in keywords or [] if kw and kw.strip()]
+    excluded_keywords = [kw for kw in excluded_keywords or [] if kw and kw.strip()]
+    
+    if backend == 'fts5':
+        match = literal_column('job_listings_fts').op('MATCH')
+        expression = fts5_expression(keywords, match_all, languages) if keywords else None
+        if expression is not None:
+            query = query.join(_fts, _fts.c.rowid == JobListing.id).filter(match(expression))
+            if order_by_rank:
+                query = query.order_by(_fts.c.rank)  # bm25(), lower is better
+        excluded = fts5_expression(excluded_keywords, False, languages) if excluded_keywords else None
+        if excluded is not None:
+            query = query.filter(JobListing.id.notin_(select(_fts.c.rowid).where(match(excluded))))
+        return query
+    
+    if backend == 'tsvector':
+        if keywords:
+            clause, rank = _tsvector_match(keywords, match_all, languages)
+            if clause is not None:
+                query = query.filter(clause)
+                if order_by_rank:
+                    query = query.order_by(rank.desc())
+        if excluded_keywords:
+            clause, _ = _tsvector_match(excluded_keywords, False, languages)
+            if clause is not None:
+                query = query.filter(not_(clause))
+        return query
+    
+    raise ValueError(f"Unknown full-text backend: {backend}")
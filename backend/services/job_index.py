@@ -0,0 +1,384 @@
+"""
+Job Index - In-memory inverted index with BM25 ranking over job_listings
+
+The title, description and requirements of every active listing are
+tokenized (lowercased, accents stripped) into term -> postings lists of
+(document, term frequency), stored as growable NumPy arrays. A listing
+that changes gets a new document number and its old one is tombstoned,
+so updates only ever append; postings are compacted once tombstones pile
+up. The index is loaded from job_listings at startup and kept current by
+upsert_jobs(). A query only reads the postings of its own terms, so the
+BM25-ranked candidates handed to JobMatcher are found without touching
+the rest of the listings.
+"""
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from backend.core.config import settings
+from backend.database.base import SessionLocal
+from backend.database.models import JobListing
+from backend.services.job_matcher import parse_skills
+
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Compact when tombstoned documents exceed this share of all documents
+COMPACT_RATIO = 0.3
+COMPACT_MIN_DEAD = 1000
+
+_TOKEN_RE = re.compile(r'\w\w+')
+
+
+def _accent_table() -> Dict[int, str]:
+    # Latin letters with diacritics -> base letter, for str.translate
+    table = {}
+    for code in range(0xC0, 0x250):
+        decomposed = unicodedata.normalize('NFKD', chr(code))
+        base = ''.join(c for c in decomposed if not unicodedata.combining(c))
+        if base and base != chr(code):
+            table[code] = base
+    return table
+
+
+_ACCENTS = _accent_table()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split a text into index terms
+    
+    Terms are runs of 2+ word characters, lowercased and without accents,
+    so "Développeur" and "developpeur" are the same term.
+    
+    Args:
+        text: Text to tokenize
+    
+    Returns:
+        List of terms, in order, with repetitions
+    """
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower().translate(_ACCENTS))
+
+
+def candidate_terms(criteria: Dict, profile: Optional[Dict] = None) -> List[str]:
+    """
+    Get the query terms of a user's criteria: required keywords, domain and profile skills
+    
+    Args:
+        criteria: Search criteria dictionary (as given to JobMatcher)
+        profile: User profile dictionary
+    
+    Returns:
+        Distinct terms, in order
+    """
+    phrases = list(criteria.get('required_keywords') or [])
+    if criteria.get('domain'):
+        phrases.append(criteria['domain'])
+    if profile and profile.get('skills'):
+        phrases.extend(parse_skills(profile['skills']))
+    terms = []
+    for phrase in phrases:
+        if isinstance(phrase, str):
+            terms.extend(tokenize(phrase))
+    return list(dict.fromkeys(terms))
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    grown = np.empty(max(size, 2 * len(array), 8), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class _Postings:
+    """Documents containing a term, with the term's frequency in each"""
+    
+    __slots__ = ('docs', 'tfs', 'size')
+    
+    def __init__(self):
+        self.docs = np.empty(0, dtype=np.uint32)
+        self.tfs = np.empty(0, dtype=np.uint16)
+        self.size = 0
+    
+    def extend(self, docs: List[int], tfs: List[int]) -> None:
+        end = self.size + len(docs)
+        if end > len(self.docs):
+            self.docs = _grow(self.docs, end)
+            self.tfs = _grow(self.tfs, end)
+        self.docs[self.size:end] = docs
+        self.tfs[self.size:end] = np.minimum(tfs, 65535)
+        self.size = end
+    
+    def view(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.docs[:self.size], self.tfs[:self.size]
+
+
+class JobIndex:
+    """
+    Inverted index of job listings, keyed on external_id
+    
+    Thread-safe: upserts run in worker threads while queries are served.
+    """
+    
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        
+        self._lock = threading.Lock()
+        self._postings: Dict[str, _Postings] = {}
+        self._doc_of: Dict[str, int] = {}  # external_id -> live document number
+        self._external: List[Optional[str]] = []  # Document number -> external_id (None once dead)
+        self._lengths = np.empty(0, dtype=np.uint32)
+        self._live = np.empty(0, dtype=bool)
+        self._docs = 0  # Document numbers given out
+        self.live_docs = 0
+        self.total_length = 0
+        
+        self.loaded = False
+        self.updates = 0
+        self.queries = 0
+        self.compactions = 0
+        self.last_query_ms = 0.0
+    
+    def __len__(self) -> int:
+        return self.live_docs
+    
+    def _remove(self, external_id: str) -> None:
+        doc = self._doc_of.pop(external_id, None)
+        if doc is not None:
+            self._live[doc] = False
+            self._external[doc] = None
+            self.live_docs -= 1
+            self.total_length -= int(self._lengths[doc])
+    
+    def update(self, rows: Iterable[Dict], skip_existing: bool = False) -> int:
+        """
+        Index new or changed listings, and drop inactive ones
+        
+        Args:
+            rows: Dictionaries with external_id, title, description,
+                requirements and optionally is_active
+            skip_existing: Leave listings already indexed untouched (loading)
+        
+        Returns:
+            Number of listings indexed
+        """
+        # Tokenize outside the lock
+        documents = []
+        removed = []
+        for row in rows:
+            if row.get('is_active', True) is False:
+                removed.append(row['external_id'])
+                continue
+            counts = Counter(tokenize(row.get('title')))
+            counts.update(tokenize(row.get('description')))
+            counts.update(tokenize(row.get('requirements')))
+            documents.append((row['external_id'], counts))
+        
+        with self._lock:
+            for external_id in removed:
+                self._remove(external_id)
+            if skip_existing:
+                documents = [(eid, counts) for eid, counts in documents if eid not in self._doc_of]
+            
+            end = self._docs + len(documents)
+            if end > len(self._lengths):
+                self._lengths = _grow(self._lengths, end)
+                self._live = _grow(self._live, end)
+            
+            # Gather the batch's postings per term, then append each term once
+            batch: Dict[str, Tuple[List[int], List[int]]] = {}
+            for external_id, counts in documents:
+                self._remove(external_id)
+                doc = self._docs
+                self._docs += 1
+                length = sum(counts.values())
+                self._doc_of[external_id] = doc
+                self._external.append(external_id)
+                self._lengths[doc] = length
+                self._live[doc] = True
+                self.live_docs += 1
+                self.total_length += length
+                for term, tf in counts.items():
+                    entry = batch.get(term)
+                    if entry is None:
+                        batch[term] = ([doc], [tf])
+                    else:
+                        entry[0].append(doc)
+                        entry[1].append(tf)
+            
+            for term, (docs, tfs) in batch.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = _Postings()
+                postings.extend(docs, tfs)
+            
+            self.updates += len(documents) + len(removed)
+            dead = self._docs - self.live_docs
+            if dead >= COMPACT_MIN_DEAD and dead > COMPACT_RATIO * self._docs:
+                self._compact()
+        return len(documents)
+    
+    def remove(self, external_ids: Iterable[str]) -> None:
+        """Drop listings from the index"""
+        with self._lock:
+            for external_id in external_ids:
+                self._remove(external_id)
+    
+    def _compact(self) -> None:
+        # Renumber live documents and drop the postings of dead ones
+        started = time.perf_counter()
+        live = self._live[:self._docs]
+        renumber = (np.cumsum(live) - 1).astype(np.uint32)
+        for term in list(self._postings):
+            postings = self._postings[term]
+            docs, tfs = postings.view()
+            keep = live[docs]
+            if not keep.any():
+                del self._postings[term]
+                continue
+            postings.docs = renumber[docs[keep]]
+            postings.tfs = tfs[keep]
+            postings.size = len(postings.docs)
+        self._external = [eid for eid in self._external if eid is not None]
+        self._doc_of = {eid: doc for doc, eid in enumerate(self._external)}
+        self._lengths = self._lengths[:self._docs][live]
+        self._live = np.ones(len(self._external), dtype=bool)
+        self._docs = len(self._external)
+        self.compactions += 1
+        logger.debug(f"Compacted job index to {self._docs} listings in {time.perf_counter() - started:.2f}s")
+    
+    def search(self, terms: Iterable[str], limit: int = 500) -> List[Tuple[str, float]]:
+        """
+        Rank listings by BM25 against query terms
+        
+        Args:
+            terms: Query terms (phrases are tokenized; each term counts once)
+            limit: Maximum number of listings
+        
+        Returns:
+            (external_id, BM25 score) pairs, best first
+        """
+        tokens = list(dict.fromkeys(token for term in terms for token in tokenize(term)))
+        started = time.perf_counter()
+        with self._lock:
+            self.queries += 1
+            if not tokens or not self.live_docs:
+                return []
+            count = self.live_docs
+            avg_length = self.total_length / count
+            lengths = self._lengths
+            live = self._live
+            
+            doc_parts = []
+            weight_parts = []
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    continue
+                docs, tfs = postings.view()
+                keep = live[docs]
+                docs = docs[keep]
+                if not len(docs):
+                    continue
+                tf = tfs[keep].astype(np.float64)
+                idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+                norm = self.k1 * (1 - self.b + self.b * lengths[docs] / avg_length)
+                doc_parts.append(docs)
+                weight_parts.append(idf * tf * (self.k1 + 1) / (tf + norm))
+            
+            if not doc_parts:
+                return []
+            if len(doc_parts) == 1:
+                docs, scores = doc_parts[0], weight_parts[0]
+            else:
+                docs, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+                scores = np.bincount(inverse, weights=np.concatenate(weight_parts))
+            
+            if len(scores) > limit:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+            else:
+                top = np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind='stable')]
+            results = [(self._external[docs[i]], float(scores[i])) for i in top]
+        self.last_query_ms = round((time.perf_counter() - started) * 1000, 2)
+        return results
+    
+    def memory_bytes(self) -> int:
+        """Approximate size of the postings and document arrays"""
+        with self._lock:
+            postings = sum(p.docs.nbytes + p.tfs.nbytes for p in self._postings.values())
+            return postings + self._lengths.nbytes + self._live.nbytes
+    
+    def stats(self) -> Dict:
+        """
+        Get index statistics
+        
+        Returns:
+            Dictionary with listing, tombstone and term counts, update and
+            query counters and the last query's latency
+        """
+        return {
+            'enabled': settings.JOB_INDEX_ENABLED,
+            'loaded': self.loaded,
+            'listings': self.live_docs,
+            'tombstones': self._docs - self.live_docs,
+            'terms': len(self._postings),
+            'avg_length': round(self.total_length / self.live_docs, 1) if self.live_docs else 0.0,
+            'updates': self.updates,
+            'compactions': self.compactions,
+            'queries': self.queries,
+            'last_query_ms': self.last_query_ms,
+        }
+
+
+job_index = JobIndex()
+
+
+def load_job_index(index: JobIndex = job_index, chunk_size: int = 5000) -> int:
+    """
+    Index every active listing of job_listings (startup)
+    
+    Listings indexed meanwhile by upsert_jobs() are newer than the rows
+    read here and are left as they are.
+    
+    Args:
+        index: Index to load
+        chunk_size: Rows read per round trip
+    
+    Returns:
+        Number of listings indexed
+    """
+    started = time.perf_counter()
+    db = SessionLocal()
+    loaded = 0
+    try:
+        rows = db.query(
+            JobListing.external_id, JobListing.title, JobListing.description, JobListing.requirements
+        ).filter(JobListing.is_active == True).yield_per(chunk_size)
+        chunk = []
+        for external_id, title, description, requirements in rows:
+            chunk.append({
+                'external_id': external_id,
+                'title': title,
+                'description': description,
+                'requirements': requirements,
+            })
+            if len(chunk) >= chunk_size:
+                loaded += index.update(chunk, skip_existing=True)
+                chunk = []
+        loaded += index.update(chunk, skip_existing=True)
+    finally:
+        db.close()
+    index.loaded = True
+    logger.info(f"Indexed {loaded} job listings in {time.perf_counter() - started:.1f}s")
+    return loaded
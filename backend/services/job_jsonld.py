@@ -0,0 +1,248 @@
+"""
+JSON-LD Job Extractor - schema.org JobPosting fast path
+
+Most job boards embed their listings as schema.org JobPosting JSON-LD for
+search engines. Those blocks are found with a regular expression over the
+raw page, without building a DOM, and mapped onto the job dictionary used
+by scrapers (and so onto JobListing columns). Scrapers only fall back to
+DOM parsing for pages without JobPosting data.
+"""
+import html as html_lib
+import json
+import re
+from typing import Dict, Iterator, List, Optional, Union
+
+from backend.database.models import JobType
+
+
+_JSONLD_SCRIPT = re.compile(
+    r'<script[^>]*?type\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+_TAG = re.compile(r'<[^>]+>')
+_BLOCK_TAG = re.compile(r'<\s*(?:br|/p|/li|/h[1-6]|/div)\s*/?>', re.IGNORECASE)
+_SPACES = re.compile(r'[ \t\r\f\v]+')
+_BLANK_LINES = re.compile(r'\n\s*\n+')
+
+# schema.org employmentType values, plus the French contract names some boards use
+EMPLOYMENT_TYPES = {
+    'FULL_TIME': JobType.FULL_TIME,
+    'PART_TIME': JobType.PART_TIME,
+    'CONTRACTOR': JobType.CONTRACT,
+    'TEMPORARY': JobType.TEMPORARY,
+    'PER_DIEM': JobType.TEMPORARY,
+    'INTERN': JobType.INTERNSHIP,
+    'INTERNSHIP': JobType.INTERNSHIP,
+    'FREELANCE': JobType.FREELANCE,
+    'CDI': JobType.FULL_TIME,
+    'CDD': JobType.CONTRACT,
+    'INTERIM': JobType.TEMPORARY,
+    'STAGE': JobType.INTERNSHIP,
+    'ALTERNANCE': JobType.INTERNSHIP,
+    'APPRENTISSAGE': JobType.INTERNSHIP,
+}
+
+# Multipliers from a salary unitText to a yearly amount
+SALARY_PERIODS = {
+    'HOUR': 1607,  # French statutory working hours per year
+    'DAY': 218,
+    'WEEK': 52,
+    'MONTH': 12,
+    'YEAR': 1,
+}
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _types(node: Dict) -> List[str]:
+    return [str(t) for t in _as_list(node.get('@type'))]
+
+
+def _name(value) -> Optional[str]:
+    """Get the name of a schema.org Thing, or the value itself if it is a string"""
+    if isinstance(value, dict):
+        value = value.get('name')
+    if isinstance(value, (str, int, float)):
+        return str(value).strip() or None
+    return None
+
+
+def _walk(node, depth: int = 0) -> Iterator[Dict]:
+    # JobPostings can sit at the top level, in a list, under @graph or in an ItemList
+    if depth > 6:
+        return
+    if isinstance(node, list):
+        for item in node:
+            yield from _walk(item, depth + 1)
+    elif isinstance(node, dict):
+        if 'JobPosting' in _types(node):
+            yield node
+            return
+        for key in ('@graph', 'itemListElement', 'item'):
+            if key in node:
+                yield from _walk(node[key], depth + 1)
+
+
+def find_job_postings(html: Union[str, bytes]) -> List[Dict]:
+    """
+    Find the JobPosting objects of a page's JSON-LD blocks
+    
+    Args:
+        html: Page body (str or bytes)
+    
+    Returns:
+        List of raw JobPosting dictionaries (empty if the page has none)
+    """
+    if isinstance(html, bytes):
+        if b'JobPosting' not in html:
+            return []
+        html = html.decode('utf-8', errors='replace')
+    elif 'JobPosting' not in html:
+        return []
+    
+    postings = []
+    for match in _JSONLD_SCRIPT.finditer(html):
+        block = match.group(1)
+        if 'JobPosting' not in block:
+            continue
+        try:
+            data = json.loads(block.strip().strip(';'), strict=False)
+        except ValueError:
+            continue
+        postings.extend(_walk(data))
+    return postings
+
+
+def html_to_text(value: Optional[str]) -> Optional[str]:
+    """Convert an HTML fragment (JobPosting descriptions usually are) to plain text"""
+    if not value:
+        return None
+    text = _BLOCK_TAG.sub('\n', html_lib.unescape(value))
+    text = html_lib.unescape(_TAG.sub('', text))
+    text = _BLANK_LINES.sub('\n\n', _SPACES.sub(' ', text))
+    return '\n'.join(line.strip() for line in text.splitlines()).strip() or None
+
+
+def _location(posting: Dict) -> Optional[str]:
+    for place in _as_list(posting.get('jobLocation')):
+        address = place.get('address') if isinstance(place, dict) else place
+        if isinstance(address, str):
+            return address.strip() or None
+        if isinstance(address, dict):
+            parts = [_name(address.get(key)) for key in ('addressLocality', 'addressRegion', 'addressCountry')]
+            parts = [part for i, part in enumerate(parts) if part and part not in parts[:i]]
+            if parts:
+                return ', '.join(parts)
+    requirements = _as_list(posting.get('applicantLocationRequirements'))
+    return _name(requirements[0]) if requirements else None
+
+
+def _salary(posting: Dict) -> Dict:
+    salary = posting.get('baseSalary') or posting.get('estimatedSalary')
+    salary = _as_list(salary)[0] if salary else None
+    if salary is None:
+        return {}
+    if not isinstance(salary, dict):
+        salary = {'value': salary}
+    
+    value = salary.get('value')
+    unit = salary.get('unitText')
+    if isinstance(value, dict):
+        unit = value.get('unitText') or unit
+        low = value.get('minValue', value.get('value'))
+        high = value.get('maxValue', value.get('value'))
+    else:
+        low = high = value
+    try:
+        low = float(low) if low is not None else None
+        high = float(high) if high is not None else None
+    except (TypeError, ValueError):
+        return {}
+    if low is None and high is None:
+        return {}
+    
+    factor = SALARY_PERIODS.get(str(unit).upper(), 1) if unit else 1
+    result = {
+        'salary_min': low * factor if low is not None else None,
+        'salary_max': high * factor if high is not None else None,
+    }
+    if salary.get('currency'):
+        result['salary_currency'] = str(salary['currency'])[:10]
+    return result
+
+
+def _job_type(posting: Dict) -> Optional[str]:
+    for value in _as_list(posting.get('employmentType')):
+        for token in re.split(r'[,/]', str(value)):
+            job_type = EMPLOYMENT_TYPES.get(token.strip().upper().replace('-', '_').replace(' ', '_'))
+            if job_type is not None:
+                return job_type.value
+    return None
+
+
+def _identifier(posting: Dict) -> Optional[str]:
+    identifier = posting.get('identifier')
+    if isinstance(identifier, dict):
+        identifier = identifier.get('value')
+    if identifier is None:
+        return None
+    return str(identifier).strip() or None
+
+
+def posting_to_job(posting: Dict, url: Optional[str] = None) -> Dict:
+    """
+    Map a schema.org JobPosting onto a scraped job dictionary
+    
+    Salaries are converted to yearly amounts from their unitText
+    (HOUR, DAY, WEEK, MONTH or YEAR).
+    
+    Args:
+        posting: JobPosting dictionary
+        url: URL of the page it was found on (used when the posting has none)
+    
+    Returns:
+        Job dictionary with JobListing field names
+    """
+    requirements = [
+        html_to_text(_name(value))
+        for key in ('qualifications', 'skills', 'experienceRequirements')
+        for value in _as_list(posting.get(key))
+    ]
+    job = {
+        'id': _identifier(posting),
+        'title': html_to_text(_name(posting.get('title'))),
+        'company': _name(posting.get('hiringOrganization')),
+        'location': _location(posting),
+        'description': html_to_text(_name(posting.get('description'))),
+        'requirements': '\n'.join(filter(None, requirements)) or None,
+        'job_type': _job_type(posting),
+        'is_remote': any(str(t).upper() == 'TELECOMMUTE' for t in _as_list(posting.get('jobLocationType'))),
+        'url': _name(posting.get('url')) or url,
+        'posted_date': _name(posting.get('datePosted')),
+        'expiry_date': _name(posting.get('validThrough')),
+    }
+    job.update(_salary(posting))
+    return job
+
+
+def extract_job_postings(html: Union[str, bytes], url: Optional[str] = None) -> List[Dict]:
+    """
+    Extract the jobs of a page from its JobPosting JSON-LD
+    
+    Args:
+        html: Page body (str or bytes)
+        url: Page URL
+    
+    Returns:
+        List of job dictionaries (empty if the page has no JobPosting data)
+    """
+    jobs = []
+    for posting in find_job_postings(html):
+        job = posting_to_job(posting, url)
+        if job['title']:
+            jobs.append(job)
+    return jobs
@@ -1,23 +1,178 @@
 """
 Job Matching Service - Calculate relevance scores for job listings
+
+The matcher is compiled once per search: criteria and profile terms are
+lowercased, de-duplicated and gathered in a single TermSet, and each job's
+"title description" text is lowercased once and scanned for all terms in
+one pass before the score is computed from the matched term IDs.
+
+Large batches are scored column-wise (score_jobs): the jobs become NumPy
+arrays of location points, remote and job-type flags and a sparse
+job x term hit matrix, and every score component is a vector operation.
+
+An optional similarity scorer (job_similarity.ResumeSimilarity) adds
+points for the TF-IDF similarity between the job and the user's resume.
 """
-from typing import Dict, List
+import heapq
+import json
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
 from backend.database.models import JobListing, SearchCriteria, UserProfile
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+# Below this many distinct terms, one C substring search per term beats
+# walking the Aho-Corasick matches of the text (measured with
+# backend/benchmarks/bench_job_matcher.py)
+AUTOMATON_MIN_TERMS = 24
+
+# match_jobs() scores lists of at least this many jobs with score_jobs()
+BATCH_MIN_JOBS = 64
+
+# Points for a job as similar to the resume as SIMILARITY_FULL_SCORE
+SIMILARITY_POINTS = 15
+
+# A job is 'matched' from this relevance score up
+MATCH_THRESHOLD = 50
+
+
+class TermSet:
+    """
+    Distinct lowercase terms searched in a text in one pass
+    
+    Uses an Aho-Corasick automaton (pyahocorasick) when it is installed and
+    there are at least AUTOMATON_MIN_TERMS terms, and a substring search per
+    term otherwise. Matching is plain substring matching either way, so
+    results are the same as `term in text`.
+    """
+    
+    def __init__(self):
+        self.terms: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._automaton = None
+        self._always: Set[int] = set()  # '' is in every text
+    
+    def add(self, term: str) -> int:
+        """
+        Add a term (lowercased) and get its ID
+        
+        Args:
+            term: Term to search
+        
+        Returns:
+            Term ID, shared by equal terms
+        """
+        term = term.lower()
+        term_id = self._ids.get(term)
+        if term_id is None:
+            term_id = self._ids[term] = len(self.terms)
+            self.terms.append(term)
+            if not term:
+                self._always.add(term_id)
+        return term_id
+    
+    def compile(self) -> 'TermSet':
+        """Build the automaton, once all terms are added"""
+        if AHOCORASICK_AVAILABLE and len(self.terms) >= AUTOMATON_MIN_TERMS:
+            automaton = ahocorasick.Automaton()
+            for term_id, term in enumerate(self.terms):
+                if term:
+                    automaton.add_word(term, term_id)
+            automaton.make_automaton()
+            self._automaton = automaton
+        return self
+    
+    @property
+    def uses_automaton(self) -> bool:
+        return self._automaton is not None
+    
+    def find(self, text: str) -> Set[int]:
+        """
+        Find the terms contained in a lowercase text
+        
+        Args:
+            text: Lowercased text
+        
+        Returns:
+            IDs of the terms found
+        """
+        if self._automaton is None:
+            return {term_id for term_id, term in enumerate(self.terms) if term in text}
+        found = set(self._always)
+        total = len(self.terms)
+        for _, term_id in self._automaton.iter(text):
+            found.add(term_id)
+            if len(found) == total:
+                break
+        return found
+
+
+def parse_skills(skills) -> list:
+    """Get profile skills as a list (they may be stored as JSON or comma-separated)"""
+    if isinstance(skills, str):
+        # Try to parse JSON
+        try:
+            skills = json.loads(skills)
+        except Exception:
+            skills = [s.strip() for s in skills.split(',')]
+    return list(skills)
+
 
 class JobMatcher:
     """Calculate relevance scores for job listings based on user criteria and profile"""
     
-    def __init__(self, search_criteria: Dict, user_profile: Dict = None):
+    def __init__(self, search_criteria: Dict, user_profile: Dict = None, similarity=None):
         """
         Initialize matcher with search criteria and optional user profile
         
         Args:
             search_criteria: Dictionary with search criteria
             user_profile: Optional user profile dictionary
+            similarity: Optional resume similarity scorer, with score(job)
+                and score_jobs(jobs) giving similarities between 0 and 1
         """
         self.criteria = search_criteria
         self.profile = user_profile or {}
+        self.similarity = similarity
+        self._compile()
+    
+    def _compile(self) -> None:
+        criteria = self.criteria
+        self._location = criteria['location'].lower() if criteria.get('location') else None
+        self._preferred_locations = [
+            loc.lower() for loc in criteria.get('preferred_locations') or []
+        ]
+        self._remote_only = bool(criteria.get('remote_only'))
+        self._job_type = criteria.get('job_type') or None
+        
+        # Keyword lists keep their duplicates: each entry counts in the ratios
+        terms = TermSet()
+        self._required = [terms.add(kw) for kw in criteria.get('required_keywords') or []]
+        self._excluded = [terms.add(kw) for kw in criteria.get('excluded_keywords') or []]
+        self._domain = terms.add(criteria['domain']) if criteria.get('domain') else None
+        skills = parse_skills(self.profile['skills']) if self.profile.get('skills') else []
+        self._skills = [terms.add(skill) for skill in skills]
+        self._terms = terms.compile()
+    
+    def _location_points(self, job_location: str) -> float:
+        if self._location in job_location or job_location in self._location:
+            return 20.0
+        for pref_loc in self._preferred_locations:
+            if pref_loc in job_location:
+                return 15.0
+        return 0.0
+    
+    def _find_terms(self, job: Dict) -> Set[int]:
+        if not self._terms.terms:
+            return set()
+        return self._terms.find(f"{job.get('title', '')} {job.get('description', '')}".lower())
     
     def calculate_relevance_score(self, job: Dict) -> float:
         """
@@ -25,104 +180,167 @@ class JobMatcher:
         
         Args:
             job: Job dictionary
-            
+        
         Returns:
             Relevance score between 0 and 100
         """
         score = 0.0
         max_score = 100.0
+        found = self._find_terms(job)
         
         # Location match (20 points)
-        if self.criteria.get('location'):
-            job_location = (job.get('location') or '').lower()
-            criteria_location = self.criteria['location'].lower()
-            if criteria_location in job_location or job_location in criteria_location:
-                score += 20
-            elif self.criteria.get('preferred_locations'):
-                for pref_loc in self.criteria['preferred_locations']:
-                    if pref_loc.lower() in job_location:
-                        score += 15
-                        break
+        if self._location is not None:
+            score += self._location_points((job.get('location') or '').lower())
         
         # Remote match (10 points)
-        if self.criteria.get('remote_only') and job.get('is_remote'):
-            score += 10
-        elif not self.criteria.get('remote_only') and job.get('is_remote'):
-            score += 5
+        if job.get('is_remote'):
+            score += 10 if self._remote_only else 5
         
         # Job type match (15 points)
-        if self.criteria.get('job_type'):
-            if job.get('job_type') == self.criteria['job_type']:
-                score += 15
+        if self._job_type is not None and job.get('job_type') == self._job_type:
+            score += 15
         
         # Required keywords match (30 points)
-        required_keywords = self.criteria.get('required_keywords', [])
-        if required_keywords:
-            job_text = f"{job.get('title', '')} {job.get('description', '')}".lower()
-            matched_keywords = sum(1 for kw in required_keywords if kw.lower() in job_text)
+        if self._required:
+            matched_keywords = sum(1 for term_id in self._required if term_id in found)
             if matched_keywords > 0:
-                score += (matched_keywords / len(required_keywords)) * 30
+                score += (matched_keywords / len(self._required)) * 30
         
         # Excluded keywords penalty (-50 points)
-        excluded_keywords = self.criteria.get('excluded_keywords', [])
-        if excluded_keywords:
-            job_text = f"{job.get('title', '')} {job.get('description', '')}".lower()
-            for excluded_kw in excluded_keywords:
-                if excluded_kw.lower() in job_text:
-                    score -= 50
-                    break
+        if any(term_id in found for term_id in self._excluded):
+            score -= 50
         
         # Domain match (15 points)
-        if self.criteria.get('domain'):
-            job_text = f"{job.get('title', '')} {job.get('description', '')}".lower()
-            domain = self.criteria['domain'].lower()
-            if domain in job_text:
-                score += 15
+        if self._domain is not None and self._domain in found:
+            score += 15
         
         # Skills match from profile (10 points)
-        if self.profile.get('skills'):
-            job_text = f"{job.get('title', '')} {job.get('description', '')}".lower()
-            profile_skills = self.profile['skills']
-            if isinstance(profile_skills, str):
-                # Try to parse JSON
-                import json
-                try:
-                    profile_skills = json.loads(profile_skills)
-                except:
-                    profile_skills = [s.strip() for s in profile_skills.split(',')]
-            
-            matched_skills = sum(1 for skill in profile_skills if skill.lower() in job_text)
+        if self._skills:
+            matched_skills = sum(1 for term_id in self._skills if term_id in found)
             if matched_skills > 0:
-                score += min((matched_skills / len(profile_skills)) * 10, 10)
+                score += min((matched_skills / len(self._skills)) * 10, 10)
+        
+        # Resume similarity (15 points)
+        if self.similarity is not None:
+            score += self.similarity.score(job) * SIMILARITY_POINTS
         
         # Ensure score is between 0 and 100
         score = max(0, min(score, max_score))
         
         return round(score, 1)
     
-    def match_jobs(self, jobs: List[Dict]) -> List[Dict]:
+    def _term_weights(self, term_ids: List[int]) -> np.ndarray:
+        # How many times each term appears in a criteria list
+        return np.bincount(np.asarray(term_ids, dtype=np.intp), minlength=len(self._terms.terms)).astype(np.float64)
+    
+    def score_jobs(self, jobs: List[Dict]) -> List[float]:
+        """
+        Calculate the relevance scores of a batch of jobs (0-100)
+        
+        Same scores as calculate_relevance_score(), computed column-wise:
+        components are added in the same order, so the float results match.
+        
+        Args:
+            jobs: List of job dictionaries
+        
+        Returns:
+            Relevance scores, in the order of `jobs`
+        """
+        count = len(jobs)
+        if not count:
+            return []
+        score = np.zeros(count)
+        
+        # Location match (20 points): computed once per distinct location
+        if self._location is not None:
+            locations = np.array([(job.get('location') or '').lower() for job in jobs], dtype=object)
+            distinct, codes = np.unique(locations, return_inverse=True)
+            points = np.array([self._location_points(location) for location in distinct])
+            score += points[codes]
+        
+        # Remote match (10 points)
+        remote = np.fromiter((bool(job.get('is_remote')) for job in jobs), dtype=bool, count=count)
+        score += np.where(remote, 10.0 if self._remote_only else 5.0, 0.0)
+        
+        # Job type match (15 points)
+        if self._job_type is not None:
+            same_type = np.fromiter((job.get('job_type') == self._job_type for job in jobs), dtype=bool, count=count)
+            score += np.where(same_type, 15.0, 0.0)
+        
+        # Sparse job x term hit matrix, as (row, column) pairs
+        rows: List[int] = []
+        cols: List[int] = []
+        if self._terms.terms:
+            for row, job in enumerate(jobs):
+                found = self._find_terms(job)
+                rows.extend([row] * len(found))
+                cols.extend(found)
+        rows = np.asarray(rows, dtype=np.intp)
+        cols = np.asarray(cols, dtype=np.intp)
+        
+        def hits(term_ids: List[int]) -> np.ndarray:
+            # Matched entries of a criteria list, per job
+            return np.bincount(rows, weights=self._term_weights(term_ids)[cols], minlength=count)
+        
+        # Required keywords match (30 points)
+        if self._required:
+            matched = hits(self._required)
+            score += np.where(matched > 0, (matched / len(self._required)) * 30, 0.0)
+        
+        # Excluded keywords penalty (-50 points)
+        if self._excluded:
+            score -= np.where(hits(self._excluded) > 0, 50.0, 0.0)
+        
+        # Domain match (15 points)
+        if self._domain is not None:
+            score += np.where(hits([self._domain]) > 0, 15.0, 0.0)
+        
+        # Skills match from profile (10 points)
+        if self._skills:
+            matched = hits(self._skills)
+            score += np.where(matched > 0, np.minimum((matched / len(self._skills)) * 10, 10), 0.0)
+        
+        # Resume similarity (15 points)
+        if self.similarity is not None:
+            score += np.asarray(self.similarity.score_jobs(jobs)) * SIMILARITY_POINTS
+        
+        # Python's round() is correctly rounded, np.round() is not always
+        return [round(value, 1) for value in np.clip(score, 0, 100).tolist()]
+    
+    @staticmethod
+    def is_match(score: float) -> bool:
+        """Whether a relevance score counts as a match (MATCH_THRESHOLD or more)"""
+        return score >= MATCH_THRESHOLD
+    
+    def match_jobs(self, jobs: List[Dict], top_k: Optional[int] = None, offset: int = 0) -> List[Dict]:
         """
         Match and score a list of jobs
         
+        With top_k, the page is picked by heap selection over the scores
+        (O(n log k)) instead of a full sort, and only the returned jobs are
+        copied. The order is the same as the full ranking's, ties included.
+        
         Args:
             jobs: List of job dictionaries
+            top_k: Number of jobs to return (all if None)
+            offset: Number of best jobs to skip
             
         Returns:
             List of jobs with relevance scores, sorted by score descending
         """
-        scored_jobs = []
+        if len(jobs) >= BATCH_MIN_JOBS:
+            scores = self.score_jobs(jobs)
+        else:
+            scores = [self.calculate_relevance_score(job) for job in jobs]
         
-        for job in jobs:
-            score = self.calculate_relevance_score(job)
-            job_with_score = {
-                **job,
-                'relevance_score': score,
-                'matched': score >= 50  # Consider matched if score >= 50
-            }
-            scored_jobs.append(job_with_score)
+        # Rank indexes, not jobs; both keep the input order for equal scores
+        if top_k is None:
+            ranked = sorted(range(len(jobs)), key=scores.__getitem__, reverse=True)[offset:]
+        else:
+            ranked = heapq.nlargest(offset + top_k, range(len(jobs)), key=scores.__getitem__)[offset:]
         
-        # Sort by relevance score descending
-        scored_jobs.sort(key=lambda x: x['relevance_score'], reverse=True)
-        
-        return scored_jobs
-
+        return [{
+            **jobs[i],
+            'relevance_score': scores[i],
+            'matched': self.is_match(scores[i])
+        } for i in ranked]
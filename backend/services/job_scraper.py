@@ -1,41 +1,432 @@
 """
 Job Scraping Service
 """
-from typing import List, Dict
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Dict, Iterable, Optional
+import httpx
+
+from backend.core.config import settings
+from backend.services.html_parser import HtmlNode, parse_html
+from backend.services.http_transport import get_transport
+from backend.services.job_jsonld import extract_job_postings
+from backend.services.page_archive import archive_page
+from backend.services.resilience import CircuitOpenError, get_circuit_breaker, get_rate_limiter
+from backend.services.incremental_crawl import (
+    FetchResult,
+    current_crawl_stats,
+    hash_content,
+    page_states,
+    parse_sitemap
+)
+
+
+# CPU-heavy parsing (parse_async) runs here instead of on the event loop
+_blocking_executor = ThreadPoolExecutor(
+    max_workers=settings.JOB_SEARCH_MAX_WORKERS,
+    thread_name_prefix="job-scraper"
+)
 
 
 class JobScraper:
     """Base job scraper class"""
     
+    platform: str = ""
+    base_url: str = ""  # Site root, e.g. "https://www.example.com"
+    sitemap_url: Optional[str] = None  # Set by scrapers of sites publishing a jobs sitemap
+    html_parser: Optional[str] = None  # Parser backend override; defaults to HTML_PARSER
+    max_pages: int = 20  # Upper bound on result pages fetched by iter_search()
+    
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.created_at = time.time()
+        self.opened_at: Optional[float] = None
+        self.last_used_at: Optional[float] = None
+        self.search_count = 0
+        self.error_count = 0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+    
+    async def open(self) -> None:
+        """
+        Lifecycle hook called once when the scraper registry starts
+        
+        Subclasses can override this to log in, load cookies or warm caches.
+        """
+        self.opened_at = time.time()
+    
+    async def close(self) -> None:
+        """Lifecycle hook called once when the scraper registry shuts down"""
+        self.opened_at = None
+    
+    @property
+    def is_warm(self) -> bool:
+        """Whether the scraper has been opened or already served a search"""
+        return self.opened_at is not None or self.search_count > 0
+    
+    def record_success(self) -> None:
+        """Record a successful search"""
+        self.search_count += 1
+        self.consecutive_failures = 0
+        self.last_used_at = time.time()
+    
+    def record_failure(self, error: str) -> None:
+        """Record a failed or timed-out search"""
+        self.search_count += 1
+        self.error_count += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+        self.last_used_at = time.time()
+    
+    def health(self) -> Dict:
+        """
+        Get scraper health and warm state
+        
+        Returns:
+            Dictionary with health information
+        """
+        return {
+            'healthy': self.consecutive_failures == 0,
+            'warm': self.is_warm,
+            'search_count': self.search_count,
+            'error_count': self.error_count,
+            'consecutive_failures': self.consecutive_failures,
+            'last_error': self.last_error,
+            'last_used_at': self.last_used_at,
+            'circuit': get_circuit_breaker(self.platform).to_dict() if self.platform else None,
+        }
     
-    def search(self, keywords: List[str], location: str, max_results: int = 50) -> List[Dict]:
+    async def fetch(self, url: str, **kwargs) -> httpx.Response:
         """
-        Search for jobs
+        Fetch a page through the shared pooled HTTP transport
+        
+        Requests wait on the platform's token bucket and fail fast while the
+        platform's circuit is open. Successful responses are added to the
+        page archive so they can be re-parsed offline.
+        
+        Args:
+            url: Page URL
+            **kwargs: Extra arguments for httpx (params, headers, ...)
+        
+        Returns:
+            httpx.Response
+        
+        Raises:
+            CircuitOpenError: If the platform's circuit is open
+        """
+        if self.platform:
+            if get_circuit_breaker(self.platform).is_open:
+                raise CircuitOpenError(f"Circuit open for {self.platform}")
+            await get_rate_limiter(self.platform).acquire()
+        response = await get_transport().get(url, **kwargs)
+        if response.status_code == 200:
+            archive_page(self.platform, str(response.url), response.content, response.headers.get('content-type'))
+        return response
+    
+    async def fetch_many(self, urls: Iterable[str], **kwargs) -> List:
+        """
+        Fetch many pages concurrently through the shared transport
+        
+        Args:
+            urls: Page URLs
+            **kwargs: Extra arguments for httpx (params, headers, ...)
+        
+        Returns:
+            List of httpx.Response or the exception raised for that URL, in input order
+        """
+        return await asyncio.gather(
+            *[self.fetch(url, **kwargs) for url in urls],
+            return_exceptions=True
+        )
+    
+    async def fetch_conditional(self, url: str, **kwargs) -> FetchResult:
+        """
+        Fetch a page only if it changed since the last crawl
+        
+        Sends If-None-Match / If-Modified-Since from the stored state of the
+        URL. A 304, or a 200 whose body hash matches the stored one, comes
+        back with changed=False so the caller can skip parsing it.
+        
+        Args:
+            url: Page URL
+            **kwargs: Extra arguments for httpx (params, headers, ...)
+        
+        Returns:
+            FetchResult
+        """
+        state = await page_states.aget(url) or {}
+        headers = dict(kwargs.pop('headers', None) or {})
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+        
+        response = await self.fetch(url, headers=headers, **kwargs)
+        stats = current_crawl_stats.get()
+        
+        if response.status_code == 304:
+            page_states.update(url)
+            if stats is not None:
+                stats.pages_not_modified += 1
+                stats.bytes_saved += state.get('content_length', 0)
+            return FetchResult(url, 304, changed=False)
+        
+        content = response.content
+        changed = True
+        if response.status_code == 200:
+            digest = hash_content(content)
+            changed = state.get('content_hash') != digest
+            page_states.update(
+                url,
+                etag=response.headers.get('etag'),
+                last_modified=response.headers.get('last-modified'),
+                content_hash=digest,
+                content_length=len(content),
+                fetched_at=datetime.now(timezone.utc)
+            )
+        if stats is not None:
+            stats.pages_fetched += 1
+            stats.bytes_downloaded += len(content)
+            if not changed:
+                stats.pages_unchanged += 1
+        return FetchResult(url, response.status_code, content, response.text, changed)
+    
+    async def sitemap_urls(
+        self,
+        sitemap_url: Optional[str] = None,
+        since: Optional[datetime] = None,
+        max_depth: int = 2
+    ) -> List[str]:
+        """
+        List the page URLs of a sitemap modified after a given date
+        
+        Sitemap indexes are followed up to max_depth levels. Entries without
+        lastmod are always returned.
+        
+        Args:
+            sitemap_url: Sitemap URL (defaults to the scraper's sitemap_url)
+            since: Only keep entries with a lastmod after this date
+            max_depth: Maximum sitemap index nesting
+        
+        Returns:
+            List of page URLs
+        """
+        sitemap_url = sitemap_url or self.sitemap_url
+        if not sitemap_url:
+            return []
+        if since is not None and since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        
+        response = await self.fetch(sitemap_url)
+        response.raise_for_status()
+        entries, children = parse_sitemap(response.content)
+        
+        urls = [
+            loc for loc, lastmod in entries
+            if since is None or lastmod is None or lastmod > since
+        ]
+        if max_depth > 0:
+            for child in children:
+                urls.extend(await self.sitemap_urls(child, since, max_depth - 1))
+        return urls
+    
+    def parse(self, html) -> HtmlNode:
+        """
+        Parse a fetched page with the configured HTML parser backend
+        
+        Args:
+            html: Page body (str or bytes)
+        
+        Returns:
+            Root node supporting select(), select_one(), text() and attr()
+        """
+        return parse_html(html, self.html_parser)
+    
+    def extract_jobs(self, url: str, html) -> List[Dict]:
+        """
+        Extract the jobs of a fetched page
+        
+        Uses the page's schema.org JobPosting JSON-LD when there is some,
+        without building a DOM, and falls back to extract_jobs_from_dom()
+        otherwise. Scrapers call this from fetch_page(), so archived pages
+        are re-parsed offline with the same code.
+        
+        Args:
+            url: Page URL
+            html: Page body (str or bytes)
+            
+        Returns:
+            List of job dictionaries
+        """
+        jobs = extract_job_postings(html, url)
+        if jobs or type(self).extract_jobs_from_dom is JobScraper.extract_jobs_from_dom:
+            return jobs  # No need to parse for a scraper without DOM selectors
+        return self.extract_jobs_from_dom(url, self.parse(html))
+    
+    def extract_jobs_from_dom(self, url: str, root: HtmlNode) -> List[Dict]:
+        """
+        Extract the jobs of a page without JobPosting JSON-LD
+        
+        Scrapers override this with their site's selectors.
+        
+        Args:
+            url: Page URL
+            root: Parsed page
+            
+        Returns:
+            List of job dictionaries
+        """
+        return []
+    
+    async def parse_async(self, html) -> HtmlNode:
+        """Same as parse(), run in the scraper thread pool for large pages"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_blocking_executor, self.parse, html)
+    
+    def search_url(self, keywords: List[str], location: str, page: int) -> Optional[str]:
+        """
+        URL of one page of search results
+        
+        Scrapers of sites whose result pages carry the listings override
+        this: fetch_page() then downloads the page and runs extract_jobs()
+        on it, and the ingestion pipeline parses it in its own stage.
+        
+        Args:
+            keywords: List of search keywords
+            location: Job location
+            page: Zero-based page number
+        
+        Returns:
+            Page URL, or None if the scraper overrides fetch_page() instead
+        """
+        return None
+    
+    async def fetch_raw_page(self, keywords: List[str], location: str, page: int) -> Optional[Dict]:
+        """
+        Download one page of search results without parsing it
+        
+        Args:
+            keywords: List of search keywords
+            location: Job location
+            page: Zero-based page number
+        
+        Returns:
+            Raw page ({'platform', 'url', 'body'}) for extract_jobs(), or
+            None if the scraper has no search_url()
+        """
+        url = self.search_url(keywords, location, page)
+        if url is None:
+            return None
+        response = await self.fetch(url)
+        response.raise_for_status()
+        return {'platform': self.platform, 'url': str(response.url), 'body': response.content}
+    
+    async def fetch_page(self, keywords: List[str], location: str, page: int) -> List[Dict]:
+        """
+        Fetch and parse one page of search results
+        
+        Scrapers with a search_url() get this for free; the others override it.
+        
+        Args:
+            keywords: List of search keywords
+            location: Job location
+            page: Zero-based page number
+        
+        Returns:
+            List of job dictionaries; empty once there are no more results
+        """
+        raw = await self.fetch_raw_page(keywords, location, page)
+        if raw is None:
+            raise NotImplementedError("Subclasses must implement search_url or fetch_page method")
+        loop = asyncio.get_running_loop()
+        jobs = await loop.run_in_executor(_blocking_executor, self.extract_jobs, raw['url'], raw['body'])
+        for job in jobs:
+            job.setdefault('url', raw['url'])
+        return jobs
+    
+    async def iter_search(
+        self,
+        keywords: List[str],
+        location: str,
+        max_results: Optional[int] = 50
+    ) -> AsyncIterator[Dict]:
+        """
+        Lazily yield search results, one job at a time
+        
+        Pages are fetched on demand: while the jobs of one page are being
+        consumed, the next page is prefetched in the background. Nothing
+        more is fetched once max_results jobs were yielded, the last page
+        came back empty or max_pages was reached, and the pending prefetch
+        is cancelled if the consumer stops iterating early.
+        
+        Args:
+            keywords: List of search keywords
+            location: Job location
+            max_results: Maximum number of results (None for no limit)
+        
+        Yields:
+            Job dictionaries tagged with the scraper's platform
+        """
+        limit = max_results if max_results is not None else float('inf')
+        if limit <= 0:
+            return
+        
+        yielded = 0
+        page = 0
+        pending = asyncio.ensure_future(self.fetch_page(keywords, location, page))
+        try:
+            while pending is not None:
+                jobs = await pending
+                pending = None
+                if not jobs:
+                    break
+                
+                page += 1
+                if yielded + len(jobs) < limit and page < self.max_pages:
+                    pending = asyncio.ensure_future(self.fetch_page(keywords, location, page))
+                
+                for job in jobs:
+                    if self.platform:
+                        job.setdefault('platform', self.platform)
+                    yield job
+                    yielded += 1
+                    if yielded >= limit:
+                        return
+        finally:
+            if pending is not None:
+                if pending.done():
+                    if not pending.cancelled():
+                        pending.exception()  # Retrieved so it is not logged as unhandled
+                else:
+                    pending.cancel()
+    
+    async def asearch(self, keywords: List[str], location: str, max_results: int = 50) -> List[Dict]:
+        """
+        Search for jobs without blocking the event loop
         
         Args:
             keywords: List of search keywords
             location: Job location
             max_results: Maximum number of results
-            
+        
         Returns:
             List of job dictionaries
         """
-        raise NotImplementedError("Subclasses must implement search method")
+        return [job async for job in self.iter_search(keywords, location, max_results)]
 
 
 class LinkedInScraper(JobScraper):
     """LinkedIn job scraper"""
     
-    def search(self, keywords: List[str], location: str, max_results: int = 50) -> List[Dict]:
+    platform = "linkedin"
+    base_url = "https://www.linkedin.com"
+    
+    async def fetch_page(self, keywords: List[str], location: str, page: int) -> List[Dict]:
         # TODO: Implement LinkedIn scraping
         # For now, return mock data for testing
+        if page > 0:
+            return []
         return [{
             'id': f'linkedin_{i}',
             'title': f'Job {i}',
@@ -43,15 +434,20 @@ class LinkedInScraper(JobScraper):
             'location': location,
             'description': f'Description for job {i}',
             'platform': 'linkedin',
-        } for i in range(min(5, max_results))]
+        } for i in range(5)]
 
 
 class IndeedScraper(JobScraper):
     """Indeed job scraper"""
     
-    def search(self, keywords: List[str], location: str, max_results: int = 50) -> List[Dict]:
+    platform = "indeed"
+    base_url = "https://fr.indeed.com"
+    
+    async def fetch_page(self, keywords: List[str], location: str, page: int) -> List[Dict]:
         # TODO: Implement Indeed scraping
         # For now, return mock data for testing
+        if page > 0:
+            return []
         return [{
             'id': f'indeed_{i}',
             'title': f'Job {i}',
@@ -59,13 +455,16 @@ class IndeedScraper(JobScraper):
             'location': location,
             'description': f'Description for job {i}',
             'platform': 'indeed',
-        } for i in range(min(5, max_results))]
+        } for i in range(5)]
 
 
 class GlassdoorScraper(JobScraper):
     """Glassdoor job scraper"""
     
-    def search(self, keywords: List[str], location: str, max_results: int = 50) -> List[Dict]:
+    platform = "glassdoor"
+    base_url = "https://www.glassdoor.fr"
+    
+    async def fetch_page(self, keywords: List[str], location: str, page: int) -> List[Dict]:
         # TODO: Implement Glassdoor scraping
         return []
 
@@ -73,7 +472,10 @@ class GlassdoorScraper(JobScraper):
 class HelloWorkScraper(JobScraper):
     """Hello Work job scraper (Pôle Emploi)"""
     
-    def search(self, keywords: List[str], location: str, max_results: int = 50) -> List[Dict]:
+    platform = "hello_work"
+    base_url = "https://www.hellowork.com"
+    
+    async def fetch_page(self, keywords: List[str], location: str, page: int) -> List[Dict]:
         """
         Search for jobs on Hello Work (Pôle Emploi)
         URL: https://www.hellowork.com
@@ -85,7 +487,10 @@ class HelloWorkScraper(JobScraper):
 class JobTeaserScraper(JobScraper):
     """Job Teaser job scraper"""
     
-    def search(self, keywords: List[str], location: str, max_results: int = 50) -> List[Dict]:
+    platform = "job_teaser"
+    base_url = "https://www.jobteaser.com"
+    
+    async def fetch_page(self, keywords: List[str], location: str, page: int) -> List[Dict]:
         """
         Search for jobs on Job Teaser
         URL: https://www.jobteaser.com
@@ -97,11 +502,13 @@ class JobTeaserScraper(JobScraper):
 class WelcomeToTheJungleScraper(JobScraper):
     """Welcome to the Jungle job scraper"""
     
-    def search(self, keywords: List[str], location: str, max_results: int = 50) -> List[Dict]:
+    platform = "welcome_to_the_jungle"
+    base_url = "https://www.welcometothejungle.com"
+    
+    async def fetch_page(self, keywords: List[str], location: str, page: int) -> List[Dict]:
         """
         Search for jobs on Welcome to the Jungle
         URL: https://www.welcometothejungle.com
         """
         # TODO: Implement Welcome to the Jungle scraping
         return []
-
@@ -0,0 +1,422 @@
+"""
+Job Search Service - Concurrent fan-out of a search across platforms
+"""
+import asyncio
+import time
+from typing import Awaitable, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from backend.core.config import settings
+from backend.services.incremental_crawl import CrawlStats, current_crawl_stats, page_states
+from backend.services.job_dedupe import job_signature
+from backend.services.job_store import persist_jobs, load_jobs, mark_crawled, is_fresh
+from backend.services.resilience import CircuitOpenError, get_circuit_breaker
+from backend.services.scraper_factory import ScraperFactory
+from backend.services.search_cache import search_cache, make_key
+
+
+# Platforms searched when neither the request nor the saved criteria name any
+DEFAULT_PLATFORMS = ['linkedin', 'indeed', 'hello_work', 'job_teaser', 'welcome_to_the_jungle']
+
+
+def _new_status(platform: str) -> Dict:
+    return {'platform': platform, 'status': 'ok', 'count': 0, 'elapsed_ms': 0.0, 'error': None, 'source': 'live', 'cache': None}
+
+
+async def _guarded(platform: str, call: Callable[[], Awaitable]):
+    """
+    Run an upstream call for one platform and record the outcome
+    
+    The call runs under the platform's circuit breaker and its own
+    JOB_SEARCH_PLATFORM_TIMEOUT, so a hung platform counts as a failure
+    even when every waiting caller has already given up.
+    
+    Raises:
+        CircuitOpenError: If the platform's circuit is open
+    """
+    breaker = get_circuit_breaker(platform)
+    if not breaker.allow():
+        raise CircuitOpenError(f"Circuit open for {platform}")
+    
+    scraper = ScraperFactory.get_scraper(platform)
+    try:
+        result = await asyncio.wait_for(call(), timeout=settings.JOB_SEARCH_PLATFORM_TIMEOUT)
+    except asyncio.CancelledError:
+        # Shutdown, client gone or outer timeout: not a platform failure
+        breaker.release()
+        raise
+    except Exception as e:
+        breaker.record_failure()
+        scraper.record_failure(str(e) or type(e).__name__)
+        raise
+    breaker.record_success()
+    scraper.record_success()
+    return result
+
+
+async def _fetch_platform(
+    platform: str,
+    keywords: List[str],
+    location: str,
+    max_results: int
+) -> List[Dict]:
+    """
+    Run the upstream search for one platform (see _guarded())
+    
+    Raises:
+        CircuitOpenError: If the platform's circuit is open
+    """
+    scraper = ScraperFactory.get_scraper(platform)
+    jobs = await _guarded(platform, lambda: scraper.asearch(keywords, location, max_results))
+    # Add platform info to each job, and its duplicate-detection signature
+    # so cached copies and the job store do not recompute it
+    for job in jobs:
+        job['platform'] = platform
+        if settings.DEDUPE_ENABLED:
+            job['simhash'] = job_signature(job)
+    return jobs
+
+
+async def _fetch_and_persist(
+    platform: str,
+    keywords: List[str],
+    location: str,
+    max_results: int,
+    persist: bool = True
+) -> List[Dict]:
+    jobs = await _fetch_platform(platform, keywords, location, max_results)
+    if persist and settings.JOB_STORE_ENABLED and jobs:
+        # Persist in the background; the response does not wait on the DB
+        asyncio.get_running_loop().run_in_executor(
+            None, persist_jobs, [dict(job) for job in jobs]
+        )
+    return jobs
+
+
+async def refresh_platform(
+    platform: str,
+    keywords: List[str],
+    location: str,
+    max_results: int
+) -> Tuple[List[Dict], CrawlStats]:
+    """
+    Fetch a platform upstream, store the results and refresh the cache
+    
+    Used by the background crawler. Unlike user searches, this waits for the
+    listings to be written so the store is fresh once it returns. Pages and
+    listings that did not change since the last crawl are counted as saved.
+    
+    Args:
+        platform: Platform name
+        keywords: List of search keywords
+        location: Job location
+        max_results: Maximum number of results
+    
+    Returns:
+        Tuple of (job dictionaries, crawl statistics)
+    """
+    stats = CrawlStats()
+    current_crawl_stats.set(stats)
+    loop = asyncio.get_running_loop()
+    
+    jobs = await _fetch_platform(platform, keywords, location, max_results)
+    if settings.SEARCH_CACHE_ENABLED:
+        search_cache.set(make_key(platform, keywords, location, max_results), jobs)
+    if settings.JOB_STORE_ENABLED:
+        stored = await loop.run_in_executor(None, persist_jobs, [dict(job) for job in jobs])
+        if stored:
+            stats.rows_written += stored['rows_written']
+            stats.rows_skipped += stored['rows_skipped']
+        mark_crawled(platform, keywords, location)
+    await loop.run_in_executor(None, page_states.flush)
+    
+    logger.debug(f"Crawled {platform} {keywords} {location!r}: {stats.to_dict()}")
+    return jobs, stats
+
+
+async def _is_fresh(platform: str, keywords: List[str], location: str) -> bool:
+    # May read the shared crawl time from the database
+    return await asyncio.get_running_loop().run_in_executor(
+        None, is_fresh, platform, keywords, location, settings.CRAWLER_FRESHNESS
+    )
+
+
+async def _degraded_results(
+    platform: str,
+    keywords: List[str],
+    location: str,
+    max_results: int
+) -> Tuple[List[Dict], str]:
+    """Stale cached results, else stored listings, for a platform that fails fast"""
+    if settings.SEARCH_CACHE_ENABLED:
+        stale = search_cache.get_stale(make_key(platform, keywords, location, max_results))
+        if stale:
+            return stale, 'stale_cache'
+    if settings.JOB_STORE_ENABLED:
+        try:
+            jobs = await asyncio.get_running_loop().run_in_executor(
+                None, load_jobs, platform, keywords, location, max_results
+            )
+            return jobs, 'store'
+        except Exception as e:
+            logger.error(f"Error reading stored jobs for {platform}: {e}")
+    return [], 'none'
+
+
+async def search_platform(
+    platform: str,
+    keywords: List[str],
+    location: str,
+    max_results: int,
+    timeout: Optional[float] = None,
+    persist: bool = True
+) -> Tuple[List[Dict], Dict]:
+    """
+    Search a single platform with its own timeout
+    
+    Queries the background crawler keeps fresh are read from the job store.
+    Anything else goes through the shared search cache, so identical queries
+    from different users reuse (or wait on) the same upstream fetch. While a
+    platform's circuit is open, stale cached or stored results are returned
+    instead of waiting on it.
+    
+    Args:
+        platform: Platform name
+        keywords: List of search keywords
+        location: Job location
+        max_results: Maximum number of results
+        timeout: Timeout in seconds (defaults to JOB_SEARCH_PLATFORM_TIMEOUT)
+        persist: Store live results in the background (callers that store
+            them themselves pass False)
+    
+    Returns:
+        Tuple of (jobs, status) where status describes how the platform answered
+    """
+    timeout = timeout if timeout is not None else settings.JOB_SEARCH_PLATFORM_TIMEOUT
+    started = time.perf_counter()
+    status = _new_status(platform)
+    jobs: List[Dict] = []
+    
+    if not ScraperFactory.is_platform_supported(platform):
+        status.update(status='unsupported', error=f"Unsupported platform: {platform}")
+        return jobs, status
+    
+    def fetch():
+        return _fetch_and_persist(platform, keywords, location, max_results, persist)
+    
+    try:
+        if settings.JOB_STORE_ENABLED and await _is_fresh(platform, keywords, location):
+            jobs = await asyncio.wait_for(
+                asyncio.get_running_loop().run_in_executor(
+                    None, load_jobs, platform, keywords, location, max_results
+                ),
+                timeout=timeout
+            )
+            if jobs:
+                status['source'] = 'store'
+        
+        if status['source'] != 'store':
+            if settings.SEARCH_CACHE_ENABLED:
+                key = make_key(platform, keywords, location, max_results)
+                jobs, status['cache'] = await asyncio.wait_for(
+                    search_cache.get_or_fetch(key, fetch),
+                    timeout=timeout
+                )
+            else:
+                # Own task behind a shield, as in get_or_fetch: the outer timeout
+                # must not cancel the fetch before its platform timeout counts
+                # the hang against the circuit breaker
+                task = asyncio.ensure_future(fetch())
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                jobs = await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+    except CircuitOpenError:
+        # Fail fast and degrade to whatever we already have for this query
+        status.update(status='circuit_open', error=f"Circuit open for {platform}")
+        jobs, status['source'] = await _degraded_results(platform, keywords, location, max_results)
+    except asyncio.TimeoutError:
+        logger.warning(f"Search on {platform} timed out after {timeout}s")
+        status.update(status='timeout', error=f"Timed out after {timeout}s")
+    except Exception as e:
+        # Log error but let the other platforms answer
+        logger.error(f"Error searching on {platform}: {e}")
+        status.update(status='error', error=str(e))
+    
+    status['count'] = len(jobs)
+    status['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return jobs, status
+
+
+async def _fetch_platform_page(platform: str, keywords: List[str], location: str, page: int) -> Dict:
+    scraper = ScraperFactory.get_scraper(platform)
+    
+    async def fetch():
+        raw = await scraper.fetch_raw_page(keywords, location, page)
+        if raw is not None:
+            return raw
+        return {'platform': platform, 'jobs': await scraper.fetch_page(keywords, location, page)}
+    
+    return await _guarded(platform, fetch)
+
+
+async def iter_platform_pages(
+    platform: str,
+    keywords: List[str],
+    location: str,
+    max_results: int,
+    status: Dict,
+    more: Optional[Callable[[], bool]] = None
+) -> AsyncIterator[Dict]:
+    """
+    Search a single platform one result page at a time
+    
+    Streaming counterpart of search_platform() for the ingestion pipeline:
+    the next page is only downloaded once the consumer took the previous
+    one, so a consumer that falls behind throttles the downloads. Fresh
+    stored listings and cached results come back as a single page, and
+    stale ones while the platform's circuit is open. Each live page runs
+    under the circuit breaker and JOB_SEARCH_PLATFORM_TIMEOUT; live pages
+    are neither cached nor persisted here.
+    
+    Args:
+        platform: Platform name
+        keywords: List of search keywords
+        location: Job location
+        max_results: Maximum number of results
+        status: Dictionary filled with the platform's status, as returned by
+            search_platform(); 'count' is left to the consumer
+        more: Called before each further page; False stops the search.
+            Defaults to stopping once max_results jobs were yielded
+    
+    Yields:
+        Parsed pages ({'platform', 'jobs', 'persist'}), or raw pages
+        ({'platform', 'url', 'body', 'persist'}) of scrapers with a
+        search_url(), to parse with extract_jobs()
+    """
+    status.update(_new_status(platform))
+    started = time.perf_counter()
+    if not ScraperFactory.is_platform_supported(platform):
+        status.update(status='unsupported', error=f"Unsupported platform: {platform}")
+        return
+    
+    loop = asyncio.get_running_loop()
+    yielded = 0
+    if more is None:
+        more = lambda: yielded < max_results
+    try:
+        if settings.JOB_STORE_ENABLED and await _is_fresh(platform, keywords, location):
+            jobs = await loop.run_in_executor(None, load_jobs, platform, keywords, location, max_results)
+            if jobs:
+                status['source'] = 'store'
+                yield {'platform': platform, 'jobs': jobs, 'persist': False}
+                return
+        if settings.SEARCH_CACHE_ENABLED:
+            jobs = search_cache.get(make_key(platform, keywords, location, max_results))
+            if jobs is not None:
+                status['cache'] = 'hit'  # Stored when they were fetched
+                yield {'platform': platform, 'jobs': jobs, 'persist': False}
+                return
+            status['cache'] = 'miss'
+        
+        scraper = ScraperFactory.get_scraper(platform)
+        for page in range(scraper.max_pages):
+            if page and not more():
+                break
+            try:
+                result = await _fetch_platform_page(platform, keywords, location, page)
+            except CircuitOpenError:
+                status.update(status='circuit_open', error=f"Circuit open for {platform}")
+                if page == 0:
+                    jobs, status['source'] = await _degraded_results(platform, keywords, location, max_results)
+                    if jobs:
+                        yield {'platform': platform, 'jobs': jobs, 'persist': False}
+                break
+            if 'jobs' in result:
+                if not result['jobs']:
+                    break
+                yielded += len(result['jobs'])
+            result['persist'] = True
+            yield result
+    except asyncio.TimeoutError:
+        timeout = settings.JOB_SEARCH_PLATFORM_TIMEOUT
+        logger.warning(f"Search on {platform} timed out after {timeout}s")
+        status.update(status='timeout', error=f"Timed out after {timeout}s")
+    except Exception as e:
+        # Log error but let the other platforms answer
+        logger.error(f"Error searching on {platform}: {e}")
+        status.update(status='error', error=str(e))
+    finally:
+        status['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+
+async def search_platforms(
+    platforms: List[str],
+    keywords: List[str],
+    location: str,
+    max_results: int,
+    timeout: Optional[float] = None
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Search several platforms concurrently
+    
+    Total latency is bounded by the slowest platform (or its timeout), not by
+    the sum of all platform latencies.
+    
+    Args:
+        platforms: Platform names
+        keywords: List of search keywords
+        location: Job location
+        max_results: Maximum number of results per platform
+        timeout: Per-platform timeout in seconds
+    
+    Returns:
+        Tuple of (all jobs, per-platform status list)
+    """
+    results = await asyncio.gather(*[
+        search_platform(platform, keywords, location, max_results, timeout)
+        for platform in platforms
+    ])
+    
+    all_jobs: List[Dict] = []
+    statuses: List[Dict] = []
+    for jobs, status in results:
+        all_jobs.extend(jobs)
+        statuses.append(status)
+    
+    return all_jobs, statuses
+
+
+async def iter_platforms(
+    platforms: List[str],
+    keywords: List[str],
+    location: str,
+    max_results: int,
+    timeout: Optional[float] = None
+) -> AsyncIterator[Tuple[List[Dict], Dict]]:
+    """
+    Search several platforms concurrently, yielding each as it completes
+    
+    The first results are available after the fastest platform instead of
+    the slowest. Searches still pending when the consumer stops iterating
+    (e.g. a client disconnect) are cancelled.
+    
+    Args:
+        platforms: Platform names
+        keywords: List of search keywords
+        location: Job location
+        max_results: Maximum number of results per platform
+        timeout: Per-platform timeout in seconds
+    
+    Yields:
+        Tuple of (jobs, status) for one platform, in completion order
+    """
+    tasks = [
+        asyncio.ensure_future(search_platform(platform, keywords, location, max_results, timeout))
+        for platform in platforms
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
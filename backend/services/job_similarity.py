@@ -0,0 +1,563 @@
+"""
+Job Similarity - Hashed TF-IDF vectors of job listings and resumes
+
+Texts are tokenized like job_index and each term is hashed (CRC32) into
+one of 2**SIMILARITY_HASH_BITS dimensions, so vectors need no vocabulary
+and no model download. Term frequencies are sublinear (1 + log tf) and
+weighted by a smoothed IDF over the stored listings.
+
+JobVectors keeps one sparse row per active listing in flat NumPy arrays
+(CSR-like: bucket indices, term frequencies and L2-normalized TF-IDF
+weights, row after row). Rows are built by upsert_jobs() and only rebuilt
+when a listing's text changes; the IDF is refreshed, and the weights
+renormalized, once the number of listings has drifted by IDF_REFRESH_RATIO.
+Cosine similarity against every stored listing is one sparse
+matrix-vector product (a gather and a segmented sum).
+
+ResumeSimilarity is the resume side: the resume's vector (cached per
+resume until its text changes) scores jobs for JobMatcher, using the
+stored row of a job when it has one and vectorizing it otherwise.
+"""
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from backend.core.config import settings
+from backend.database.base import SessionLocal
+from backend.database.models import JobListing
+from backend.services.incremental_crawl import hash_content
+from backend.services.job_index import tokenize
+
+
+# Recompute the IDF when the number of listings moved this much since the last time
+IDF_REFRESH_RATIO = 0.05
+
+# Compact when dead rows exceed this share of all rows
+COMPACT_RATIO = 0.3
+COMPACT_MIN_DEAD = 1000
+
+# Resume term frequencies kept in memory
+RESUME_CACHE_SIZE = 1024
+
+
+def text_hash(text: str) -> str:
+    """Hash of the text a vector is built from"""
+    return hash_content(text.encode('utf-8'))
+
+
+def listing_text(row: Dict) -> str:
+    """Title, description and requirements of a listing or job dictionary"""
+    return ' '.join(part for part in (row.get('title'), row.get('description'), row.get('requirements')) if part)
+
+
+def hash_features(text: Optional[str], bits: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hash a text into a sparse term frequency vector
+    
+    Args:
+        text: Text to vectorize
+        bits: Number of hash bits (2**bits dimensions)
+    
+    Returns:
+        (sorted distinct bucket indices, sublinear term frequencies)
+    """
+    counts = Counter(tokenize(text))
+    if not counts:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.float32)
+    mask = (1 << bits) - 1
+    buckets = np.fromiter((zlib.crc32(term.encode('utf-8')) & mask for term in counts), dtype=np.uint32, count=len(counts))
+    tfs = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+    indices, inverse = np.unique(buckets, return_inverse=True)
+    return indices, np.bincount(inverse, weights=tfs).astype(np.float32)
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    grown = np.empty(max(size, 2 * len(array), 8), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class JobVectors:
+    """
+    Hashed TF-IDF rows of the active job listings, keyed on external_id
+    
+    Thread-safe: upserts run in worker threads while queries are served.
+    """
+    
+    def __init__(self, bits: Optional[int] = None):
+        self.bits = bits or settings.SIMILARITY_HASH_BITS
+        self.dim = 1 << self.bits
+        
+        self._lock = threading.Lock()
+        self._slot_of: Dict[str, int] = {}  # external_id -> live row
+        self._external: List[Optional[str]] = []  # Row -> external_id (None once dead)
+        self._hashes: List[Optional[str]] = []  # Row -> text hash
+        self._starts = np.zeros(1, dtype=np.int64)  # Row i spans [starts[i], starts[i + 1])
+        self._live = np.empty(0, dtype=bool)
+        self._indices = np.empty(0, dtype=np.uint32)
+        self._tfs = np.empty(0, dtype=np.float32)
+        self._weights = np.empty(0, dtype=np.float32)
+        self._rows = 0
+        self._nnz = 0
+        self.live_docs = 0
+        
+        self._df = np.zeros(self.dim, dtype=np.int32)
+        self._idf = np.ones(self.dim, dtype=np.float32)
+        self._idf_docs = 0  # live_docs when the IDF was computed
+        
+        self.loaded = False
+        self.vectorized = 0
+        self.unchanged = 0
+        self.refreshes = 0
+        self.compactions = 0
+        self.queries = 0
+        self.last_query_ms = 0.0
+    
+    def __len__(self) -> int:
+        return self.live_docs
+    
+    def __contains__(self, external_id: str) -> bool:
+        return external_id in self._slot_of
+    
+    def _remove(self, external_id: str) -> None:
+        row = self._slot_of.pop(external_id, None)
+        if row is not None:
+            start, end = self._starts[row], self._starts[row + 1]
+            self._df[self._indices[start:end]] -= 1
+            self._live[row] = False
+            self._external[row] = None
+            self._hashes[row] = None
+            self.live_docs -= 1
+    
+    def _normalize(self, first: int, last: int) -> None:
+        # TF-IDF weights of rows [first, last), L2-normalized per row
+        start, end = self._starts[first], self._starts[last]
+        weights = self._tfs[start:end] * self._idf[self._indices[start:end]]
+        lengths = np.diff(self._starts[first:last + 1])
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        norms = np.sqrt(np.bincount(rows, weights=weights.astype(np.float64) ** 2, minlength=len(lengths)))
+        norms[norms == 0] = 1.0
+        self._weights[start:end] = weights / norms[rows]
+    
+    def _refresh_idf(self) -> None:
+        docs = self.live_docs
+        self._idf = (np.log((1.0 + docs) / (1.0 + self._df)) + 1.0).astype(np.float32)
+        self._idf_docs = docs
+        self._normalize(0, self._rows)
+        self.refreshes += 1
+    
+    def update(self, rows: Iterable[Dict], skip_existing: bool = False) -> int:
+        """
+        Vectorize new or changed listings, and drop inactive ones
+        
+        Listings whose title, description and requirements are unchanged
+        keep their row.
+        
+        Args:
+            rows: Dictionaries with external_id, title, description,
+                requirements and optionally is_active
+            skip_existing: Leave listings already vectorized untouched (loading)
+        
+        Returns:
+            Number of listings vectorized
+        """
+        removed = []
+        documents = []
+        for row in rows:
+            if row.get('is_active', True) is False:
+                removed.append(row['external_id'])
+                continue
+            text = listing_text(row)
+            documents.append((row['external_id'], text_hash(text), text))
+        
+        with self._lock:
+            for external_id in removed:
+                self._remove(external_id)
+            fresh = []
+            for external_id, digest, text in documents:
+                row = self._slot_of.get(external_id)
+                if row is not None and (skip_existing or self._hashes[row] == digest):
+                    self.unchanged += 1
+                    continue
+                fresh.append((external_id, digest, text))
+        
+        # Hash outside the lock
+        vectors = [(eid, digest, hash_features(text, self.bits)) for eid, digest, text in fresh]
+        
+        with self._lock:
+            nnz = sum(len(indices) for _, _, (indices, _) in vectors)
+            end = self._nnz + nnz
+            if end > len(self._indices):
+                self._indices = _grow(self._indices, end)
+                self._tfs = _grow(self._tfs, end)
+                self._weights = _grow(self._weights, end)
+            # _starts holds one more entry than _live: check each against its own size
+            rows_end = self._rows + len(vectors)
+            if rows_end + 1 > len(self._starts):
+                self._starts = _grow(self._starts, rows_end + 1)
+            if rows_end > len(self._live):
+                self._live = _grow(self._live, rows_end)
+            
+            first = self._rows
+            for external_id, digest, (indices, tfs) in vectors:
+                self._remove(external_id)
+                row = self._rows
+                self._rows += 1
+                self._slot_of[external_id] = row
+                self._external.append(external_id)
+                self._hashes.append(digest)
+                self._live[row] = True
+                self.live_docs += 1
+                stop = self._nnz + len(indices)
+                self._indices[self._nnz:stop] = indices
+                self._tfs[self._nnz:stop] = tfs
+                self._df[indices] += 1
+                self._nnz = stop
+                self._starts[self._rows] = stop
+            
+            self.vectorized += len(vectors)
+            if abs(self.live_docs - self._idf_docs) > IDF_REFRESH_RATIO * max(self._idf_docs, 1):
+                self._refresh_idf()
+            elif self._rows > first:
+                self._normalize(first, self._rows)
+            
+            dead = self._rows - self.live_docs
+            if dead >= COMPACT_MIN_DEAD and dead > COMPACT_RATIO * self._rows:
+                self._compact()
+        return len(vectors)
+    
+    def remove(self, external_ids: Iterable[str]) -> None:
+        """Drop listings"""
+        with self._lock:
+            for external_id in external_ids:
+                self._remove(external_id)
+    
+    def _compact(self) -> None:
+        # Drop dead rows from the flat arrays, keeping the row order
+        started = time.perf_counter()
+        live = self._live[:self._rows]
+        lengths = np.diff(self._starts[:self._rows + 1])
+        keep = np.repeat(live, lengths)
+        self._indices = self._indices[:self._nnz][keep]
+        self._tfs = self._tfs[:self._nnz][keep]
+        self._weights = self._weights[:self._nnz][keep]
+        self._starts = np.concatenate(([0], np.cumsum(lengths[live])))
+        self._external = [eid for eid in self._external if eid is not None]
+        self._hashes = [digest for digest in self._hashes if digest is not None]
+        self._slot_of = {eid: row for row, eid in enumerate(self._external)}
+        self._rows = len(self._external)
+        self._live = np.ones(self._rows, dtype=bool)
+        self._nnz = len(self._indices)
+        self.compactions += 1
+        logger.debug(f"Compacted job vectors to {self._rows} listings in {time.perf_counter() - started:.2f}s")
+    
+    def query_vector(self, indices: np.ndarray, tfs: np.ndarray) -> np.ndarray:
+        """
+        Weight term frequencies with the current IDF into a dense unit vector
+        
+        Args:
+            indices: Bucket indices (from hash_features)
+            tfs: Term frequencies (from hash_features)
+        
+        Returns:
+            Dense float32 array of SIMILARITY dimensions (zeros if empty)
+        """
+        dense = np.zeros(self.dim, dtype=np.float32)
+        weights = tfs * self._idf[indices]
+        norm = float(np.sqrt(np.dot(weights, weights)))
+        if norm > 0:
+            dense[indices] = weights / norm
+        return dense
+    
+    def text_similarity(self, query: np.ndarray, text: Optional[str]) -> float:
+        """
+        Cosine similarity of a text that is not stored with a query vector
+        
+        Args:
+            query: Dense unit vector (from query_vector)
+            text: Text to vectorize with the current IDF
+        
+        Returns:
+            Cosine similarity
+        """
+        indices, tfs = hash_features(text, self.bits)
+        weights = tfs * self._idf[indices]
+        norm = float(np.sqrt(np.dot(weights, weights)))
+        return float(np.dot(weights, query[indices])) / norm if norm > 0 else 0.0
+    
+    def similarities(self, query: np.ndarray, external_ids: Iterable[str]) -> List[Optional[float]]:
+        """
+        Cosine similarity of stored listings with a query vector
+        
+        Args:
+            query: Dense unit vector (from query_vector)
+            external_ids: Listings to score
+        
+        Returns:
+            Similarity per listing, None for listings not stored
+        """
+        with self._lock:
+            rows = [self._slot_of.get(eid) for eid in external_ids]
+            known = [row for row in rows if row is not None]
+            if not known:
+                return [None] * len(rows)
+            known = np.asarray(known, dtype=np.int64)
+            starts = self._starts[known]
+            lengths = self._starts[known + 1] - starts
+            # Flat positions of the selected rows, without a Python loop
+            offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+            positions = np.arange(int(lengths.sum())) + offsets
+            products = self._weights[positions] * query[self._indices[positions]]
+            scores = np.bincount(np.repeat(np.arange(len(known)), lengths), weights=products, minlength=len(known))
+        scores = iter(scores.tolist())
+        return [None if row is None else next(scores) for row in rows]
+    
+    def most_similar(self, query: np.ndarray, limit: int = 20, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        Exact top listings by cosine similarity, against every stored listing
+        
+        One sparse matrix-vector product over all rows: the query weight of
+        each stored bucket, times the row weights, summed per row.
+        
+        Args:
+            query: Dense unit vector (from query_vector)
+            limit: Maximum number of listings
+            exclude: external_id to leave out (the query listing itself)
+        
+        Returns:
+            (external_id, similarity) pairs, best first
+        """
+        started = time.perf_counter()
+        with self._lock:
+            self.queries += 1
+            if not self.live_docs:
+                return []
+            products = self._weights[:self._nnz] * query[self._indices[:self._nnz]]
+            # Segmented sum per row; empty rows would repeat their neighbour's value
+            lengths = np.diff(self._starts[:self._rows + 1])
+            scores = np.zeros(self._rows, dtype=np.float64)
+            nonempty = lengths > 0
+            if self._nnz:
+                scores[nonempty] = np.add.reduceat(products, self._starts[:self._rows][nonempty])
+            scores[~self._live[:self._rows]] = -np.inf
+            if exclude in self._slot_of:
+                scores[self._slot_of[exclude]] = -np.inf
+            if len(scores) > limit:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+            else:
+                top = np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind='stable')]
+            results = [(self._external[i], float(scores[i])) for i in top if scores[i] > -np.inf]
+        self.last_query_ms = round((time.perf_counter() - started) * 1000, 2)
+        return results
+    
+    def rows(self, external_ids: Iterable[str]) -> List[Tuple[str, str, np.ndarray, np.ndarray]]:
+        """
+        Get the stored term frequencies of listings
+        
+        Args:
+            external_ids: Listings to read (the ones not stored are skipped)
+        
+        Returns:
+            (external_id, text hash, bucket indices, term frequencies) tuples
+        """
+        with self._lock:
+            found = []
+            for external_id in external_ids:
+                row = self._slot_of.get(external_id)
+                if row is not None:
+                    start, end = self._starts[row], self._starts[row + 1]
+                    found.append((external_id, self._hashes[row], self._indices[start:end].copy(), self._tfs[start:end].copy()))
+            return found
+    
+    def external_ids(self) -> List[str]:
+        """external_id of every stored listing"""
+        with self._lock:
+            return list(self._slot_of)
+    
+    def idf(self) -> np.ndarray:
+        """Copy of the current IDF weights"""
+        with self._lock:
+            return self._idf.copy()
+    
+    def vector(self, external_id: str) -> Optional[np.ndarray]:
+        """Dense unit vector of a stored listing, or None"""
+        with self._lock:
+            row = self._slot_of.get(external_id)
+            if row is None:
+                return None
+            start, end = self._starts[row], self._starts[row + 1]
+            dense = np.zeros(self.dim, dtype=np.float32)
+            dense[self._indices[start:end]] = self._weights[start:end]
+            return dense
+    
+    def memory_bytes(self) -> int:
+        """Approximate size of the row and IDF arrays"""
+        with self._lock:
+            arrays = (self._indices, self._tfs, self._weights, self._starts, self._live, self._df, self._idf)
+            return sum(array.nbytes for array in arrays)
+    
+    def stats(self) -> Dict:
+        """
+        Get vector store statistics
+        
+        Returns:
+            Dictionary with listing and dead row counts, average terms per
+            listing, vectorized/unchanged counters and IDF refreshes
+        """
+        return {
+            'enabled': settings.SIMILARITY_ENABLED,
+            'loaded': self.loaded,
+            'dimensions': self.dim,
+            'listings': self.live_docs,
+            'dead_rows': self._rows - self.live_docs,
+            'avg_terms': round(self._nnz / self._rows, 1) if self._rows else 0.0,
+            'vectorized': self.vectorized,
+            'unchanged': self.unchanged,
+            'idf_refreshes': self.refreshes,
+            'compactions': self.compactions,
+            'queries': self.queries,
+            'last_query_ms': self.last_query_ms,
+        }
+
+
+job_vectors = JobVectors()
+
+# resume_id -> (text hash, bucket indices, term frequencies)
+_resume_features: 'OrderedDict[int, Tuple[str, np.ndarray, np.ndarray]]' = OrderedDict()
+_resume_lock = threading.Lock()
+
+
+def resume_features(resume_id: int, content: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the hashed term frequencies of a resume, recomputed only when its text changed
+    
+    Args:
+        resume_id: Resume ID
+        content: Extracted resume text
+    
+    Returns:
+        (bucket indices, term frequencies)
+    """
+    digest = text_hash(content or '')
+    with _resume_lock:
+        cached = _resume_features.get(resume_id)
+        if cached is not None and cached[0] == digest:
+            _resume_features.move_to_end(resume_id)
+            return cached[1], cached[2]
+    indices, tfs = hash_features(content, job_vectors.bits)
+    with _resume_lock:
+        _resume_features[resume_id] = (digest, indices, tfs)
+        _resume_features.move_to_end(resume_id)
+        while len(_resume_features) > RESUME_CACHE_SIZE:
+            _resume_features.popitem(last=False)
+    return indices, tfs
+
+
+class ResumeSimilarity:
+    """
+    Similarity of jobs to one resume, as used by JobMatcher
+    
+    score() and score_jobs() return the cosine similarity divided by
+    SIMILARITY_FULL_SCORE and capped at 1, so a job reaching that cosine
+    gets every similarity point.
+    """
+    
+    def __init__(self, query: np.ndarray, key: Callable[[Dict], str], vectors: JobVectors = job_vectors):
+        """
+        Args:
+            query: Dense unit vector of the resume (JobVectors.query_vector)
+            key: Function giving the external_id of a job dictionary
+            vectors: Stored listing vectors
+        """
+        self.query = query
+        self.key = key
+        self.vectors = vectors
+        self.full_score = settings.SIMILARITY_FULL_SCORE
+    
+    @classmethod
+    def for_resume(cls, resume_id: int, content: Optional[str], key: Callable[[Dict], str],
+                   vectors: JobVectors = job_vectors) -> 'ResumeSimilarity':
+        """Build the scorer of a resume from its cached term frequencies"""
+        return cls(vectors.query_vector(*resume_features(resume_id, content)), key, vectors)
+    
+    def _cosine(self, job: Dict) -> float:
+        # Jobs that are not stored (yet) are vectorized on the fly
+        return self.vectors.text_similarity(self.query, listing_text(job))
+    
+    def _scale(self, cosine: float) -> float:
+        return min(max(cosine, 0.0) / self.full_score, 1.0)
+    
+    def score(self, job: Dict) -> float:
+        """
+        Get the similarity of a job to the resume (0-1)
+        
+        Args:
+            job: Job dictionary
+        
+        Returns:
+            Scaled cosine similarity
+        """
+        cosine = self.vectors.similarities(self.query, [self.key(job)])[0]
+        return self._scale(self._cosine(job) if cosine is None else cosine)
+    
+    def score_jobs(self, jobs: List[Dict]) -> List[float]:
+        """
+        Get the similarities of a batch of jobs to the resume (0-1)
+        
+        Args:
+            jobs: Job dictionaries
+        
+        Returns:
+            Scaled cosine similarities, in the order of `jobs`
+        """
+        cosines = self.vectors.similarities(self.query, [self.key(job) for job in jobs])
+        return [
+            self._scale(self._cosine(job) if cosine is None else cosine)
+            for job, cosine in zip(jobs, cosines)
+        ]
+
+
+def load_job_vectors(vectors: JobVectors = job_vectors, chunk_size: int = 5000) -> int:
+    """
+    Vectorize every active listing of job_listings (startup)
+    
+    Listings vectorized meanwhile by upsert_jobs() are newer than the rows
+    read here and are left as they are.
+    
+    Args:
+        vectors: Vector store to load
+        chunk_size: Rows read per round trip
+    
+    Returns:
+        Number of listings vectorized
+    """
+    started = time.perf_counter()
+    db = SessionLocal()
+    loaded = 0
+    try:
+        rows = db.query(
+            JobListing.external_id, JobListing.title, JobListing.description, JobListing.requirements
+        ).filter(JobListing.is_active == True).yield_per(chunk_size)
+        chunk = []
+        for external_id, title, description, requirements in rows:
+            chunk.append({
+                'external_id': external_id,
+                'title': title,
+                'description': description,
+                'requirements': requirements,
+            })
+            if len(chunk) >= chunk_size:
+                loaded += vectors.update(chunk, skip_existing=True)
+                chunk = []
+        loaded += vectors.update(chunk, skip_existing=True)
+    finally:
+        db.close()
+    vectors.loaded = True
+    logger.info(f"Vectorized {loaded} job listings in {time.perf_counter() - started:.1f}s")
+    return loaded
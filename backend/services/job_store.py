@@ -0,0 +1,629 @@
+"""
+Job Store - Persist scraped jobs into job_listings
+"""
+import json
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from dateutil import parser as date_parser
+from loguru import logger
+from sqlalchemy import and_, func, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.database.base import SessionLocal
+from backend.database.models import JobListing, JobType, Platform
+from backend.services.crawl_queue import crawl_queue, queue_key
+from backend.services.incremental_crawl import hash_content
+from backend.services.job_fulltext import apply_fulltext, fulltext_backend
+from backend.services.job_ann import job_ann
+from backend.services.job_index import job_index
+from backend.services.job_similarity import hash_features, job_vectors, listing_text
+from backend.services.job_dedupe import job_signature, to_signed
+from backend.services.search_cache import QueryKey, make_query_key
+
+
+DEFAULT_BATCH_SIZE = 500
+
+# Columns refreshed when a listing is seen again
+UPSERT_UPDATE_COLUMNS = [
+    'title', 'company', 'location', 'description', 'requirements',
+    'salary_min', 'salary_max', 'salary_currency', 'job_type', 'is_remote',
+    'platform', 'url', 'posted_date', 'expiry_date', 'content_hash', 'simhash',
+]
+
+# Derived from the other columns, so left out of the content hash
+_DERIVED_COLUMNS = ('content_hash', 'simhash')
+
+# When each normalized query was last crawled into the store by this process (monotonic time)
+_crawled_at: Dict[QueryKey, float] = {}
+
+# Last crawl of each query by any node, as read from crawl_queue:
+# query -> (when it was read (monotonic), crawl time (epoch) or None)
+_shared_crawled_at: Dict[QueryKey, Tuple[float, Optional[float]]] = {}
+_SHARED_CRAWLED_AT_SIZE = 10000
+
+
+def _to_enum(enum_class, value, default=None):
+    if value is None or isinstance(value, enum_class):
+        return value if value is not None else default
+    try:
+        return enum_class(str(value).lower())
+    except ValueError:
+        return default
+
+
+def _to_datetime(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return date_parser.parse(str(value))
+    except (ValueError, OverflowError):
+        return None
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def make_external_id(job: Dict) -> str:
+    """
+    Build the platform-scoped external ID used as the upsert key
+    
+    Args:
+        job: Scraped job dictionary
+    
+    Returns:
+        External ID, e.g. "linkedin:12345"
+    """
+    platform = (job.get('platform') or Platform.OTHER.value).lower()
+    raw_id = job.get('external_id') or job.get('id') or job.get('url') or ''
+    raw_id = str(raw_id)
+    if raw_id.startswith(f"{platform}:"):
+        return raw_id
+    return f"{platform}:{raw_id}"
+
+
+def listing_hash(row: Dict) -> str:
+    """
+    Hash the normalized content of a listing
+    
+    Args:
+        row: Dictionary of JobListing column values
+    
+    Returns:
+        Hex digest; identical for listings whose stored fields would not change
+    """
+    payload = {
+        col: (row[col].value if hasattr(row[col], 'value') else row[col])
+        for col in UPSERT_UPDATE_COLUMNS if col not in _DERIVED_COLUMNS
+    }
+    return hash_content(json.dumps(payload, sort_keys=True, default=str).encode('utf-8'))
+
+
+def normalize_job(job: Dict) -> Dict:
+    """
+    Map a scraped job dictionary onto job_listings columns
+    
+    Args:
+        job: Scraped job dictionary
+    
+    Returns:
+        Dictionary of JobListing column values
+    """
+    row = {
+        'external_id': make_external_id(job),
+        'title': (job.get('title') or '')[:255],
+        'company': (job.get('company') or '')[:255],
+        'location': (job.get('location') or '')[:255] or None,
+        'description': job.get('description'),
+        'requirements': job.get('requirements'),
+        'salary_min': _to_float(job.get('salary_min')),
+        'salary_max': _to_float(job.get('salary_max')),
+        'salary_currency': job.get('salary_currency') or 'EUR',
+        'job_type': _to_enum(JobType, job.get('job_type')),
+        'is_remote': bool(job.get('is_remote', job.get('remote', False))),
+        'platform': _to_enum(Platform, job.get('platform'), Platform.OTHER),
+        'url': (job.get('url') or '')[:500],
+        'posted_date': _to_datetime(job.get('posted_date')),
+        'expiry_date': _to_datetime(job.get('expiry_date')),
+        'is_active': True,
+    }
+    row['content_hash'] = listing_hash(row)
+    row['simhash'] = to_signed(job_signature(job))
+    return row
+
+
+def listing_to_job(listing: JobListing) -> Dict:
+    """
+    Convert a stored JobListing back to the job dictionary used by scrapers
+    
+    Args:
+        listing: JobListing row
+    
+    Returns:
+        Job dictionary
+    """
+    return {
+        'id': listing.external_id,
+        'title': listing.title,
+        'company': listing.company,
+        'location': listing.location,
+        'description': listing.description,
+        'requirements': listing.requirements,
+        'salary_min': listing.salary_min,
+        'salary_max': listing.salary_max,
+        'salary_currency': listing.salary_currency,
+        'job_type': listing.job_type.value if listing.job_type else None,
+        'is_remote': listing.is_remote,
+        'url': listing.url,
+        'platform': listing.platform.value if listing.platform else None,
+        'posted_date': listing.posted_date.isoformat() if listing.posted_date else None,
+        'simhash': listing.simhash,
+    }
+
+
+def _insert_for(dialect_name: str):
+    if dialect_name == 'postgresql':
+        return postgresql.insert
+    if dialect_name == 'sqlite':
+        return sqlite.insert
+    return None
+
+
+def _upsert_statement(insert):
+    stmt = insert(JobListing.__table__)
+    update_columns = {col: stmt.excluded[col] for col in UPSERT_UPDATE_COLUMNS}
+    update_columns['is_active'] = True
+    update_columns['updated_at'] = func.now()
+    return stmt.on_conflict_do_update(
+        index_elements=[JobListing.__table__.c.external_id],
+        set_=update_columns
+    )
+
+
+def _merge_batch(db: Session, rows: List[Dict]) -> None:
+    # Fallback for dialects without ON CONFLICT support
+    existing = {
+        listing.external_id: listing
+        for listing in db.query(JobListing).filter(
+            JobListing.external_id.in_([row['external_id'] for row in rows])
+        )
+    }
+    now = datetime.now(timezone.utc)
+    for row in rows:
+        listing = existing.get(row['external_id'])
+        if listing is None:
+            db.add(JobListing(**row))
+        else:
+            if listing.content_hash == row['content_hash'] and listing.is_active and listing.simhash is not None:
+                listing.updated_at = now
+                continue
+            for col in UPSERT_UPDATE_COLUMNS:
+                setattr(listing, col, row[col])
+            listing.is_active = True
+            listing.updated_at = now
+
+
+def _unchanged_ids(db: Session, rows: List[Dict]) -> Set[str]:
+    # Listings already stored, active, signed and with the same content hash
+    hashes = {row['external_id']: row['content_hash'] for row in rows}
+    stored = db.query(JobListing.external_id, JobListing.content_hash).filter(
+        JobListing.external_id.in_(list(hashes)),
+        JobListing.is_active == True,
+        JobListing.simhash.isnot(None)
+    )
+    return {
+        external_id for external_id, content_hash in stored
+        if content_hash is not None and hashes[external_id] == content_hash
+    }
+
+
+def upsert_jobs(db: Session, jobs: Iterable[Dict], batch_size: int = DEFAULT_BATCH_SIZE) -> Dict:
+    """
+    Bulk insert or refresh scraped jobs, keyed on external_id
+    
+    Uses a single INSERT ... ON CONFLICT DO UPDATE statement executed per
+    batch on SQLite and PostgreSQL, instead of one ORM object per row.
+    Listings whose normalized content hash is unchanged (and still active)
+    only get updated_at refreshed, in one UPDATE per batch; changed or
+    re-activated listings get their fields, updated_at and is_active refreshed, and are re-indexed in job_index
+    (and re-vectorized in job_vectors and job_ann if their text changed)
+    once committed.
+    
+    Args:
+        db: Database session (committed by this function)
+        jobs: Scraped job dictionaries
+        batch_size: Rows per INSERT statement
+    
+    Returns:
+        Dictionary with rows, rows written/skipped, batches, elapsed seconds
+        and rows per second
+    """
+    started = time.perf_counter()
+    
+    # Last occurrence wins; a statement may not touch the same row twice
+    rows_by_id: Dict[str, Dict] = {}
+    for job in jobs:
+        row = normalize_job(job)
+        rows_by_id[row['external_id']] = row
+    rows = list(rows_by_id.values())
+    
+    insert = _insert_for(db.bind.dialect.name)
+    stmt = _upsert_statement(insert) if insert is not None else None
+    batches = 0
+    written = 0
+    written_rows: List[Dict] = []
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i:i + batch_size]
+        unchanged = _unchanged_ids(db, batch)
+        if unchanged:
+            # Skip the row write, but mark the listings as seen: updated_at orders "most recent"
+            db.query(JobListing).filter(
+                JobListing.external_id.in_(list(unchanged))
+            ).update({'updated_at': func.now()}, synchronize_session=False)
+        batch = [row for row in batch if row['external_id'] not in unchanged]
+        if not batch:
+            continue
+        if stmt is not None:
+            # executemany of one cached statement; SQLAlchemy batches the rows
+            # into multi-row VALUES (psycopg2) or a single executemany (sqlite)
+            db.execute(stmt, batch)
+        else:
+            _merge_batch(db, batch)
+        batches += 1
+        written += len(batch)
+        written_rows.extend(batch)
+    db.commit()
+    if settings.JOB_INDEX_ENABLED and written_rows:
+        job_index.update(written_rows)
+    if settings.SIMILARITY_ENABLED and written_rows:
+        job_vectors.update(written_rows)
+        # Before both are loaded, load_job_ann() catches up with these rows
+        if settings.ANN_ENABLED and job_ann.loaded and job_vectors.loaded:
+            # A full re-projection (listing count doubled) runs in the background
+            job_ann.sync(job_vectors, [row['external_id'] for row in written_rows], background=True)
+    
+    elapsed = time.perf_counter() - started
+    return {
+        'rows': len(rows),
+        'rows_written': written,
+        'rows_skipped': len(rows) - written,
+        'batches': batches,
+        'elapsed_s': round(elapsed, 4),
+        'rows_per_second': round(len(rows) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def find_jobs(
+    db: Session,
+    platform: str,
+    keywords: List[str],
+    location: str,
+    limit: int = 50
+) -> List[Dict]:
+    """
+    Read stored active listings for a platform search
+    
+    Keywords are matched by the full-text index when the migration has
+    been applied, and by ILIKE substring filters otherwise.
+    
+    Args:
+        db: Database session
+        platform: Platform name
+        keywords: Search keywords (any of them in title or description)
+        location: Job location (substring match, ignored if empty)
+        limit: Maximum number of listings
+    
+    Returns:
+        List of job dictionaries, most recently seen first
+    """
+    query = db.query(JobListing).filter(
+        JobListing.platform == _to_enum(Platform, platform, Platform.OTHER),
+        JobListing.is_active == True
+    )
+    if location:
+        query = query.filter(JobListing.location.ilike(f"%{location.strip()}%"))
+    terms = [kw.strip() for kw in keywords or [] if kw and kw.strip()]
+    backend = fulltext_backend(db) if terms else None
+    if backend:
+        query = apply_fulltext(query, backend, terms, order_by_rank=False)
+    elif terms:
+        query = query.filter(or_(*[
+            or_(JobListing.title.ilike(f"%{term}%"), JobListing.description.ilike(f"%{term}%"))
+            for term in terms
+        ]))
+    listings = query.order_by(
+        func.coalesce(JobListing.updated_at, JobListing.created_at).desc()
+    ).limit(limit).all()
+    return [listing_to_job(listing) for listing in listings]
+
+
+def load_jobs(platform: str, keywords: List[str], location: str, limit: int = 50) -> List[Dict]:
+    """
+    Read stored listings in a dedicated session (safe to run from a worker thread)
+    
+    Args:
+        platform: Platform name
+        keywords: Search keywords
+        location: Job location
+        limit: Maximum number of listings
+    
+    Returns:
+        List of job dictionaries
+    """
+    db = SessionLocal()
+    try:
+        return find_jobs(db, platform, keywords, location, limit)
+    finally:
+        db.close()
+
+
+def search_listings(
+    db: Session,
+    keywords: Optional[List[str]] = None,
+    excluded_keywords: Optional[List[str]] = None,
+    match_all: bool = False,
+    platform: Optional[str] = None,
+    location: Optional[str] = None,
+    languages: Optional[List[str]] = None,
+    limit: int = 20,
+    offset: int = 0
+) -> Tuple[List[Dict], int]:
+    """
+    Search stored active listings, filtering keywords in the database
+    
+    With the full-text index, keywords are stemmed (French and English) and
+    results are ordered by full-text rank; without it, keywords are ILIKE
+    substring filters and results are ordered by recency.
+    
+    Args:
+        db: Database session
+        keywords: Keywords or phrases in title, description or requirements
+        excluded_keywords: Keywords or phrases the listings must not contain
+        match_all: Require every keyword instead of any
+        platform: Platform name (all platforms if empty)
+        location: Job location (substring match, ignored if empty)
+        languages: Stemming languages (default FULLTEXT_LANGUAGES)
+        limit: Maximum number of listings
+        offset: Listings to skip (paging)
+    
+    Returns:
+        Tuple of (job dictionaries, total number of matching listings)
+    """
+    query = db.query(JobListing).filter(JobListing.is_active == True)
+    if platform:
+        query = query.filter(JobListing.platform == _to_enum(Platform, platform, Platform.OTHER))
+    if location:
+        query = query.filter(JobListing.location.ilike(f"%{location.strip()}%"))
+    
+    keywords = [kw.strip() for kw in keywords or [] if kw and kw.strip()]
+    excluded_keywords = [kw.strip() for kw in excluded_keywords or [] if kw and kw.strip()]
+    backend = fulltext_backend(db) if keywords or excluded_keywords else None
+    if backend:
+        query = apply_fulltext(query, backend, keywords, excluded_keywords, match_all, languages)
+    else:
+        def contains(term):
+            return or_(
+                JobListing.title.ilike(f"%{term}%"),
+                JobListing.description.ilike(f"%{term}%"),
+                JobListing.requirements.ilike(f"%{term}%")
+            )
+        if keywords:
+            combine = and_ if match_all else or_
+            query = query.filter(combine(*[contains(term) for term in keywords]))
+        for term in excluded_keywords:
+            query = query.filter(~contains(term))
+    
+    total = query.order_by(None).count()
+    listings = query.order_by(
+        func.coalesce(JobListing.updated_at, JobListing.created_at).desc()
+    ).offset(offset).limit(limit).all()
+    return [listing_to_job(listing) for listing in listings], total
+
+
+def listing_features(db: Session, external_id: str) -> Optional[Tuple]:
+    """
+    Get the term frequencies of a stored active listing
+    
+    Read from job_vectors, or hashed from the database row while the
+    vectors are still loading (startup).
+    
+    Args:
+        db: Database session
+        external_id: Listing external_id
+    
+    Returns:
+        (bucket indices, term frequencies), or None if no such active listing
+    """
+    rows = job_vectors.rows([external_id])
+    if rows:
+        _, _, indices, tfs = rows[0]
+        return indices, tfs
+    listing = db.query(JobListing).filter(
+        JobListing.external_id == external_id,
+        JobListing.is_active == True
+    ).first()
+    if listing is None:
+        return None
+    return hash_features(listing_text(listing_to_job(listing)), job_vectors.bits)
+
+
+def find_similar_jobs(
+    db: Session,
+    indices,
+    tfs,
+    limit: int = 20,
+    exclude: Optional[str] = None,
+    exact: bool = False
+) -> List[Dict]:
+    """
+    Read the stored active listings most similar to a TF-IDF vector
+    
+    Args:
+        db: Database session
+        indices: Bucket indices of the vector (job_similarity.hash_features)
+        tfs: Term frequencies of the vector
+        limit: Maximum number of listings
+        exclude: external_id to leave out (the query listing itself)
+        exact: Compare with every listing instead of using the ANN index
+    
+    Returns:
+        List of job dictionaries with a 'similarity' (cosine), most similar first
+    """
+    if exact or not settings.ANN_ENABLED:
+        ranked = job_vectors.most_similar(job_vectors.query_vector(indices, tfs), limit, exclude)
+    else:
+        ranked = job_ann.search(indices, tfs, job_vectors, limit, exclude)
+    if not ranked:
+        return []
+    
+    scores = dict(ranked)
+    listings = db.query(JobListing).filter(
+        JobListing.external_id.in_(list(scores)),
+        JobListing.is_active == True
+    ).all()
+    jobs = []
+    for listing in listings:
+        job = listing_to_job(listing)
+        job['similarity'] = round(scores[listing.external_id], 4)
+        jobs.append(job)
+    jobs.sort(key=lambda job: job['similarity'], reverse=True)
+    return jobs
+
+
+def find_candidate_jobs(db: Session, terms: List[str], limit: int = 500) -> List[Dict]:
+    """
+    Read the stored active listings that best match query terms
+    
+    Listings are ranked by BM25 in job_index; without terms (or with the
+    index disabled) the most recently seen listings are returned instead.
+    
+    Args:
+        db: Database session
+        terms: Query terms (keywords, domain, skills)
+        limit: Maximum number of listings
+    
+    Returns:
+        List of job dictionaries, with a 'bm25_score' when ranked by the index
+    """
+    ranked = job_index.search(terms, limit) if settings.JOB_INDEX_ENABLED and terms else []
+    if not ranked:
+        listings = db.query(JobListing).filter(JobListing.is_active == True).order_by(
+            func.coalesce(JobListing.updated_at, JobListing.created_at).desc()
+        ).limit(limit).all()
+        return [listing_to_job(listing) for listing in listings]
+    
+    scores = dict(ranked)
+    listings = db.query(JobListing).filter(
+        JobListing.external_id.in_(list(scores)),
+        JobListing.is_active == True
+    ).all()
+    jobs = []
+    for listing in listings:
+        job = listing_to_job(listing)
+        job['bm25_score'] = round(scores[listing.external_id], 3)
+        jobs.append(job)
+    jobs.sort(key=lambda job: job['bm25_score'], reverse=True)
+    return jobs
+
+
+def load_candidate_jobs(terms: List[str], limit: int = 500) -> List[Dict]:
+    """
+    Read candidate listings in a dedicated session (safe to run from a worker thread)
+    
+    Args:
+        terms: Query terms
+        limit: Maximum number of listings
+    
+    Returns:
+        List of job dictionaries
+    """
+    db = SessionLocal()
+    try:
+        return find_candidate_jobs(db, terms, limit)
+    finally:
+        db.close()
+
+
+def mark_crawled(platform: str, keywords: List[str], location: str) -> None:
+    """Record that this process just crawled fresh results for a query into the store"""
+    _crawled_at[make_query_key(platform, keywords, location)] = time.monotonic()
+
+
+def _shared_last_crawled(key: QueryKey) -> Optional[float]:
+    now = time.monotonic()
+    cached = _shared_crawled_at.get(key)
+    if cached is not None and now - cached[0] < settings.CRAWLER_FRESHNESS_CACHE_TTL:
+        return cached[1]
+    try:
+        crawled_at = crawl_queue.last_crawled(queue_key(key[0], list(key[1]), key[2]))
+    except Exception as e:
+        logger.error(f"Error reading crawl time of {key}: {e}")
+        crawled_at = None
+    if len(_shared_crawled_at) >= _SHARED_CRAWLED_AT_SIZE:
+        _shared_crawled_at.clear()
+    _shared_crawled_at[key] = (now, crawled_at.timestamp() if crawled_at is not None else None)
+    return _shared_crawled_at[key][1]
+
+
+def is_fresh(platform: str, keywords: List[str], location: str, max_age: float) -> bool:
+    """
+    Check whether a query was crawled into the store recently
+    
+    Crawls of this process count right away. With CRAWLER_DISTRIBUTED, so do
+    crawls by any node, read from crawl_queue.last_crawled_at and reused for
+    CRAWLER_FRESHNESS_CACHE_TTL seconds; the lookup may then hit the
+    database, so async callers run this in an executor.
+    
+    Args:
+        platform: Platform name
+        keywords: Search keywords
+        location: Job location
+        max_age: Maximum age in seconds
+    
+    Returns:
+        True if searches for this query can be served from the store
+    """
+    key = make_query_key(platform, keywords, location)
+    crawled_at = _crawled_at.get(key)
+    if crawled_at is not None and time.monotonic() - crawled_at <= max_age:
+        return True
+    if not settings.CRAWLER_DISTRIBUTED:
+        return False
+    crawled_at = _shared_last_crawled(key)
+    return crawled_at is not None and time.time() - crawled_at <= max_age
+
+
+def persist_jobs(jobs: List[Dict]) -> Optional[Dict]:
+    """
+    Upsert jobs in a dedicated session (safe to run from a worker thread)
+    
+    Args:
+        jobs: Scraped job dictionaries
+    
+    Returns:
+        Upsert statistics, or None if nothing was written
+    """
+    if not jobs:
+        return None
+    
+    db = SessionLocal()
+    try:
+        stats = upsert_jobs(db, jobs)
+        logger.debug(
+            f"Stored {stats['rows_written']} job listings ({stats['rows_skipped']} unchanged) "
+            f"in {stats['elapsed_s']}s ({stats['rows_per_second']} rows/s)"
+        )
+        return stats
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error storing job listings: {e}")
+        return None
+    finally:
+        db.close()
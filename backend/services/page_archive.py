@@ -0,0 +1,306 @@
+"""
+Page Archive - Content-addressed, compressed store of fetched pages
+
+Every page body fetched by a scraper is stored once under its content hash
+in sharded directories (objects/ab/cd/abcd....zst), compressed with zstd
+when the zstandard package is installed and zlib otherwise. A daily
+append-only index (index/YYYY-MM-DD.jsonl) records which URL pointed to
+which body, so pages can be re-parsed later without any network access.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from loguru import logger
+
+from backend.core.config import settings
+from backend.services.incremental_crawl import hash_content
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+_EXTENSIONS = {'zstd': '.zst', 'zlib': '.zz'}
+
+# Bodies written or re-used this recently are never swept (see PageArchive._sweep)
+_SWEEP_GRACE_SECONDS = 600
+
+
+class PageArchive:
+    """
+    On-disk raw page archive
+    
+    Writes are idempotent (a body already stored is not written again) and
+    atomic (temporary file + rename), so several threads or processes can
+    share one archive directory. Index entries older than retention_days
+    are dropped once a day, together with the bodies no longer referenced.
+    Within a process the sweep holds the same lock as put(), so it never
+    removes a body another thread is writing or about to index. Other
+    processes sharing the directory are covered by a grace period instead:
+    put() refreshes the mtime of every body it writes or re-uses, and the
+    sweep leaves bodies touched in the last _SWEEP_GRACE_SECONDS alone.
+    """
+    
+    def __init__(
+        self,
+        root,
+        compression: Optional[str] = None,
+        level: Optional[int] = None,
+        retention_days: Optional[int] = None
+    ):
+        self.root = Path(root)
+        compression = (compression or settings.PAGE_ARCHIVE_COMPRESSION).lower()
+        if compression == 'zstd' and not ZSTD_AVAILABLE:
+            compression = 'zlib'
+        self.compression = compression
+        self.level = level if level is not None else (3 if compression == 'zstd' else 6)
+        self.retention_days = retention_days if retention_days is not None else settings.PAGE_ARCHIVE_RETENTION_DAYS
+        
+        self._lock = threading.Lock()
+        self._index_day: Optional[str] = None
+        self.pages_stored = 0
+        self.bodies_written = 0
+        self.bytes_raw = 0
+        self.bytes_written = 0
+    
+    def _object_path(self, digest: str, compression: Optional[str] = None) -> Path:
+        extension = _EXTENSIONS[compression or self.compression]
+        return self.root / 'objects' / digest[:2] / digest[2:4] / f"{digest}{extension}"
+    
+    def _compress(self, body: bytes) -> bytes:
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor(level=self.level).compress(body)
+        return zlib.compress(body, self.level)
+    
+    def put(
+        self,
+        url: str,
+        body: bytes,
+        platform: Optional[str] = None,
+        content_type: Optional[str] = None,
+        fetched_at: Optional[datetime] = None
+    ) -> str:
+        """
+        Archive a fetched page
+        
+        Args:
+            url: Page URL
+            body: Decoded page body
+            platform: Platform the page was fetched for
+            content_type: Content-Type header
+            fetched_at: Fetch time (defaults to now)
+        
+        Returns:
+            Content hash of the body
+        """
+        digest = hash_content(body)
+        path = self._object_path(digest)
+        compressed = self._compress(body) if not path.exists() else None
+        
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        entry = {
+            'url': url,
+            'platform': platform,
+            'hash': digest,
+            'size': len(body),
+            'content_type': content_type,
+            'fetched_at': fetched_at.isoformat(),
+        }
+        day = fetched_at.strftime('%Y-%m-%d')
+        index_path = self.root / 'index' / f"{day}.jsonl"
+        # Body and index line are written under the lock retention holds, so
+        # a body is never swept between being written and being indexed
+        with self._lock:
+            try:
+                os.utime(path)  # Re-used: refresh its mtime so no sweep removes it before it is indexed
+                stored = True
+            except FileNotFoundError:
+                stored = False
+            if not stored:
+                if compressed is None:
+                    compressed = self._compress(body)  # Removed by retention since the check
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+                tmp_path.write_bytes(compressed)
+                tmp_path.replace(path)
+                self.bodies_written += 1
+                self.bytes_written += len(compressed)
+            new_day = day != self._index_day
+            self._index_day = day
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(index_path, 'a', encoding='utf-8') as index_file:
+                index_file.write(json.dumps(entry) + '\n')
+            self.pages_stored += 1
+            self.bytes_raw += len(body)
+        if new_day:
+            self.apply_retention()
+        return digest
+    
+    def get(self, digest: str) -> Optional[bytes]:
+        """
+        Read an archived body
+        
+        Args:
+            digest: Content hash
+        
+        Returns:
+            Decompressed body, or None if not archived
+        """
+        for compression in _EXTENSIONS:
+            path = self._object_path(digest, compression)
+            if path.exists():
+                data = path.read_bytes()
+                if compression == 'zstd':
+                    return zstandard.ZstdDecompressor().decompress(data)
+                return zlib.decompress(data)
+        return None
+    
+    def _index_files(self) -> List[Path]:
+        return sorted((self.root / 'index').glob('*.jsonl'))
+    
+    def entries(
+        self,
+        platforms: Optional[List[str]] = None,
+        since: Optional[datetime] = None,
+        latest_only: bool = True
+    ) -> Iterator[Dict]:
+        """
+        Iterate over index entries
+        
+        Args:
+            platforms: Only these platforms
+            since: Only pages fetched at or after this time
+            latest_only: Only the most recent entry of each URL
+        
+        Yields:
+            Index entries (url, platform, hash, size, content_type, fetched_at)
+        """
+        since_day = since.strftime('%Y-%m-%d') if since else None
+        latest: Dict[str, Dict] = {}
+        for index_path in self._index_files():
+            if since_day and index_path.stem < since_day:
+                continue
+            with open(index_path, encoding='utf-8') as index_file:
+                for line in index_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Partially written line
+                    if platforms and entry.get('platform') not in platforms:
+                        continue
+                    if since and datetime.fromisoformat(entry['fetched_at']) < since:
+                        continue
+                    if latest_only:
+                        latest[entry['url']] = entry
+                    else:
+                        yield entry
+        yield from latest.values()
+    
+    def apply_retention(self, retention_days: Optional[int] = None) -> Dict:
+        """
+        Drop index files older than the retention period and unreferenced bodies
+        
+        Args:
+            retention_days: Days of index to keep (defaults to the archive's; 0 keeps everything)
+        
+        Returns:
+            Dictionary with the number of index files and bodies removed
+        """
+        retention_days = self.retention_days if retention_days is None else retention_days
+        removed = {'index_files': 0, 'bodies': 0}
+        if not retention_days:
+            return removed
+        with self._lock:
+            self._sweep(retention_days, removed)
+        if removed['index_files']:
+            logger.info(
+                f"Page archive retention: removed {removed['index_files']} index files "
+                f"and {removed['bodies']} bodies"
+            )
+        return removed
+    
+    def _sweep(self, retention_days: int, removed: Dict) -> None:
+        # Bodies modified after this were written or re-used by a put() that
+        # may not have written its index line yet, possibly in another process
+        recent = time.time() - _SWEEP_GRACE_SECONDS
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).strftime('%Y-%m-%d')
+        for index_path in self._index_files():
+            if index_path.stem < cutoff:
+                index_path.unlink()
+                removed['index_files'] += 1
+        if not removed['index_files']:
+            return
+        
+        referenced: Set[str] = {entry['hash'] for entry in self.entries(latest_only=False)}
+        for path in (self.root / 'objects').glob('*/*/*'):
+            # Skip bodies still being written (temporary files of put())
+            if path.suffix == '.tmp':
+                continue
+            if path.name.split('.')[0] not in referenced:
+                try:
+                    if path.stat().st_mtime > recent:
+                        continue
+                except FileNotFoundError:
+                    continue  # Swept by another process
+                path.unlink(missing_ok=True)
+                removed['bodies'] += 1
+    
+    def stats(self) -> Dict:
+        """Get write counters and the compression ratio of this process's writes"""
+        return {
+            'root': str(self.root),
+            'compression': self.compression,
+            'pages_stored': self.pages_stored,
+            'bodies_written': self.bodies_written,
+            'bytes_raw': self.bytes_raw,
+            'bytes_written': self.bytes_written,
+            'compression_ratio': round(self.bytes_raw / self.bytes_written, 2) if self.bytes_written else None,
+        }
+
+
+_archive: Optional[PageArchive] = None
+
+
+def get_page_archive() -> Optional[PageArchive]:
+    """Get the process-wide page archive, or None when archiving is disabled"""
+    global _archive
+    if not settings.PAGE_ARCHIVE_ENABLED:
+        return None
+    if _archive is None:
+        _archive = PageArchive(settings.PAGE_ARCHIVE_DIR)
+    return _archive
+
+
+def archive_page(platform: str, url: str, body: bytes, content_type: Optional[str] = None) -> None:
+    """
+    Archive a fetched page in the background (no-op when archiving is disabled)
+    
+    Compression and disk writes run in the default executor so the fetch
+    does not wait on them.
+    
+    Args:
+        platform: Platform the page was fetched for
+        url: Page URL
+        body: Decoded page body
+        content_type: Content-Type header
+    """
+    archive = get_page_archive()
+    if archive is None or not body:
+        return
+    
+    def put():
+        try:
+            archive.put(url, body, platform, content_type)
+        except Exception as e:
+            logger.error(f"Error archiving {url}: {e}")
+    
+    asyncio.get_running_loop().run_in_executor(None, put)
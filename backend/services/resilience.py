@@ -0,0 +1,173 @@
+"""
+Resilience - Per-platform rate limiting and circuit breaking for scrapers
+"""
+import asyncio
+import time
+from typing import Dict, Optional
+
+from loguru import logger
+
+from backend.core.config import settings
+
+
+class CircuitOpenError(Exception):
+    """Raised when a platform's circuit is open and calls fail fast"""
+
+
+def platform_budget(platform: str, name: str, default):
+    """
+    Get a per-platform budget value, falling back to the global setting
+    
+    Args:
+        platform: Platform name
+        name: Budget name (rate_limit, burst, failure_threshold, reset_timeout)
+        default: Global default
+    
+    Returns:
+        Configured value for the platform
+    """
+    overrides = settings.SCRAPER_BUDGETS.get(platform.lower(), {})
+    return type(default)(overrides.get(name, default))
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second with bursts of `burst`"""
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+    
+    async def acquire(self) -> None:
+        """Wait until a request may be sent"""
+        if self.rate <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # The lock keeps waiters in FIFO order
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+    
+    @property
+    def available(self) -> float:
+        """Tokens currently available"""
+        self._refill()
+        return self._tokens
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures
+    
+    While open every call fails fast. After `reset_timeout` seconds the
+    breaker goes half-open and lets a single probe through: success closes
+    it, failure opens it again.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self._probe_in_flight = False
+    
+    def allow(self) -> bool:
+        """
+        Check whether a call may go through
+        
+        Returns:
+            True if closed, or if this call is the half-open probe
+        """
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+    
+    @property
+    def is_open(self) -> bool:
+        """Whether the breaker is open and still inside its reset timeout"""
+        return self.state == self.OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+    
+    def record_success(self) -> None:
+        """Record a successful call, closing the breaker"""
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        """Record a failed or timed-out call, opening the breaker past the threshold"""
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(
+                    f"Circuit for {self.name} opened after "
+                    f"{self.consecutive_failures} consecutive failures"
+                )
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+    
+    def release(self) -> None:
+        """Give back the half-open probe of a call that was cancelled, recording nothing"""
+        self._probe_in_flight = False
+    
+    def to_dict(self) -> Dict:
+        """Get the breaker state as a dictionary"""
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'times_opened': self.times_opened,
+        }
+
+
+_rate_limiters: Dict[str, TokenBucket] = {}
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_rate_limiter(platform: str) -> TokenBucket:
+    """Get the token bucket of a platform"""
+    platform = platform.lower()
+    if platform not in _rate_limiters:
+        _rate_limiters[platform] = TokenBucket(
+            rate=platform_budget(platform, 'rate_limit', settings.SCRAPER_RATE_LIMIT),
+            burst=platform_budget(platform, 'burst', settings.SCRAPER_RATE_BURST),
+        )
+    return _rate_limiters[platform]
+
+
+def get_circuit_breaker(platform: str) -> CircuitBreaker:
+    """Get the circuit breaker of a platform"""
+    platform = platform.lower()
+    if platform not in _circuit_breakers:
+        _circuit_breakers[platform] = CircuitBreaker(
+            platform,
+            failure_threshold=platform_budget(platform, 'failure_threshold', settings.CIRCUIT_FAILURE_THRESHOLD),
+            reset_timeout=platform_budget(platform, 'reset_timeout', settings.CIRCUIT_RESET_TIMEOUT),
+        )
+    return _circuit_breakers[platform]
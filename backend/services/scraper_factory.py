@@ -1,7 +1,9 @@
 """
 Scraper Factory - Creates appropriate scraper based on platform
 """
-from typing import Dict
+import threading
+from typing import Dict, List
+from loguru import logger
 from backend.services.job_scraper import (
     JobScraper,
     LinkedInScraper,
@@ -15,7 +17,13 @@ from backend.database.models import Platform
 
 
 class ScraperFactory:
-    """Factory to create platform-specific scrapers"""
+    """
+    Factory and process-wide registry of platform-specific scrapers
+    
+    get_scraper() lazily builds one long-lived instance per platform so
+    sessions, cookies and warm state survive across requests. startup() and
+    shutdown() are called from the FastAPI lifecycle events.
+    """
     
     _scrapers: Dict[str, type] = {
         Platform.LINKEDIN.value: LinkedInScraper,
@@ -26,17 +34,23 @@ class ScraperFactory:
         Platform.WELCOME_TO_THE_JUNGLE.value: WelcomeToTheJungleScraper,
     }
     
+    _instances: Dict[str, JobScraper] = {}
+    _lock = threading.Lock()
+    
     @classmethod
     def create_scraper(cls, platform: str) -> JobScraper:
         """
-        Create a scraper instance for the specified platform
+        Create a new scraper instance for the specified platform
+        
+        Request handlers should use get_scraper() instead, which reuses the
+        registered instance.
         
         Args:
             platform: Platform name (e.g., 'linkedin', 'indeed', 'hello_work')
-            
+        
         Returns:
             JobScraper instance
-            
+        
         Raises:
             ValueError: If platform is not supported
         """
@@ -49,12 +63,79 @@ class ScraperFactory:
         return scraper_class()
     
     @classmethod
-    def get_supported_platforms(cls) -> list:
-        """Get list of supported platforms"""
-        return list(cls._scrapers.keys())
+    def get_scraper(cls, platform: str) -> JobScraper:
+        """
+        Get the shared scraper instance for a platform, building it on first use
+        
+        Args:
+            platform: Platform name (e.g., 'linkedin', 'indeed', 'hello_work')
+        
+        Returns:
+            JobScraper instance shared by all requests
+        
+        Raises:
+            ValueError: If platform is not supported
+        """
+        platform_lower = platform.lower()
+        scraper = cls._instances.get(platform_lower)
+        if scraper is None:
+            with cls._lock:
+                scraper = cls._instances.get(platform_lower)
+                if scraper is None:
+                    scraper = cls.create_scraper(platform_lower)
+                    cls._instances[platform_lower] = scraper
+        return scraper
+    
+    @classmethod
+    async def startup(cls, platforms: List[str] = None) -> None:
+        """
+        Build and open the scrapers ahead of the first request
+        
+        Args:
+            platforms: Platforms to warm up (defaults to all supported platforms)
+        """
+        for platform in platforms or cls._scrapers.keys():
+            if not cls.is_platform_supported(platform):
+                logger.warning(f"Skipping unsupported platform at startup: {platform}")
+                continue
+            scraper = cls.get_scraper(platform)
+            try:
+                await scraper.open()
+            except Exception as e:
+                logger.error(f"Error opening {platform} scraper: {e}")
+                scraper.record_failure(str(e))
+    
+    @classmethod
+    async def shutdown(cls) -> None:
+        """Close every registered scraper and empty the registry"""
+        with cls._lock:
+            instances = list(cls._instances.items())
+            cls._instances.clear()
+        for platform, scraper in instances:
+            try:
+                await scraper.close()
+            except Exception as e:
+                logger.error(f"Error closing {platform} scraper: {e}")
+    
+    @classmethod
+    def get_supported_platforms(cls) -> List[Dict]:
+        """
+        Get supported platforms with each scraper's health and warm state
+        
+        Returns:
+            List of dictionaries, one per platform. Platforms whose scraper
+            has not been built yet are reported as cold.
+        """
+        platforms = []
+        for platform in cls._scrapers:
+            scraper = cls._instances.get(platform)
+            if scraper is None:
+                platforms.append({'platform': platform, 'healthy': True, 'warm': False})
+            else:
+                platforms.append({'platform': platform, **scraper.health()})
+        return platforms
     
     @classmethod
     def is_platform_supported(cls, platform: str) -> bool:
         """Check if a platform is supported"""
         return platform.lower() in cls._scrapers
-
@@ -0,0 +1,203 @@
+"""
+Search Cache - Shared TTL/LRU cache of raw platform search results
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from backend.core.config import settings
+
+
+QueryKey = Tuple[str, Tuple[str, ...], str]
+CacheKey = Tuple[str, Tuple[str, ...], str, int]
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lowercase and collapse whitespace so equivalent queries share a key"""
+    return " ".join((value or "").lower().split())
+
+
+def make_query_key(platform: str, keywords: List[str], location: str) -> QueryKey:
+    """
+    Build the normalized (platform, keywords, location) key of a search
+    
+    Keywords are normalized, de-duplicated and sorted, so "Data  Stage" and
+    ["stage", "data"] share a key.
+    """
+    normalized_keywords = sorted({
+        kw for kw in (normalize_text(k) for k in keywords or []) if kw
+    })
+    return (platform.lower(), tuple(normalized_keywords), normalize_text(location))
+
+
+def make_key(platform: str, keywords: List[str], location: str, max_results: int) -> CacheKey:
+    """Build the cache key for a platform search"""
+    return make_query_key(platform, keywords, location) + (int(max_results),)
+
+
+class SearchCache:
+    """
+    In-process TTL + LRU cache with single-flight coalescing
+    
+    Values are raw (unscored) job lists shared by every user; callers get
+    copies so per-user scoring never mutates the cached results. Concurrent
+    misses for the same key wait on one upstream fetch instead of each
+    starting their own.
+    """
+    
+    def __init__(self, max_size: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_size = max_size or settings.SEARCH_CACHE_MAX_SIZE
+        self.ttl = ttl if ttl is not None else settings.SEARCH_CACHE_TTL
+        
+        self._entries: "OrderedDict[CacheKey, Tuple[float, List[Dict]]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Task] = {}
+        self._expired: Set[CacheKey] = set()  # Expired entries already counted
+        
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    @staticmethod
+    def _copy(jobs: List[Dict]) -> List[Dict]:
+        return [dict(job) for job in jobs]
+    
+    def get(self, key: CacheKey) -> Optional[List[Dict]]:
+        """
+        Get cached results if present and not expired
+        
+        Args:
+            key: Cache key from make_key()
+        
+        Returns:
+            Copy of the cached job list, or None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, jobs = entry
+        if expires_at <= time.monotonic():
+            # Kept (until LRU eviction) as a fallback for get_stale()
+            if key not in self._expired:
+                self._expired.add(key)
+                self.expirations += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        return self._copy(jobs)
+    
+    def get_stale(self, key: CacheKey) -> Optional[List[Dict]]:
+        """
+        Get cached results even if they have expired
+        
+        Used when the platform cannot be queried (open circuit).
+        
+        Args:
+            key: Cache key from make_key()
+        
+        Returns:
+            Copy of the cached job list, or None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return self._copy(entry[1])
+    
+    def set(self, key: CacheKey, jobs: List[Dict]) -> None:
+        """
+        Store results, evicting the least recently used entries when full
+        
+        Args:
+            key: Cache key from make_key()
+            jobs: Raw job list
+        """
+        self._entries[key] = (time.monotonic() + self.ttl, self._copy(jobs))
+        self._entries.move_to_end(key)
+        self._expired.discard(key)
+        while len(self._entries) > self.max_size:
+            evicted, _ = self._entries.popitem(last=False)
+            self._expired.discard(evicted)
+            self.evictions += 1
+    
+    async def get_or_fetch(
+        self,
+        key: CacheKey,
+        fetch: Callable[[], Awaitable[List[Dict]]]
+    ) -> Tuple[List[Dict], str]:
+        """
+        Get cached results or fetch them once for all concurrent callers
+        
+        The upstream fetch runs as its own task and callers wait on it through
+        asyncio.shield, so a caller that times out does not cancel the fetch;
+        it still completes and fills the cache for the next request.
+        
+        Args:
+            key: Cache key from make_key()
+            fetch: Coroutine factory performing the upstream search
+        
+        Returns:
+            Tuple of (copy of the job list, source) where source is
+            'hit', 'coalesced' or 'miss'
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached, 'hit'
+        
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            jobs = await asyncio.shield(task)
+            return self._copy(jobs), 'coalesced'
+        
+        self.misses += 1
+        task = asyncio.ensure_future(self._fetch_and_store(key, fetch))
+        # Mark the error as retrieved even if every waiter has timed out
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = task
+        jobs = await asyncio.shield(task)
+        return self._copy(jobs), 'miss'
+    
+    async def _fetch_and_store(
+        self,
+        key: CacheKey,
+        fetch: Callable[[], Awaitable[List[Dict]]]
+    ) -> List[Dict]:
+        try:
+            jobs = await fetch()
+            self.set(key, jobs)
+            return jobs
+        finally:
+            self._inflight.pop(key, None)
+    
+    def clear(self) -> None:
+        """Drop every cached entry (counters are kept)"""
+        self._entries.clear()
+        self._expired.clear()
+    
+    def stats(self) -> Dict:
+        """
+        Get cache counters
+        
+        Returns:
+            Dictionary with size, hit/miss/eviction counters and hit rate
+        """
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'inflight': len(self._inflight),
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+        }
+
+
+search_cache = SearchCache()
@@ -0,0 +1,110 @@
+"""
+Tests - Search pipeline fetching one result page at a time
+"""
+import asyncio
+import json
+
+from backend.core.config import settings
+from backend.services.ingest_pipeline import SearchPipeline
+from backend.services.job_matcher import JobMatcher
+from backend.services.job_scraper import JobScraper
+from backend.services.scraper_factory import ScraperFactory
+
+
+class PagedScraper(JobScraper):
+    """Scraper serving raw result pages of four JSON-LD listings each"""
+    
+    platform = "indeed"
+    max_pages = 50
+    
+    def __init__(self):
+        super().__init__()
+        self.pages_fetched = 0
+    
+    def search_url(self, keywords, location, page):
+        return f"https://jobs.example/search?page={page}"
+    
+    async def fetch_raw_page(self, keywords, location, page):
+        self.pages_fetched += 1
+        postings = [{
+            '@context': 'https://schema.org',
+            '@type': 'JobPosting',
+            'title': f'Stage {page}-{i}',
+            'description': f'python django mission {page} {i}',
+            'hiringOrganization': {'name': 'Acme'},
+        } for i in range(4)]
+        body = ''.join(f'<script type="application/ld+json">{json.dumps(p)}</script>' for p in postings)
+        return {'platform': self.platform, 'url': self.search_url(keywords, location, page), 'body': body}
+
+
+def _setup(monkeypatch) -> PagedScraper:
+    monkeypatch.setattr(settings, 'JOB_STORE_ENABLED', False)
+    monkeypatch.setattr(settings, 'SEARCH_CACHE_ENABLED', False)
+    monkeypatch.setattr(settings, 'PIPELINE_QUEUE_SIZE', 2)
+    scraper = PagedScraper()
+    monkeypatch.setitem(ScraperFactory._instances, 'indeed', scraper)
+    return scraper
+
+
+def test_pages_stop_at_max_results(monkeypatch):
+    scraper = _setup(monkeypatch)
+    pipeline = SearchPipeline(['python'], 'Paris', 10, JobMatcher({}, {}))
+    jobs = asyncio.run(pipeline.collect(['indeed']))
+    
+    assert len(jobs) == 10
+    assert pipeline.statuses[0]['count'] == 10
+    assert scraper.pages_fetched < 10  # 3 pages needed, plus what the queues hold
+
+
+def test_slow_consumer_throttles_downloads(monkeypatch):
+    scraper = _setup(monkeypatch)
+    pipeline = SearchPipeline(['python'], 'Paris', 1000, JobMatcher({}, {}))
+    
+    async def first_jobs():
+        taken = 0
+        async for _ in pipeline.run(['indeed']):
+            taken += 1
+            if taken == 3:
+                await asyncio.sleep(0.05)  # Let the stages fill their queues
+                return
+    
+    asyncio.run(first_jobs())
+    assert scraper.pages_fetched < scraper.max_pages
+
+
+class FieldMatcher:
+    """Matcher scoring each job with its 'score' field"""
+    
+    def calculate_relevance_score(self, job):
+        return job['score']
+    
+    def is_match(self, score):
+        return score >= 50
+
+
+def test_more_complete_copy_scoring_lower(monkeypatch):
+    # The copy replacing the best job scores lower: the job it had pushed
+    # out of the page must come back
+    _setup(monkeypatch)
+    monkeypatch.setattr(settings, 'DEDUPE_ENABLED', True)
+    monkeypatch.setattr(settings, 'PIPELINE_CONCURRENCY', {})
+    text = ' '.join(f'mission python django projet {i}' for i in range(12))
+    pages = [
+        {'platform': 'linkedin', 'jobs': [
+            {'id': 'a', 'company': 'Acme', 'title': 'Stage', 'description': text, 'score': 90},
+            {'id': 'b', 'company': 'Beta', 'title': 'Stage', 'description': 'comptabilite audit', 'score': 60},
+        ]},
+        {'platform': 'indeed', 'jobs': [
+            {'id': 'a2', 'company': 'Acme', 'title': 'Stage', 'description': text + ' remote', 'score': 10},
+        ]},
+    ]
+    pipeline = SearchPipeline(['python'], 'Paris', 10, FieldMatcher())
+    jobs = asyncio.run(pipeline.collect(pages, top_k=1))
+    
+    assert [job['id'] for job in jobs] == ['b']
+    assert pipeline.total == 2
+    
+    pipeline = SearchPipeline(['python'], 'Paris', 10, FieldMatcher())
+    jobs = asyncio.run(pipeline.collect(pages, top_k=1, offset=1))
+    assert [job['id'] for job in jobs] == ['a2']
+    assert len(jobs[0]['sources']) == 2
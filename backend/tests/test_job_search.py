@@ -0,0 +1,47 @@
+"""
+Tests - Platform timeouts and circuit breakers
+"""
+import asyncio
+
+from backend.core.config import settings
+from backend.services import job_search, resilience
+from backend.services.scraper_factory import ScraperFactory
+
+
+class HangingScraper:
+    """Scraper whose searches never answer"""
+    
+    def __init__(self):
+        self.failures = []
+    
+    async def asearch(self, keywords, location, max_results=50):
+        await asyncio.Event().wait()
+    
+    def record_failure(self, error):
+        self.failures.append(error)
+    
+    def record_success(self):
+        pass
+
+
+def test_hanging_scraper_opens_circuit(monkeypatch):
+    monkeypatch.setattr(settings, 'SEARCH_CACHE_ENABLED', False)
+    monkeypatch.setattr(settings, 'JOB_STORE_ENABLED', False)
+    monkeypatch.setattr(settings, 'JOB_SEARCH_PLATFORM_TIMEOUT', 0.05)
+    monkeypatch.setattr(settings, 'CIRCUIT_FAILURE_THRESHOLD', 2)
+    monkeypatch.setattr(resilience, '_circuit_breakers', {})
+    scraper = HangingScraper()
+    monkeypatch.setitem(ScraperFactory._instances, 'linkedin', scraper)
+    
+    async def run():
+        statuses = []
+        for _ in range(3):
+            # The outer timeout matches the platform one, so it fires first
+            _, status = await job_search.search_platform('linkedin', ['python'], 'Paris', 10)
+            statuses.append(status['status'])
+            await asyncio.sleep(0.1)  # Let the platform timeout record the failure
+        return statuses
+    
+    assert asyncio.run(run()) == ['timeout', 'timeout', 'circuit_open']
+    assert resilience.get_circuit_breaker('linkedin').is_open
+    assert len(scraper.failures) == 2
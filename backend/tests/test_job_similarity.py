@@ -0,0 +1,36 @@
+"""
+Tests - JobVectors incremental updates
+"""
+from typing import Optional
+
+from backend.services.job_similarity import JobVectors, hash_features
+
+
+def _row(i: int, text: Optional[str] = None) -> dict:
+    return {'external_id': f'test:{i}', 'title': f'Stage {i}', 'description': text or f'python django mission {i}'}
+
+
+def test_many_small_updates():
+    # Growing row arrays one listing at a time (after a first batch) must
+    # keep every per-row array large enough
+    vectors = JobVectors(bits=12)
+    vectors.update([_row(i) for i in range(100)])
+    for i in range(100, 1000):
+        vectors.update([_row(i)])
+    
+    assert len(vectors) == 1000
+    query = vectors.query_vector(*hash_features('python django mission 999', vectors.bits))
+    assert vectors.most_similar(query, 1)[0][0] == 'test:999'
+
+
+def test_changed_and_removed_listings():
+    vectors = JobVectors(bits=12)
+    vectors.update([_row(i) for i in range(300)])
+    for i in range(300):
+        vectors.update([_row(i, f'comptabilite audit finance {i}')])
+    vectors.update([{**_row(i), 'is_active': False} for i in range(0, 300, 2)])
+    
+    assert len(vectors) == 150
+    query = vectors.query_vector(*hash_features('comptabilite audit finance 7', vectors.bits))
+    assert vectors.most_similar(query, 1)[0][0] == 'test:7'
+    assert 'test:8' not in vectors